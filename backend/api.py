@@ -1,8 +1,137 @@
+from contextlib import asynccontextmanager
+import asyncio
+from dataclasses import asdict
+import importlib
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi import HTTPException
-from backend.route import router as ai_router
+from backend.route import router as ai_router, router_v2 as ai_router_v2, ai_client
+from src.ai_client import HTTP2_ENABLED, get_executor_stats
+from src.ai_processing import warm_prompt_templates
+from src.ai_validation import MAX_INPUT_CHARS
+from src.chunking import LARGE_DOC_MAX_CHARS
+
+# Startup Warm-Up (readiness gate)
+
+_readiness: dict = {"ready": False, "checks": {}}
+
+async def warm_up() -> None:
+    """
+    Pays first-request costs before the worker reports ready.
+    A failed provider warm-up is recorded but does not block readiness:
+    the pool will still connect on the first real call.
+    """
+    checks = {}
+
+    # Heavy extraction libraries (PyMuPDF, python-docx, Tesseract bindings)
+
+    await asyncio.to_thread(importlib.import_module, "src.extraction")
+    checks["extraction"] = "ok"
+
+    # Prompt templates
+
+    checks["prompt_templates"] = warm_prompt_templates()
+
+    # Provider connections (DNS + TLS + pool)
+
+    try:
+        await ai_client.warm_up_async()
+        checks["provider"] = "ok"
+    except Exception as e:
+        checks["provider"] = f"failed: {type(e).__name__}"
+    checks["http2"] = HTTP2_ENABLED
+    _readiness["checks"] = checks
+    _readiness["ready"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+
+    # Warm up in the background so /health answers immediately
+
+    _readiness["ready"] = False
+    task = asyncio.create_task(warm_up())
+    yield
+
+    # A draining worker must leave rotation
+
+    _readiness["ready"] = False
+    task.cancel()
+
+# Request Body Ceilings (enforced before the body is buffered or parsed)
+# JSON-escaped printable ASCII is at most 2 bytes per character; the
+# allowance covers the remaining fields (feature, questions, ...).
+
+JSON_BYTES_PER_CHAR = 2
+BODY_FIELDS_ALLOWANCE_BYTES = 64 * 1024
+
+def body_limit(max_chars: int) -> int:
+    return max_chars * JSON_BYTES_PER_CHAR + BODY_FIELDS_ALLOWANCE_BYTES
+
+DEFAULT_BODY_LIMIT = body_limit(MAX_INPUT_CHARS)
+BODY_LIMITS = {
+    "/api/v1/process/large": body_limit(LARGE_DOC_MAX_CHARS),
+}
+
+def _payload_too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail={
+            "error": "payload_too_large",
+            "message": f"Request body exceeds the {limit}-byte limit for this endpoint.",
+        }
+    )
+
+class BodySizeLimitMiddleware:
+    """
+    Pure ASGI middleware (no body buffering of its own).
+    - Declared Content-Length over the route ceiling: 413 before any read
+    - Chunked / undeclared bodies: bytes are counted as they arrive and
+      the read fails with 413 as soon as the ceiling is crossed
+    """
+
+    def __init__(self, app, limits: dict[str, int], default_limit: int):
+        self.app = app
+        self.limits = limits
+        self.default_limit = default_limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self.limits.get(scope["path"].rstrip("/"), self.default_limit)
+        declared = self._content_length(scope)
+        if declared is not None and declared > limit:
+            error = _payload_too_large(limit)
+            response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+            await response(scope, receive, send)
+            return
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+
+                    # Raised inside the route's body read; FastAPI lets
+                    # HTTPException through to the exception middleware
+
+                    raise _payload_too_large(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _content_length(scope) -> int | None:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
 
 # Application Instance
 
@@ -13,6 +142,13 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
+)
+
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits=BODY_LIMITS,
+    default_limit=DEFAULT_BODY_LIMIT,
 )
 
 # v1 router
@@ -23,6 +159,14 @@ app.include_router(
     tags=["v1"],
 )
 
+# v2 router (same guarantees, cache-friendly prompt layout)
+
+app.include_router(
+    ai_router_v2,
+    prefix="/api/v2",
+    tags=["v2"],
+)
+
 # Health Check 
 
 @app.get("/health", tags=["system"])
@@ -33,6 +177,37 @@ def health_check():
         "version": "1.0.0"
     }
 
+# Readiness Check (separate from liveness)
+
+@app.get("/ready", tags=["system"])
+def readiness_check():
+    if not _readiness["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up"},
+        )
+    return {
+        "status": "ready",
+        "checks": _readiness["checks"],
+    }
+
+# Runtime Metrics (capacity sizing)
+
+@app.get("/metrics", tags=["system"])
+def runtime_metrics():
+    return {
+        "ai_provider": ai_client.provider.name,
+        "ai_executor": get_executor_stats(),
+        "ai_cache": ai_client.cache.stats(),
+        "ai_completion_store": ai_client.store.stats() if ai_client.store else None,
+        "ai_single_flight": ai_client.flights.stats(),
+        "ai_resilience": ai_client.resilience.stats(),
+        "ai_routing": {
+            **ai_client.router.stats(),
+            "signals": asdict(ai_client.load_signals()),
+        },
+    }
+
 # Global Validation Handler
 
 @app.exception_handler(RequestValidationError)
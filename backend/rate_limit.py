@@ -32,13 +32,15 @@ def _is_heavy_feature(feature: FeatureType) -> bool:
         FeatureType.generate_answers,
     }
 
-def rate_limit_ai(request: Request, feature: FeatureType) -> None:
+def rate_limit_ai(request: Request, feature: FeatureType, cost: int = 1) -> None:
     """
     AI-specific rate limiter.
     - IP-based
     - Feature-aware
     - Deterministic window enforcement
     - Compatible with ai_client execution cost
+    cost > 1 charges several provider calls at once (a batch);
+    they are admitted together or rejected together.
     """
     ip = request.client.host
     now = time.time()
@@ -49,8 +51,16 @@ def rate_limit_ai(request: Request, feature: FeatureType) -> None:
         # Remove expired timestamps
         
         window = [t for t in window if now - t < AI_WINDOW_SECONDS]
-        if len(window) >= limit:
-            retry_after = int(AI_WINDOW_SECONDS - (now - window[0]))
+        if len(window) + cost > limit:
+
+            # Wait for enough timestamps to expire; a cost above the
+            # limit never fits, so it waits a whole window
+
+            freeing = len(window) + cost - limit
+            if freeing <= len(window):
+                retry_after = int(AI_WINDOW_SECONDS - (now - window[freeing - 1]))
+            else:
+                retry_after = AI_WINDOW_SECONDS
             raise HTTPException(
                 status_code=429,
                 detail={
@@ -61,7 +71,7 @@ def rate_limit_ai(request: Request, feature: FeatureType) -> None:
                 headers={"Retry-After": str(retry_after)}
             )
 
-        # Append this request timestamp
+        # Append one timestamp per charged call
         
-        window.append(now)
+        window.extend([now] * cost)
         _requests[ip] = window
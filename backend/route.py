@@ -1,13 +1,42 @@
 from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel, field_validator
-from typing import List, Optional
-from src.schema import FeatureType
-from src.ai_processing import process_with_ai
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from dataclasses import dataclass
+from functools import partial
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import json
+import time
+from src.schema import AnalyzerPayload, AnalyzerRequest, FeatureType
+from src.ai_processing import (
+    PROMPT_CONTRACT_V1,
+    PROMPT_CONTRACT_V2,
+    build_prompt_messages,
+    build_qa_prompt,
+    process_with_ai,
+)
 from src.ai_client import AIClient
-from src.ai_validation import validate_text_input
-from backend.rate_limit import rate_limit_ai
+from src.routing import Route
+from src.ai_validation import TextStats, validate_text_input, validate_text_with_stats
+from src.chunking import (
+    CHUNKABLE_FEATURES,
+    LARGE_DOC_MAX_CHARS,
+    LARGE_DOC_MAX_WORDS,
+    process_chunked,
+)
+from src.incremental import process_incrementally
+from src.tokens import estimate_tokens, size_max_tokens, size_qa_max_tokens
+from src.validation import (
+    NumberedListStream,
+    numbered_list_count_range,
+    parse_qa_output,
+    validate_analyzer_contract,
+    validate_structured_text_response,
+)
+from backend.rate_limit import _is_heavy_feature, rate_limit_ai
 
 router = APIRouter()
+router_v2 = APIRouter()
 ai_client = AIClient()
 
 # Request / Response Models
@@ -17,6 +46,8 @@ class AIProcessRequest(BaseModel):
     feature: FeatureType
 
     # Optional feature-specific parameters
+    # (word_count is accepted for compatibility; the server-side
+    # scan of `text` is used instead)
     
     word_count: Optional[int] = None
     questions: Optional[List[str]] = None
@@ -28,42 +59,454 @@ class AIProcessRequest(BaseModel):
 class AIProcessResponse(BaseModel):
     result: str
 
+    # Routing tier that served the request (see src/routing.py)
+
+    route: Optional[str] = None
+
+    # Parsed, validated items for numbered-list features
+
+    items: Optional[List[str]] = None
+class AILargeProcessRequest(BaseModel):
+    text: str
+    feature: FeatureType
+    target_language: Optional[str] = None
+    @field_validator("text")
+    @classmethod
+    def strip_text(cls, v: str) -> str:
+        return v.strip()
+class AILargeProcessResponse(BaseModel):
+    result: str
+    chunks: int
+class AIQARequest(BaseModel):
+    text: str
+    word_count: Optional[int] = None  # Ignored: counted server-side
+    @field_validator("text")
+    @classmethod
+    def strip_text(cls, v: str) -> str:
+        return v.strip()
+class AIQAResponse(BaseModel):
+    questions: List[str]
+    answers: List[str]
+class AIIncrementalRequest(BaseModel):
+    text: str
+    feature: FeatureType = FeatureType.grammar_correct
+    @field_validator("text")
+    @classmethod
+    def strip_text(cls, v: str) -> str:
+        return v.strip()
+class AIIncrementalResponse(BaseModel):
+    result: str
+    segments: int
+    reused: int
+
+# Shared Execution Steps
+
+@dataclass(frozen=True)
+class _PreparedFeature:
+    feature: FeatureType
+    prompt: str
+    system: Optional[str]
+    input_tokens: int
+    max_tokens: int
+
+    # Feature-level output contract, checked before the result is cached
+
+    validate: Optional[Callable[[str], object]] = None
+
+def _prepare_feature(
+    text: str,
+    feature: FeatureType,
+    *,
+    word_count: Optional[int] = None,
+    questions: Optional[List[str]] = None,
+    target_language: Optional[str] = None,
+    contract: str = PROMPT_CONTRACT_V1,
+) -> _PreparedFeature:
+    """
+    Step 2 of the processing pipeline: prompt and completion budget.
+    """
+
+    # Build prompt using strict contract
+    # (v2 moves the static contract into the system message)
+
+    system = None
+    if contract == PROMPT_CONTRACT_V2:
+        messages = build_prompt_messages(
+            text,
+            feature,
+            word_count=word_count,
+            questions=questions,
+            target_language=target_language,
+        )
+        prompt, system = messages.user, messages.system
+    else:
+        prompt = process_with_ai(
+            text=text,
+            feature=feature,
+            word_count=word_count,
+            questions=questions,
+            target_language=target_language,
+        )
+    input_tokens = estimate_tokens(text)
+    max_tokens = size_max_tokens(
+        feature,
+        input_tokens,
+        word_count=word_count,
+        questions=questions,
+    )
+    validate = None
+    if feature in NUMBERED_LIST_FEATURES:
+        validate = partial(_numbered_items, feature, word_count=word_count, questions=questions)
+    return _PreparedFeature(feature, prompt, system, input_tokens, max_tokens, validate)
+
+async def _lookup_feature(call: _PreparedFeature) -> tuple[Optional[str], Route]:
+    """
+    Step 3 — Model + budget from the routing policy and live load;
+    repeated prompts are served from cache under any route
+    (no provider call, so no rate-limit cost).
+    """
+    return await ai_client.lookup_routed_async(
+        call.prompt, call.feature, call.input_tokens, call.max_tokens, system=call.system
+    )
+
+async def _generate_feature(call: _PreparedFeature, route: Route) -> str:
+    """
+    Step 5 — Execute AI (non-blocking, no threadpool slot held).
+    """
+    started = time.monotonic()
+    output = await ai_client.generate_async(
+        call.prompt,
+        max_tokens=route.max_tokens,
+        system=call.system,
+        model=route.model,
+        validate=call.validate,
+    )
+    ai_client.router.record(route, time.monotonic() - started)
+    return output
+
+async def _run_feature(
+    request: Request,
+    text: str,
+    feature: FeatureType,
+    *,
+    word_count: Optional[int] = None,
+    questions: Optional[List[str]] = None,
+    target_language: Optional[str] = None,
+    contract: str = PROMPT_CONTRACT_V1,
+    rate_limited: bool = True,
+) -> tuple[str, Route]:
+    """
+    Steps 2-5 of the processing pipeline for already-validated text.
+    Returns the output and the route (model tier) that produced it.
+    rate_limited=False is for callers that charged the whole
+    request up front (large-document chunks).
+    """
+    call = _prepare_feature(
+        text,
+        feature,
+        word_count=word_count,
+        questions=questions,
+        target_language=target_language,
+        contract=contract,
+    )
+    cached, route = await _lookup_feature(call)
+    if cached is not None:
+        return cached, route
+
+    # Step 4 — Rate limit before any provider call (cost protection)
+
+    if rate_limited:
+        rate_limit_ai(request, feature)
+    return await _generate_feature(call, route), route
+
+NUMBERED_LIST_FEATURES = {
+    FeatureType.generate_questions,
+    FeatureType.generate_answers,
+}
+
+def _numbered_items(
+    feature: FeatureType,
+    output: str,
+    *,
+    word_count: Optional[int] = None,
+    questions: Optional[List[str]] = None,
+) -> Optional[List[str]]:
+    """
+    Server-side parsing for numbered-list features; None otherwise.
+    Output that breaks the list contract is a provider fault (502).
+    """
+    if feature not in NUMBERED_LIST_FEATURES:
+        return None
+    count_range = numbered_list_count_range(feature, word_count=word_count, questions=questions)
+    return _parse_numbered(output, count_range)
+
+def _parse_numbered(output: str, count_range: Optional[tuple[int, int]]) -> List[str]:
+    try:
+        return NumberedListStream(count_range).parse(output)
+    except ValueError as e:
+        raise _invalid_output_error(e)
+
+def _parse_qa(output: str, word_count: int) -> tuple[List[str], List[str]]:
+    try:
+        questions, answers = parse_qa_output(output, word_count)
+    except ValueError as e:
+        raise _invalid_output_error(e)
+    return questions.items, answers.items
+
+def _invalid_output_error(e: ValueError) -> HTTPException:
+    return HTTPException(
+        status_code=502,
+        detail={
+            "error": "invalid_ai_output",
+            "message": str(e),
+        }
+    )
+
+def _to_http_error(e: Exception) -> HTTPException:
+    if isinstance(e, HTTPException):
+        
+        # Preserve structured HTTP errors from lower layers
+        
+        return e
+    if isinstance(e, ValueError):
+        return HTTPException(
+            status_code=400,
+            detail={
+                "error": "invalid_request",
+                "message": str(e),
+            }
+        )
+
+    # Never leak internal details
+
+    return HTTPException(
+        status_code=500,
+        detail={
+            "error": "internal_error",
+            "message": "Unexpected processing error.",
+        }
+    )
+
 # Route
 
 @router.post(
     "/process",
     response_model=AIProcessResponse
 )
-def process_document(request: Request, payload: AIProcessRequest):
+async def process_document(request: Request, payload: AIProcessRequest):
+
+    # Step 1 — Deterministic input validation
+    
+    text, stats = validate_text_with_stats(payload.text)
+    try:
+        output, route = await _run_feature(
+            request,
+            text,
+            payload.feature,
+            word_count=stats.words,
+            questions=payload.questions,
+            target_language=payload.target_language,
+        )
+        items = _numbered_items(
+            payload.feature,
+            output,
+            word_count=stats.words,
+            questions=payload.questions,
+        )
+        return AIProcessResponse(result=output, route=route.name, items=items)
+    except Exception as e:
+        raise _to_http_error(e)
+
+# Large-Document Route (opt-in map-reduce over paragraph chunks)
+
+@router.post(
+    "/process/large",
+    response_model=AILargeProcessResponse
+)
+async def process_large_document(request: Request, payload: AILargeProcessRequest):
+
+    # Step 1 — Validation against the large-document ceilings
+    
+    text = validate_text_input(
+        payload.text,
+        max_chars=LARGE_DOC_MAX_CHARS,
+        max_words=LARGE_DOC_MAX_WORDS,
+    )
+    if payload.feature not in CHUNKABLE_FEATURES:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "feature_not_chunkable",
+                "message": (
+                    f"Feature '{payload.feature.value}' is not available in large-document mode."
+                ),
+            }
+        )
+
+    # Step 2 — Feature contract checked once, before any charge
+
+    process_with_ai(
+        text=text,
+        feature=payload.feature,
+        target_language=payload.target_language,
+    )
+
+    # One rate-limit charge per document, not per chunk
 
-    # Step 0 — Rate limit first (cost protection)
-   
     rate_limit_ai(request, payload.feature)
+    async def run_chunk(chunk: str) -> str:
+        output, _ = await _run_feature(
+            request,
+            chunk,
+            payload.feature,
+            target_language=payload.target_language,
+            rate_limited=False,
+        )
+        return output
+    try:
+        chunked = await process_chunked(text, payload.feature, run_chunk)
+        return AILargeProcessResponse(result=chunked.result, chunks=chunked.chunks)
+    except Exception as e:
+        raise _to_http_error(e)
+
+# Fused Q&A Route (questions + answers in one round trip)
+
+@router.post(
+    "/process/qa",
+    response_model=AIQAResponse
+)
+async def process_document_qa(request: Request, payload: AIQARequest):
+
+    # Step 1 — Deterministic input validation
+    
+    text, stats = validate_text_with_stats(payload.text)
+    try:
+
+        # Step 2 — One prompt, same scaling contract as generate_questions
+
+        prompt = build_qa_prompt(text, word_count=stats.words)
+        max_tokens = size_qa_max_tokens(stats.words)
+
+        # Step 3 — Cache, then rate limit as a heavy feature, then execute
+
+        # (output that breaks the pairing contract is never cached)
+
+        output = await ai_client.lookup_async(prompt, max_tokens=max_tokens)
+        if output is None:
+            rate_limit_ai(request, FeatureType.generate_questions)
+            output = await ai_client.generate_async(
+                prompt,
+                max_tokens=max_tokens,
+                validate=partial(_parse_qa, word_count=stats.words),
+            )
+
+        # Step 4 — Server-side parsing + numbering validation
+
+        questions, answers = _parse_qa(output, stats.words)
+    except Exception as e:
+        raise _to_http_error(e)
+    return AIQAResponse(questions=questions, answers=answers)
+
+# Incremental Route (paragraph-level reuse for edit-resubmit)
+
+@router.post(
+    "/process/incremental",
+    response_model=AIIncrementalResponse
+)
+async def process_document_incremental(request: Request, payload: AIIncrementalRequest):
 
     # Step 1 — Deterministic input validation
     
     text = validate_text_input(payload.text)
     try:
-       
-        # Step 2 — Build prompt using strict contract
-        
-        prompt = process_with_ai(
-            text=text,
-            feature=payload.feature,
-            word_count=payload.word_count,
-            questions=payload.questions,
-            target_language=payload.target_language,
+        incremental = await process_incrementally(
+            text,
+            payload.feature,
+            ai_client,
+
+            # Charged once, only if some paragraph needs the provider
+
+            on_provider_call=lambda: rate_limit_ai(request, payload.feature),
+        )
+        return AIIncrementalResponse(
+            result=incremental.result,
+            segments=incremental.segments,
+            reused=incremental.reused,
         )
+    except Exception as e:
+        raise _to_http_error(e)
 
-        # Step 3 — Execute AI
-        
-        output = ai_client.generate(prompt)
-        return AIProcessResponse(result=output)
-    except HTTPException:
-        
-        # Preserve structured HTTP errors from lower layers
-        
-        raise
+# Analyzer Route (document envelope + feature-tagged payload)
+
+async def _analyze(
+    request: Request,
+    text: str,
+    stats: TextStats,
+    feature: FeatureType,
+    *,
+    questions: Optional[List[str]] = None,
+    target_language: Optional[str] = None,
+) -> AIProcessResponse:
+    output, route = await _run_feature(
+        request,
+        text,
+        feature,
+        word_count=stats.words,
+        questions=questions,
+        target_language=target_language,
+    )
+    items = _numbered_items(feature, output, word_count=stats.words, questions=questions)
+    return AIProcessResponse(result=output, route=route.name, items=items)
+
+async def _analyze_plain(
+    request: Request,
+    text: str,
+    stats: TextStats,
+    payload: AnalyzerPayload,
+) -> AIProcessResponse:
+    return await _analyze(request, text, stats, payload.feature)
+
+async def _analyze_translate(
+    request: Request,
+    text: str,
+    stats: TextStats,
+    payload: AnalyzerPayload,
+) -> AIProcessResponse:
+    return await _analyze(
+        request, text, stats, payload.feature, target_language=payload.target_language
+    )
+
+async def _analyze_answers(
+    request: Request,
+    text: str,
+    stats: TextStats,
+    payload: AnalyzerPayload,
+) -> AIProcessResponse:
+    return await _analyze(request, text, stats, payload.feature, questions=payload.questions)
+
+# Action → handler, built once (convert runs the v1 conversion prompt,
+# as /process does; output_format is not applied server-side yet)
+
+ANALYZE_HANDLERS: dict[
+    FeatureType,
+    Callable[[Request, str, TextStats, AnalyzerPayload], Awaitable[AIProcessResponse]],
+] = {
+    **{feature: _analyze_plain for feature in FeatureType},
+    FeatureType.translate: _analyze_translate,
+    FeatureType.generate_answers: _analyze_answers,
+}
+
+@router.post(
+    "/analyze",
+    response_model=AIProcessResponse
+)
+async def analyze_document(request: Request, payload: AnalyzerRequest):
+
+    # Step 1 — Envelope contract (payload tag matches action, word bounds);
+    # daily usage is enforced by the AI rate limiter, not a client snapshot
+
+    try:
+        validate_analyzer_contract(payload)
     except ValueError as e:
         raise HTTPException(
             status_code=400,
@@ -72,12 +515,292 @@ def process_document(request: Request, payload: AIProcessRequest):
                 "message": str(e),
             }
         )
+    text, stats = validate_text_with_stats(payload.document.text)
+
+    # Steps 2-5 — Dispatch straight to the action's handler
+
+    try:
+        return await ANALYZE_HANDLERS[payload.action](request, text, stats, payload.payload)
+    except Exception as e:
+        raise _to_http_error(e)
+
+# v2 Route (cache-friendly prompt layout)
+
+@router_v2.post(
+    "/process",
+    response_model=AIProcessResponse
+)
+async def process_document_v2(request: Request, payload: AIProcessRequest):
+
+    # Step 1 — Deterministic input validation
+    
+    text, stats = validate_text_with_stats(payload.text)
+    try:
+        output, route = await _run_feature(
+            request,
+            text,
+            payload.feature,
+            word_count=stats.words,
+            questions=payload.questions,
+            target_language=payload.target_language,
+            contract=PROMPT_CONTRACT_V2,
+        )
+        items = _numbered_items(
+            payload.feature,
+            output,
+            word_count=stats.words,
+            questions=payload.questions,
+        )
+        return AIProcessResponse(result=output, route=route.name, items=items)
+    except Exception as e:
+        raise _to_http_error(e)
+
+# Streaming Route (Server-Sent Events)
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _stream_events(
+    prompt: str,
+    feature: FeatureType,
+    route: Route,
+    count_range: Optional[tuple[int, int]] = None,
+):
+    """
+    Forwards provider deltas as SSE.
+    Numbered-list features emit one validated item at a time and fail
+    as soon as the item count leaves count_range;
+    the full result is validated again at stream end.
+    """
+    parser, validate = None, None
+    if feature in NUMBERED_LIST_FEATURES:
+        parser = NumberedListStream(count_range)
+        validate = partial(_parse_numbered, count_range=count_range)
+    parts: list[str] = []
+    try:
+        async for delta in ai_client.stream_async(
+            prompt, max_tokens=route.max_tokens, model=route.model, validate=validate
+        ):
+            parts.append(delta)
+            if parser is None:
+                yield _sse_event("delta", {"text": delta})
+                continue
+            for item in parser.feed(delta):
+                yield _sse_event("item", {"text": item})
+        if parser is not None:
+            for item in parser.close():
+                yield _sse_event("item", {"text": item})
+        result = "".join(parts).strip()
+        validate_structured_text_response(result)
+        yield _sse_event("done", {"result": result, "route": route.name})
+    except HTTPException as e:
+        yield _sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+    except ValueError as e:
+        yield _sse_event("error", {
+            "status_code": 502,
+            "detail": {"error": "invalid_ai_output", "message": str(e)},
+        })
     except Exception:
-        # Never leak internal details
+        yield _sse_event("error", {
+            "status_code": 500,
+            "detail": {"error": "internal_error", "message": "Unexpected processing error."},
+        })
+
+@router.post("/process/stream")
+async def process_document_stream(request: Request, payload: AIProcessRequest):
+
+    # Steps 1-4 mirror /process; failures here are plain HTTP errors
+    # because no stream has been opened yet.
+
+    text, stats = validate_text_with_stats(payload.text)
+    try:
+        prompt = process_with_ai(
+            text=text,
+            feature=payload.feature,
+            questions=payload.questions,
+            target_language=payload.target_language,
+            stats=stats,
+        )
+        input_tokens = estimate_tokens(text)
+        max_tokens = size_max_tokens(
+            payload.feature,
+            input_tokens,
+            word_count=stats.words,
+            questions=payload.questions,
+        )
+    except ValueError as e:
         raise HTTPException(
-            status_code=500,
+            status_code=400,
             detail={
-                "error": "internal_error",
-                "message": "Unexpected processing error.",
+                "error": "invalid_request",
+                "message": str(e),
             }
         )
+    cached, route = await ai_client.lookup_routed_async(
+        prompt, payload.feature, input_tokens, max_tokens
+    )
+    if cached is None:
+        rate_limit_ai(request, payload.feature)
+    count_range = None
+    if payload.feature in NUMBERED_LIST_FEATURES:
+        count_range = numbered_list_count_range(
+            payload.feature,
+            word_count=stats.words,
+            questions=payload.questions,
+        )
+
+    # Step 5 — Stream AI output as it is generated
+
+    return StreamingResponse(
+        _stream_events(prompt, payload.feature, route, count_range),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+# Batch Route (one document, several features)
+
+MAX_BATCH_FEATURES = len(FeatureType)
+
+class FeatureSpec(BaseModel):
+    feature: FeatureType
+    word_count: Optional[int] = None  # Ignored: counted server-side
+    questions: Optional[List[str]] = None
+    target_language: Optional[str] = None
+class AIBatchRequest(BaseModel):
+    text: str
+    features: List[FeatureSpec] = Field(..., min_length=1, max_length=MAX_BATCH_FEATURES)
+
+    # Emit results as SSE in completion order instead of one JSON body
+    
+    stream: bool = False
+    @field_validator("text")
+    @classmethod
+    def strip_text(cls, v: str) -> str:
+        return v.strip()
+class AIBatchItem(BaseModel):
+    index: int
+    feature: FeatureType
+    status_code: int
+    result: Optional[str] = None
+    route: Optional[str] = None
+    items: Optional[List[str]] = None
+    error: Optional[dict | str] = None
+class AIBatchResponse(BaseModel):
+    results: List[AIBatchItem]
+
+def _prepare_batch_item(text: str, stats: TextStats, spec: FeatureSpec) -> _PreparedFeature | Exception:
+    """
+    A bad spec is returned, not raised, and fails only its own item.
+    """
+    try:
+        return _prepare_feature(
+            text,
+            spec.feature,
+            word_count=stats.words,
+            questions=spec.questions,
+            target_language=spec.target_language,
+        )
+    except Exception as e:
+        return e
+
+async def _lookup_batch_item(
+    call: _PreparedFeature | Exception,
+) -> tuple[Optional[str], Route] | None:
+    if isinstance(call, Exception):
+        return None
+    return await _lookup_feature(call)
+
+async def _run_batch_item(
+    index: int,
+    spec: FeatureSpec,
+    stats: TextStats,
+    prepared: _PreparedFeature | Exception,
+    lookup: tuple[Optional[str], Route] | None,
+) -> AIBatchItem:
+    """
+    Finishes one feature of a charged batch; failures become per-item
+    errors so one bad feature never fails the rest of the batch.
+    """
+    try:
+        if isinstance(prepared, Exception):
+            raise prepared
+        output, route = lookup
+        if output is None:
+            output = await _generate_feature(prepared, route)
+        items = _numbered_items(
+            spec.feature,
+            output,
+            word_count=stats.words,
+            questions=spec.questions,
+        )
+        return AIBatchItem(
+            index=index,
+            feature=spec.feature,
+            status_code=200,
+            result=output,
+            route=route.name,
+            items=items,
+        )
+    except Exception as e:
+        error = _to_http_error(e)
+        return AIBatchItem(
+            index=index,
+            feature=spec.feature,
+            status_code=error.status_code,
+            error=error.detail,
+        )
+
+async def _stream_batch(tasks: list[asyncio.Task]):
+    for next_done in asyncio.as_completed(tasks):
+        item = await next_done
+        yield _sse_event("result", item.model_dump(mode="json"))
+    yield _sse_event("done", {"count": len(tasks)})
+
+@router.post(
+    "/process/batch",
+    response_model=AIBatchResponse
+)
+async def process_document_batch(request: Request, payload: AIBatchRequest):
+
+    # Step 1 — Validate the shared text once for every feature
+    
+    text, stats = validate_text_with_stats(payload.text)
+
+    # Steps 2-3 — Build every prompt once and check the cache
+
+    prepared = [_prepare_batch_item(text, stats, spec) for spec in payload.features]
+    lookups = await asyncio.gather(*(_lookup_batch_item(call) for call in prepared))
+
+    # Step 4 — One charge per distinct uncached prompt, admitted or
+    # rejected as a whole; a heavy feature among them makes it heavy
+
+    misses = {
+        (call.prompt, call.system): call.feature
+        for call, lookup in zip(prepared, lookups)
+        if lookup is not None and lookup[0] is None
+    }
+    if misses:
+        heavy = [feature for feature in misses.values() if _is_heavy_feature(feature)]
+        rate_limit_ai(request, heavy[0] if heavy else next(iter(misses.values())), cost=len(misses))
+
+    # Step 5 — Run the uncached features concurrently
+    # (latency is the slowest feature, not the sum; identical
+    # prompts share one provider call)
+
+    tasks = [
+        asyncio.ensure_future(_run_batch_item(index, spec, stats, call, lookup))
+        for index, (spec, call, lookup) in enumerate(zip(payload.features, prepared, lookups))
+    ]
+    if payload.stream:
+        return StreamingResponse(
+            _stream_batch(tasks),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            },
+        )
+    return AIBatchResponse(results=await asyncio.gather(*tasks))
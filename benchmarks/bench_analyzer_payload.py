@@ -0,0 +1,81 @@
+import json
+import timeit
+from typing import Optional
+from pydantic import BaseModel, ValidationError
+from src.schema import (
+    AnalyzerRequest,
+    AnswerGenerationRequest,
+    ConversionRequest,
+    DocumentPayload,
+    ExplanationRequest,
+    FeatureType,
+    GrammarCorrectionRequest,
+    QuestionGenerationRequest,
+    SummarizationRequest,
+    TranslationRequest,
+    UserTier,
+)
+"""
+ANALYZER PAYLOAD PARSE BENCHMARK
+Parses AnalyzerRequest JSON with the previous plain payload union
+(every member tried in turn) and with the feature-tagged union, on
+valid and invalid payloads. The first and last union members bound
+the plain union's best and worst case.
+Usage:
+    python -m benchmarks.bench_analyzer_payload
+"""
+
+class PlainUnionAnalyzerRequest(BaseModel):
+    user_tier: UserTier
+    action: FeatureType
+    document: DocumentPayload
+    payload: Optional[ConversionRequest|SummarizationRequest|GrammarCorrectionRequest|TranslationRequest
+|ExplanationRequest|QuestionGenerationRequest|AnswerGenerationRequest]
+
+DOCUMENT = {
+    "text": "Solar panels convert sunlight into electricity.",
+    "metadata": {
+        "input_format": "txt",
+        "file_size_mb": 0.1,
+        "extracted_word_count": 6,
+        "ocr_used": False,
+    },
+}
+
+CASES = {
+    "valid convert (first member)": {"feature": "convert", "output_format": "txt"},
+    "valid answers (last member)": {
+        "feature": "generate_answers",
+        "questions": [f"{i}. Question {i}?" for i in range(1, 7)],
+    },
+    "invalid: unknown feature": {"feature": "paraphrase"},
+    "invalid: translate w/o language": {"feature": "translate"},
+}
+
+def body(payload: dict) -> str:
+    return json.dumps({
+        "user_tier": "free",
+        "action": payload["feature"],
+        "document": DOCUMENT,
+        "payload": payload,
+    })
+
+def parse(model: type[BaseModel], raw: str) -> None:
+    try:
+        model.model_validate_json(raw)
+    except ValidationError:
+        pass
+
+def main() -> None:
+    number = 20_000
+    print(f"{'case':<34}  {'plain union us':>14}  {'tagged us':>10}  {'speedup':>8}")
+    for name, payload in CASES.items():
+        raw = body(payload)
+        timings = [
+            min(timeit.repeat(lambda: parse(model, raw), number=number, repeat=5)) / number * 1_000_000
+            for model in (PlainUnionAnalyzerRequest, AnalyzerRequest)
+        ]
+        print(f"{name:<34}  {timings[0]:>14.2f}  {timings[1]:>10.2f}  {timings[0] / timings[1]:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
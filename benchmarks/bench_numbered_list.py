@@ -0,0 +1,59 @@
+import argparse
+import timeit
+from src.validation import NumberedListStream, parse_numbered_list, validate_numbered_list_response
+"""
+NUMBERED LIST PARSING BENCHMARK
+Compares the previous path (split the finished completion into lines,
+then validate through the NumberedListResponse model) with:
+- items: NumberedListStream.parse on the whole string (what the
+  /process, /analyze and batch routes run)
+- whole: parse_numbered_list on the whole string (items + model)
+- deltas: parse_numbered_list on a stream of small deltas, as the
+  provider delivers them to /process/stream
+speedup is pydantic / items.
+Usage:
+    python -m benchmarks.bench_numbered_list --items 6,50 --delta 8
+"""
+
+def completion(items: int) -> str:
+    return "\n".join(
+        f"{i}. What role does component {i} play in the overall system design?"
+        for i in range(1, items + 1)
+    )
+
+def pydantic_path(output: str) -> list[str]:
+    lines = [line.strip() for line in output.strip().split("\n") if line.strip()]
+    return validate_numbered_list_response(lines).items
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", default="6,50")
+    parser.add_argument("--delta", type=int, default=8, help="characters per streamed delta")
+    args = parser.parse_args()
+    print(
+        f"{'items':>6}  {'pydantic us':>12}  {'items us':>10}  {'whole us':>10}  "
+        f"{'deltas us':>10}  {'speedup':>8}"
+    )
+    for count in (int(n) for n in args.items.split(",")):
+        output = completion(count)
+        deltas = [output[i:i + args.delta] for i in range(0, len(output), args.delta)]
+        assert NumberedListStream().parse(output) == pydantic_path(output)
+        assert parse_numbered_list(output).items == pydantic_path(output)
+        assert parse_numbered_list(deltas).items == pydantic_path(output)
+        number = max(1, 20_000 // count)
+        timings = []
+        for fn in (
+            lambda: pydantic_path(output),
+            lambda: NumberedListStream().parse(output),
+            lambda: parse_numbered_list(output),
+            lambda: parse_numbered_list(deltas),
+        ):
+            best = min(timeit.repeat(fn, number=number, repeat=9)) / number
+            timings.append(best * 1_000_000)
+        print(
+            f"{count:>6}  {timings[0]:>12.1f}  {timings[1]:>10.1f}  {timings[2]:>10.1f}  "
+            f"{timings[3]:>10.1f}  {timings[0] / timings[1]:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
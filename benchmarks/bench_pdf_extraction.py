@@ -0,0 +1,100 @@
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import tempfile
+import time
+from itertools import chain
+from pathlib import Path
+import fitz
+from src.extraction import _extract_pdf_pages, _page_ranges
+"""
+PDF EXTRACTION BENCHMARK
+Wall time to extract synthetic 10-, 100- and 1000-page PDFs with:
+- the previous loop (text += page.get_text(), handle never closed)
+- one process, page texts collected in a list and joined once
+- page ranges split across 1..N spawned worker processes
+Pools are warmed before timing, as the service's shared pool is.
+Parallel speedup is bounded by the cores available (reported below).
+Usage:
+    python -m benchmarks.bench_pdf_extraction --pages 10,100,1000 --workers 1,2,4
+"""
+
+LINE = "Solar panels convert sunlight into electricity at about 20% efficiency."
+
+def make_pdf(directory: Path, pages: int) -> Path:
+    path = directory / f"synthetic_{pages}.pdf"
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        for row in range(40):
+            page.insert_text((36, 36 + row * 18), f"{number}.{row} {LINE}", fontsize=9)
+    doc.save(path)
+    doc.close()
+    return path
+
+def legacy_extract(path: Path) -> str:
+    doc = fitz.open(path)
+    text = ""
+    for page in doc:
+        text += page.get_text()
+    return text.strip()
+
+def sequential_extract(path: Path) -> str:
+    with fitz.open(path) as doc:
+        return "".join([page.get_text() for page in doc]).strip()
+
+def parallel_extract(path: Path, pool: concurrent.futures.ProcessPoolExecutor, workers: int) -> str:
+    with fitz.open(path) as doc:
+        page_count = doc.page_count
+    futures = [
+        pool.submit(_extract_pdf_pages, str(path), start, stop)
+        for start, stop in _page_ranges(page_count, workers)
+    ]
+    return "".join(chain.from_iterable(f.result() for f in futures)).strip()
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", default="10,100,1000")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    print(f"cores available: {os.cpu_count()}")
+    header = f"{'pages':>6}  {'legacy ms':>10}  {'list+join ms':>12}"
+    header += "".join(f"  {f'{w} proc ms':>10}" for w in worker_counts)
+    print(header)
+    context = multiprocessing.get_context("spawn")
+    pools = {
+        w: concurrent.futures.ProcessPoolExecutor(max_workers=w, mp_context=context)
+        for w in worker_counts
+    }
+    try:
+        for w, pool in pools.items():
+            list(pool.map(abs, range(w)))
+        with tempfile.TemporaryDirectory() as tmp:
+            for pages in (int(p) for p in args.pages.split(",")):
+                path = make_pdf(Path(tmp), pages)
+                expected = sequential_extract(path)
+                row = [best_of(lambda: legacy_extract(path), args.repeat),
+                       best_of(lambda: sequential_extract(path), args.repeat)]
+                for w, pool in pools.items():
+                    assert parallel_extract(path, pool, w) == expected
+                    row.append(best_of(lambda: parallel_extract(path, pool, w), args.repeat))
+                line = f"{pages:>6}  {row[0]:>10.1f}  {row[1]:>12.1f}"
+                line += "".join(f"  {t:>10.1f}" for t in row[2:])
+                print(line)
+    finally:
+        for pool in pools.values():
+            pool.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from src.schema import FeatureType
+from src.ai_client import SYSTEM_MESSAGE
+from src.ai_processing import build_prompt, build_prompt_messages
+from src.tokens import estimate_tokens
+"""
+PROMPT PREFIX BENCHMARK
+For each feature, builds two requests that differ in every dynamic input
+(document, word count, questions, target language) and measures the
+byte-identical prefix of the serialized chat messages, i.e. what a
+provider-side prompt cache can reuse. Compares v1 and v2 layouts.
+Usage:
+    python -m benchmarks.bench_prompt_prefix
+"""
+
+# OpenAI only caches prompts whose shared prefix reaches this length
+
+PROVIDER_CACHE_MIN_TOKENS = 1024
+
+VARIANTS = (
+    {
+        "text": "Solar panels convert sunlight into electricity.",
+        "word_count": 120,
+        "questions": ["1. What do solar panels convert?"],
+        "target_language": "French",
+    },
+    {
+        "text": "Wind turbines turn moving air into power.",
+        "word_count": 520,
+        "questions": ["1. What do wind turbines use?"],
+        "target_language": "German",
+    },
+)
+
+def serialize(system: str, user: str) -> str:
+    return f"system:{system}\nuser:{user}"
+
+def common_prefix(a: str, b: str) -> str:
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return a[:length]
+
+def main() -> None:
+    print(f"{'feature':<20}{'v1 prefix tok':>15}{'v2 prefix tok':>15}{'v2 static tok':>15}  cacheable")
+    for feature in FeatureType:
+        v1 = [serialize(SYSTEM_MESSAGE, build_prompt(feature=feature, **v)) for v in VARIANTS]
+        messages = [build_prompt_messages(feature=feature, **v) for v in VARIANTS]
+        v2 = [serialize(m.system, m.user) for m in messages]
+        v1_prefix = estimate_tokens(common_prefix(*v1))
+        v2_prefix = estimate_tokens(common_prefix(*v2))
+        static = estimate_tokens(messages[0].system)
+        cacheable = "yes" if v2_prefix >= PROVIDER_CACHE_MIN_TOKENS else f"no (<{PROVIDER_CACHE_MIN_TOKENS})"
+        print(f"{feature.value:<20}{v1_prefix:>15}{v2_prefix:>15}{static:>15}  {cacheable}")
+
+if __name__ == "__main__":
+    main()
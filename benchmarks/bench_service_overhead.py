@@ -0,0 +1,72 @@
+import os
+
+# Select the network-free backend before the app (and its AIClient) is imported
+
+os.environ.setdefault("AI_PROVIDER", "fake")
+os.environ.setdefault("AI_FAKE_LATENCY_MS", "200")
+
+import argparse
+import asyncio
+import time
+import httpx
+from backend import rate_limit
+from backend.api import app
+from src.ai_client import AI_PROVIDER
+"""
+SERVICE OVERHEAD BENCHMARK
+Drives POST /api/v1/process in-process against the fake provider and
+reports throughput and latency per concurrency level. With a fixed fake
+latency, (observed latency - fake latency) is the service's own overhead.
+Usage:
+    python -m benchmarks.bench_service_overhead --concurrency 1,10,100 --requests 500
+"""
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_level(concurrency: int, total: int, run_id: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int) -> None:
+
+            # Unique text per request so every call reaches the provider
+
+            payload = {"text": f"Benchmark document {run_id} {i} about solar power", "feature": "summarize"}
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/process", json=payload)
+                latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    fake_ms = float(os.environ["AI_FAKE_LATENCY_MS"])
+    return {
+        "concurrency": concurrency,
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "overhead_p50_ms": round(percentile(latencies, 50) * 1000 - fake_ms, 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", default="1,10,100")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    if AI_PROVIDER != "fake":
+        raise SystemExit("Refusing to benchmark against a real provider; set AI_PROVIDER=fake")
+
+    # The per-IP limiter would cap the run at a few requests
+
+    rate_limit.AI_RATE_LIMIT = rate_limit.HEAVY_FEATURE_LIMIT = 10**9
+    for run_id, level in enumerate(int(c) for c in args.concurrency.split(",")):
+        print(asyncio.run(run_level(level, args.requests, run_id)))
+
+if __name__ == "__main__":
+    main()
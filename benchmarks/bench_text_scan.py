@@ -0,0 +1,64 @@
+import argparse
+import string
+import timeit
+from src.ai_validation import scan_text
+"""
+TEXT SCAN BENCHMARK
+Compares the previous multi-pass validation (strip, per-character
+printable check, letter list, split) with a pure-Python single loop and
+with scan_text (C-level bytes.translate / count / regex passes).
+Usage:
+    python -m benchmarks.bench_text_scan --sizes 10000,1000000
+"""
+
+SAMPLE = (
+    "Solar panels convert sunlight into electricity. Output depends on\n"
+    "irradiance, panel angle and temperature; efficiency is about 20%.\n\n"
+)
+
+def legacy_scan(text: str) -> tuple:
+    trimmed = text.strip()
+    printable = all(c in string.printable for c in trimmed)
+    letters = len([c for c in trimmed if c.isalpha()])
+    words = len(trimmed.split())
+    return len(trimmed), printable, letters, words
+
+def python_single_pass(text: str) -> tuple:
+    printable = True
+    letters = words = 0
+    in_word = False
+    for c in text:
+        if c.isspace():
+            in_word = False
+            continue
+        if not in_word:
+            words += 1
+            in_word = True
+        if c.isalpha():
+            letters += 1
+        elif c not in string.printable:
+            printable = False
+    return printable, letters, words
+
+def document(size: int) -> str:
+    return (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,1000000")
+    args = parser.parse_args()
+    print(f"{'chars':>10}  {'legacy ms':>10}  {'py loop ms':>10}  {'scan_text ms':>12}  {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        text = document(size)
+        number = max(1, 2_000_000 // size)
+        timings = []
+        for fn in (legacy_scan, python_single_pass, scan_text):
+            best = min(timeit.repeat(lambda: fn(text), number=number, repeat=5)) / number
+            timings.append(best * 1000)
+        print(
+            f"{size:>10}  {timings[0]:>10.3f}  {timings[1]:>10.3f}  "
+            f"{timings[2]:>12.3f}  {timings[0] / timings[2]:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
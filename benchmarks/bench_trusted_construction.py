@@ -0,0 +1,81 @@
+import argparse
+import timeit
+from src.schema import (
+    DocumentMetadata,
+    DocumentPayload,
+    InputFormat,
+    StructuredTextResponse,
+)
+from src.validation import construct_trusted, validate_structured_text_response
+"""
+TRUSTED CONSTRUCTION BENCHMARK
+Per-request cost of building the pipeline's own schema objects:
+full validation (field validators + strip_whitespace copying the text)
+versus construct_trusted (model_construct over already-checked values).
+Covers the extraction payload (DocumentMetadata + DocumentPayload) and
+the StructuredTextResponse built for every AI result. The trusted
+path wins in proportion to text size (no second copy of the text);
+for small texts model_construct() and compiled validation cost about
+the same.
+Usage:
+    python -m benchmarks.bench_trusted_construction --sizes 6000,100000,1000000
+"""
+
+SAMPLE = "Solar panels convert sunlight into electricity at about 20% efficiency. "
+
+def document(size: int) -> str:
+    return "  " + (SAMPLE * (size // len(SAMPLE) + 1))[:size] + "\n"
+
+def build_payload(build, raw: str) -> DocumentPayload:
+
+    # Both paths strip once up front, as build_document_payload does
+    # for its emptiness check; only the trusted path reuses the result
+
+    text = raw.strip()
+    if not text:
+        raise ValueError("File is empty")
+    metadata = build(
+        DocumentMetadata,
+        input_format=InputFormat.txt,
+        file_size_mb=0.5,
+        extracted_word_count=1000,
+        ocr_used=False,
+    )
+    return build(DocumentPayload, text=text if build is construct_trusted else raw, metadata=metadata)
+
+def validated(model, **values):
+    return model(**values)
+
+def legacy_structured_text_response(content: str) -> StructuredTextResponse:
+    if not content or not content.strip():
+        raise ValueError("Response content cannot be empty")
+    return StructuredTextResponse(content=content)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="6000,100000,1000000")
+    args = parser.parse_args()
+    print(
+        f"{'chars':>10}  {'payload full us':>15}  {'trusted us':>10}  "
+        f"{'response full us':>16}  {'trusted us':>10}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        raw = document(size)
+        number = max(10, 20_000_000 // size)
+        cases = (
+            lambda: build_payload(validated, raw),
+            lambda: build_payload(construct_trusted, raw),
+            lambda: legacy_structured_text_response(raw),
+            lambda: validate_structured_text_response(raw),
+        )
+        timings = [
+            min(timeit.repeat(case, number=number, repeat=7)) / number * 1_000_000
+            for case in cases
+        ]
+        print(
+            f"{size:>10}  {timings[0]:>15.2f}  {timings[1]:>10.2f}  "
+            f"{timings[2]:>16.2f}  {timings[3]:>10.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
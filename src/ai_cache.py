@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import os
+import sys
+import time
+"""
+AI RESPONSE CACHE — v1
+Responsibilities:
+- Reuse deterministic completions (temperature=0.0, fixed model + system message)
+- Bound memory by entry count, byte size and TTL
+- Report hit / miss / eviction counters
+This module MUST NOT:
+- Build or modify prompts
+- Validate AI output (only validated results are stored)
+"""
+
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+AI_CACHE_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+AI_CACHE_TTL_SECONDS = float(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))
+
+# Cache Key
+
+def completion_key(model: str, max_tokens: int, system: str, prompt: str) -> str:
+    """
+    Stable content hash of everything that determines a completion.
+    Fields are length-prefixed so no two inputs share a key.
+    """
+    digest = hashlib.sha256()
+    for part in (model, str(max_tokens), system, prompt):
+        encoded = part.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+# In-Process LRU / TTL Cache
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with TTL and byte-size bound.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = AI_CACHE_MAX_ENTRIES,
+        max_bytes: int = AI_CACHE_MAX_BYTES,
+        ttl_seconds: float = AI_CACHE_TTL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, *, record_miss: bool = True) -> str | None:
+        """
+        record_miss=False is for pre-checks that are followed by
+        a counted lookup, so one request never counts two misses.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += record_miss
+                return None
+            value, expires_at, size = entry
+            if self._clock() >= expires_at:
+                self._remove(key, size)
+                self.evictions += 1
+                self.misses += record_miss
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if self.max_entries < 1 or size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._remove(key, previous[2])
+            self._entries[key] = (value, self._clock() + self.ttl_seconds, size)
+            self._bytes += size
+
+            # Evict least recently used until both bounds hold
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key, (_, _, oldest_size) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_size)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: str, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
@@ -1,17 +1,277 @@
 from fastapi import HTTPException
-from openai import OpenAI
+import httpx
+import openai
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+import asyncio
 import concurrent.futures
+import importlib.util
+import os
+from threading import Lock
+from typing import Callable
 from src.validation import (
     validate_structured_text_response,
 )
+from src.ai_cache import ResponseCache, completion_key
+from src.completion_store import CompletionStore, default_completion_store
+from src.single_flight import SingleFlight
+from src.resilience import CircuitOpenError, ResilientCaller
+from src.providers import AIProvider, CompletionRequest, CompletionTruncatedError, FakeProvider
+from src.routing import AI_ROUTING_MIN_SAMPLES, LoadSignals, ModelRouter, Route
+from src.schema import FeatureType
+from src.tokens import ensure_context_budget, estimate_prompt_tokens
 AI_MODEL = "gpt-4o-mini"
 MAX_COMPLETION_TOKENS = 1200
 AI_TIMEOUT_SECONDS = 12
 PROVIDER_TIMEOUT_SECONDS = 25
+SYSTEM_MESSAGE = "You are a strict document processing AI."
 
-# OpenAI client with provider-level timeout
+# Provider backend: "openai" (default) or "fake" (network-free load testing)
+
+AI_PROVIDER = os.getenv("AI_PROVIDER", "openai").lower()
+
+# Process-wide worker pool size for sync provider calls
+
+AI_EXECUTOR_MAX_WORKERS = int(os.getenv("AI_EXECUTOR_MAX_WORKERS", "32"))
+
+# Provider HTTP connection pool
+
+AI_HTTP_MAX_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "100"))
+AI_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+AI_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+AI_HTTP2 = os.getenv("AI_HTTP2", "false").lower() == "true"
+
+# Connections opened per client by warm-up
+
+AI_WARMUP_CONNECTIONS = int(os.getenv("AI_WARMUP_CONNECTIONS", "4"))
+WARMUP_TIMEOUT_SECONDS = 5
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=AI_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+)
+
+# HTTP/2 needs the optional "h2" package (pip install "httpx[http2]");
+# without it the pool stays on HTTP/1.1 rather than failing to start.
+
+HTTP2_ENABLED = AI_HTTP2 and importlib.util.find_spec("h2") is not None
+
+# OpenAI clients with provider-level timeout
+# (sync client for threaded callers, async client for the event loop).
+# SDK-level retries are disabled: retries are owned by ResilientCaller
+# so they stay inside AI_TIMEOUT_SECONDS and feed the circuit breaker.
+
+# Not created for the fake backend, so it runs without credentials.
+
+if AI_PROVIDER == "openai":
+    client = OpenAI(
+        timeout=PROVIDER_TIMEOUT_SECONDS,
+        max_retries=0,
+        http_client=DefaultHttpxClient(limits=HTTP_LIMITS, http2=HTTP2_ENABLED),
+    )
+    async_client = AsyncOpenAI(
+        timeout=PROVIDER_TIMEOUT_SECONDS,
+        max_retries=0,
+        http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS, http2=HTTP2_ENABLED),
+    )
+else:
+    client = None
+    async_client = None
+
+# Provider failures worth retrying (network, throttling, 5xx)
+
+TRANSIENT_PROVIDER_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    ConnectionError,
+)
+
+def is_transient_provider_error(error: Exception) -> bool:
+    return isinstance(error, TRANSIENT_PROVIDER_ERRORS)
+
+# OpenAI Backend
+
+class OpenAIProvider(AIProvider):
+    """
+    Default backend on the module-level OpenAI clients.
+    """
+
+    name = "openai"
+
+    def complete(self, request: CompletionRequest) -> str:
+        response = client.chat.completions.create(
+            model=request.model,
+            messages=self._build_messages(request),
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+        )
+        return self._extract_content(response)
+
+    async def complete_async(self, request: CompletionRequest) -> str:
+        response = await async_client.chat.completions.create(
+            model=request.model,
+            messages=self._build_messages(request),
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+        )
+        return self._extract_content(response)
+
+    async def stream_async(self, request: CompletionRequest):
+        stream = await async_client.chat.completions.create(
+            model=request.model,
+            messages=self._build_messages(request),
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            stream=True,
+        )
+        finish_reason = None
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            if choice.delta.content:
+                yield choice.delta.content
+        if finish_reason == "length":
+            raise CompletionTruncatedError("AI completion stopped at max_tokens")
+
+    def warm_up(self) -> None:
+        """
+        Opens a pooled connection (DNS + TLS) for the sync client.
+        Any HTTP response counts: the goal is the connection, not the data.
+        """
+        try:
+            client.with_options(timeout=WARMUP_TIMEOUT_SECONDS).models.list()
+        except openai.APIStatusError:
+            pass
+
+    async def warm_up_async(self) -> None:
+        """
+        Opens AI_WARMUP_CONNECTIONS pooled connections for the async client.
+        """
+        warm_client = async_client.with_options(timeout=WARMUP_TIMEOUT_SECONDS)
+        results = await asyncio.gather(
+            *(warm_client.models.list() for _ in range(AI_WARMUP_CONNECTIONS)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, openai.APIStatusError):
+                raise result
+
+    @staticmethod
+    def _build_messages(request: CompletionRequest) -> list[dict]:
+        return [
+            {
+                "role": "system",
+                "content": request.system
+            },
+            {
+                "role": "user",
+                "content": request.prompt
+            }
+        ]
+
+    @staticmethod
+    def _extract_content(response) -> str:
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            raise CompletionTruncatedError("AI completion stopped at max_tokens")
+        content = choice.message.content
+
+        if content is None:
+            raise HTTPException(
+                status_code=502,
+                detail="AI provider returned null content"
+            )
+        return content.strip()
+
+def default_provider() -> AIProvider:
+    if AI_PROVIDER == "fake":
+        return FakeProvider.from_env()
+    if AI_PROVIDER == "openai":
+        return OpenAIProvider()
+    raise ValueError(f"Unsupported AI provider: {AI_PROVIDER}")
+
+# Shared Provider Executor
+
+class ProviderExecutor:
+    """
+    Bounded, process-wide thread pool for sync provider calls.
+    Responsibilities:
+    - Reuse worker threads across requests
+    - Abandon timed-out calls without blocking the caller
+    - Report queue depth and active workers for pool sizing
+    """
+
+    def __init__(self, max_workers: int = AI_EXECUTOR_MAX_WORKERS):
+        if max_workers < 1:
+            raise ValueError("Executor requires at least one worker")
+        self.max_workers = max_workers
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ai-provider",
+        )
+        self._lock = Lock()
+        self._queued = 0
+        self._active = 0
+
+    def submit(self, fn, *args) -> concurrent.futures.Future:
+        with self._lock:
+            self._queued += 1
+        return self._executor.submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def abandon(self, future: concurrent.futures.Future) -> None:
+        """
+        Drops interest in a future without waiting for it.
+        Queued calls are cancelled; running calls finish in the
+        background and their result is discarded.
+        """
+        if future.cancel():
+            with self._lock:
+                self._queued -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "active_workers": self._active,
+            }
+
+    def shutdown(self) -> None:
+        """
+        Stops accepting calls without waiting. Calls already queued
+        still run: cancelling them would surface as CancelledError
+        in the callers waiting on them.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=False)
+
+_executor = ProviderExecutor()
+
+def configure_executor(max_workers: int) -> None:
+    """
+    Replaces the shared executor with one of a new size.
+    In-flight calls on the previous pool are left to finish.
+    """
+    global _executor
+    previous = _executor
+    _executor = ProviderExecutor(max_workers)
+    previous.shutdown()
+
+def get_executor_stats() -> dict:
+    return _executor.stats()
 
-client = OpenAI(timeout=PROVIDER_TIMEOUT_SECONDS)
 class AIClient:
     """
     Low-level AI execution layer.
@@ -26,77 +286,479 @@ class AIClient:
     - Decide tone or structure
     """
 
-    def generate(self, prompt: str) -> str:
-        if not prompt or not prompt.strip():
-            raise HTTPException(
-                status_code=500,
-                detail="Empty prompt passed to AI client"
+    def __init__(
+        self,
+        cache: ResponseCache | None = None,
+        store: CompletionStore | None = None,
+        resilience: ResilientCaller | None = None,
+        provider: AIProvider | None = None,
+        router: ModelRouter | None = None,
+    ):
+        self.provider = provider or default_provider()
+        self.cache = cache if cache is not None else ResponseCache()
+
+        # Optional host-wide persistent layer beneath the memory cache
+
+        self.store = store if store is not None else default_completion_store()
+
+        # Identical concurrent prompts share one provider call
+
+        self.flights = SingleFlight()
+
+        # Retries, circuit breaker and hedging around provider calls
+
+        self.resilience = resilience or ResilientCaller(is_transient_provider_error)
+
+        # Model / budget selection from the policy table and live load
+
+        self.router = router or ModelRouter.from_env(AI_MODEL)
+
+    # Routing
+
+    def load_signals(self) -> LoadSignals:
+        """
+        Live load as seen by this client. Latency and error rate are
+        withheld until the windows hold enough samples to mean anything.
+        """
+        resilience = self.resilience
+        sampled = len(resilience.latencies) >= AI_ROUTING_MIN_SAMPLES
+        judged = len(resilience.outcomes) >= AI_ROUTING_MIN_SAMPLES
+        return LoadSignals(
+            in_flight=self.flights.stats()["in_flight"],
+            latency_p95_seconds=resilience.latencies.quantile(0.95) if sampled else None,
+            error_rate=resilience.outcomes.error_rate() if judged else None,
+        )
+
+    def select_route(self, feature: FeatureType, input_tokens: int, max_tokens: int) -> Route:
+        return self.router.select(feature, input_tokens, max_tokens, self.load_signals())
+
+    async def lookup_routed_async(
+        self,
+        prompt: str,
+        feature: FeatureType,
+        input_tokens: int,
+        max_tokens: int,
+        *,
+        system: str | None = None,
+    ) -> tuple[str | None, Route]:
+        """
+        Selects a route and checks the cache for this prompt.
+        The standard route's key is tried first, so shedding load to
+        another tier still serves the completions cached before it.
+        Returns the hit with the route it was cached under, or None
+        with the selected route.
+        """
+        route = self.select_route(feature, input_tokens, max_tokens)
+        for candidate in dict.fromkeys((self.router.standard(max_tokens), route)):
+            cached = await self.lookup_async(
+                prompt, max_tokens=candidate.max_tokens, system=system, model=candidate.model
+            )
+            if cached is not None:
+                return cached, candidate
+        return None, route
+
+    def cache_key(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> str:
+        return self._request_key(self._completion_request(prompt, max_tokens, system, model))
+
+    def lookup(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> str | None:
+        """
+        Returns a cached completion for this prompt, if any.
+        Lets callers skip cost controls for repeated requests.
+        """
+        key = self.cache_key(prompt, max_tokens=max_tokens, system=system, model=model)
+        return self._recall(key, record_miss=False)
+
+    def remember(
+        self,
+        prompt: str,
+        result: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> None:
+        """
+        Stores a completion produced outside generate()
+        (e.g. one segment of a batched prompt) under this prompt's key.
+        """
+        key = self.cache_key(prompt, max_tokens=max_tokens, system=system, model=model)
+        self._remember(key, self._ensure_result(result))
+
+    async def lookup_async(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> str | None:
+        """
+        lookup() for the event loop: store reads run in a thread.
+        """
+        key = self.cache_key(prompt, max_tokens=max_tokens, system=system, model=model)
+        return await self._recall_async(key, record_miss=False)
+
+    async def remember_async(
+        self,
+        prompt: str,
+        result: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> None:
+        key = self.cache_key(prompt, max_tokens=max_tokens, system=system, model=model)
+        await self._remember_async(key, self._ensure_result(result))
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> str:
+        request = self._prepare(prompt, max_tokens, system, model)
+        key = self._request_key(request)
+        cached = self._recall(key)
+        if cached is not None:
+            return cached
+        return self.flights.do(key, lambda: self._generate_uncached(request, key))
+
+    def _generate_uncached(self, request: CompletionRequest, key: str) -> str:
+
+        # Shared execution pool (timeout isolation).
+        # Timed-out or losing hedged calls are abandoned, never joined,
+        # so the 504 is returned at AI_TIMEOUT_SECONDS.
+        executor = _executor
+
+        try:
+            result = self.resilience.call(
+                lambda: executor.submit(self._call_provider, request),
+                executor.abandon,
+                timeout=AI_TIMEOUT_SECONDS,
             )
+            result = self._ensure_result(result)
+            self._remember(key, result)
+            return result
+
+        except CircuitOpenError:
+            raise self._unavailable_error()
+
+        except CompletionTruncatedError:
+            raise self._truncated_error()
+
+        # ResilientCaller raises the builtin TimeoutError, which the
+        # concurrent.futures / asyncio aliases only cover from 3.11
+
+        except (concurrent.futures.TimeoutError, TimeoutError):
+            raise self._timeout_error()
+
+        except HTTPException:
+            raise
 
-        # Controlled execution thread (timeout isolation)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(self._call_provider, prompt)
+        except Exception as e:
+            raise self._provider_error(e)
 
-            try:
-                result = future.result(timeout=AI_TIMEOUT_SECONDS)
+    async def generate_async(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+        validate: Callable[[str], object] | None = None,
+    ) -> str:
+        """
+        Event-loop native variant of generate().
+        No worker thread is held while the provider call is in flight;
+        the timeout is enforced with asyncio.wait_for.
+        validate runs the caller's output contract before the result
+        is cached; whatever it raises propagates and nothing is stored.
+        """
+        request = self._prepare(prompt, max_tokens, system, model)
+        key = self._request_key(request)
+        cached = await self._recall_async(key)
+        if cached is not None:
+            return cached
+        return await self.flights.do_async(
+            key, lambda: self._generate_uncached_async(request, key, validate)
+        )
+
+    async def _generate_uncached_async(
+        self,
+        request: CompletionRequest,
+        key: str,
+        validate: Callable[[str], object] | None = None,
+    ) -> str:
+        try:
+            result = await self.resilience.call_async(
+                lambda: self._call_provider_async(request),
+                timeout=AI_TIMEOUT_SECONDS,
+            )
+            result = self._ensure_result(result)
+            if validate is not None:
+                validate(result)
+            await self._remember_async(key, result)
+            return result
 
-                if not result or not result.strip():
-                    raise HTTPException(
-                        status_code=502,
-                        detail="AI returned empty response"
+        except CircuitOpenError:
+            raise self._unavailable_error()
+
+        except CompletionTruncatedError:
+            raise self._truncated_error()
+
+        except (asyncio.TimeoutError, TimeoutError):
+            raise self._timeout_error()
+
+        except HTTPException:
+            raise
+
+        except Exception as e:
+            raise self._provider_error(e)
+
+    async def stream_async(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+        validate: Callable[[str], object] | None = None,
+    ):
+        """
+        Yields completion deltas as the provider produces them.
+        AI_TIMEOUT_SECONDS bounds the wait for each chunk rather than
+        the whole generation. Cached completions are yielded whole,
+        and a completed stream is validated (validate included) and
+        cached like generate_async().
+        """
+        request = self._prepare(prompt, max_tokens, system, model)
+        key = self._request_key(request)
+        cached = await self._recall_async(key)
+        if cached is not None:
+            yield cached
+            return
+
+        breaker = self.resilience.breaker
+        if not breaker.allow():
+            raise self._unavailable_error()
+
+        parts: list[str] = []
+        try:
+            deltas = self.provider.stream_async(request).__aiter__()
+            while True:
+                try:
+                    delta = await asyncio.wait_for(
+                        deltas.__anext__(),
+                        timeout=AI_TIMEOUT_SECONDS,
                     )
+                except StopAsyncIteration:
+                    break
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            raise self._timeout_error()
 
-                # Deterministic response-level safety check
-                # (Structure validation happens upstream depending on feature)
-                validate_structured_text_response(result)
+        except HTTPException:
+            breaker.record_success()
+            raise
 
-                return result
+        except CompletionTruncatedError:
+            breaker.record_success()
+            raise self._truncated_error()
 
-            except concurrent.futures.TimeoutError:
-                raise HTTPException(
-                    status_code=504,
-                    detail={
-                        "error": "ai_timeout",
-                        "message": "AI provider did not respond in time"
-                    }
-                )
+        except Exception as e:
+            if is_transient_provider_error(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise self._provider_error(e)
 
-            except HTTPException:
-                raise
+        except BaseException:
 
-            except Exception as e:
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"AI provider error: {str(e)}"
-                )
+            # Client disconnected mid-stream; no verdict on provider health
 
-    def _call_provider(self, prompt: str) -> str:
+            breaker.release()
+            raise
+
+        breaker.record_success()
+        result = self._ensure_result("".join(parts).strip())
+        if validate is not None:
+            validate(result)
+        await self._remember_async(key, result)
+
+    def _call_provider(self, request: CompletionRequest) -> str:
         """
         Isolated provider call.
         Keeps timeout logic clean and testable.
         """
+        return self.provider.complete(request)
 
-        response = client.chat.completions.create(
-            model=AI_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict document processing AI."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+    async def _call_provider_async(self, request: CompletionRequest) -> str:
+        """
+        Isolated async provider call.
+        Mirrors _call_provider on the event loop.
+        """
+        return await self.provider.complete_async(request)
+
+    # Warm-up
+
+    async def warm_up_async(self) -> None:
+        """
+        Pre-opens provider connections for both the async and sync clients.
+        """
+        await self.provider.warm_up_async()
+        await asyncio.to_thread(self.provider.warm_up)
+
+    # Request preparation
+
+    def _prepare(
+        self,
+        prompt: str,
+        max_tokens: int | None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> CompletionRequest:
+        """
+        Rejects empty prompts and requests that cannot fit the model
+        context, before any cache or provider work.
+        """
+        self._ensure_prompt(prompt)
+        request = self._completion_request(prompt, max_tokens, system, model)
+        ensure_context_budget(
+            request.model,
+            estimate_prompt_tokens(request.system, request.prompt),
+            request.max_tokens,
+        )
+        return request
+
+    @staticmethod
+    def _completion_request(
+        prompt: str,
+        max_tokens: int | None = None,
+        system: str | None = None,
+        model: str | None = None,
+    ) -> CompletionRequest:
+        return CompletionRequest(
+            prompt=prompt,
+            model=model or AI_MODEL,
+            system=system or SYSTEM_MESSAGE,
+            max_tokens=max_tokens or MAX_COMPLETION_TOKENS,
             temperature=0.0,  # Deterministic output
-            max_tokens=MAX_COMPLETION_TOKENS,
         )
 
-        content = response.choices[0].message.content
+    @staticmethod
+    def _request_key(request: CompletionRequest) -> str:
+        return completion_key(request.model, request.max_tokens, request.system, request.prompt)
 
-        if content is None:
+    # Completion reuse (memory first, then the shared on-disk store)
+
+    def _recall(self, key: str, *, record_miss: bool = True) -> str | None:
+        cached = self.cache.get(key, record_miss=record_miss)
+        if cached is not None or self.store is None:
+            return cached
+        stored = self.store.get(key)
+        if stored is not None:
+            self.cache.set(key, stored)
+        return stored
+
+    def _remember(self, key: str, result: str) -> None:
+        self.cache.set(key, result)
+        if self.store is not None:
+            self.store.set(key, result)
+
+    # Async variants: SQLite calls block (up to the busy timeout),
+    # so they never run on the event loop
+
+    async def _recall_async(self, key: str, *, record_miss: bool = True) -> str | None:
+        cached = self.cache.get(key, record_miss=record_miss)
+        if cached is not None or self.store is None:
+            return cached
+        stored = await asyncio.to_thread(self.store.get, key)
+        if stored is not None:
+            self.cache.set(key, stored)
+        return stored
+
+    async def _remember_async(self, key: str, result: str) -> None:
+        self.cache.set(key, result)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, result)
+
+    # Shared helpers (identical behavior for sync + async paths)
+
+    @staticmethod
+    def _ensure_prompt(prompt: str) -> None:
+        if not prompt or not prompt.strip():
+            raise HTTPException(
+                status_code=500,
+                detail="Empty prompt passed to AI client"
+            )
+
+    @staticmethod
+    def _ensure_result(result: str) -> str:
+        if not result or not result.strip():
             raise HTTPException(
                 status_code=502,
-                detail="AI provider returned null content"
+                detail="AI returned empty response"
             )
-        return content.strip()
+
+        # Deterministic response-level safety check
+        # (Structure validation happens upstream depending on feature)
+        validate_structured_text_response(result)
+
+        return result
+
+    @staticmethod
+    def _timeout_error() -> HTTPException:
+        return HTTPException(
+            status_code=504,
+            detail={
+                "error": "ai_timeout",
+                "message": "AI provider did not respond in time"
+            }
+        )
+
+    def _unavailable_error(self) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail={
+                "error": "ai_unavailable",
+                "message": "AI provider is temporarily unavailable"
+            },
+            headers={"Retry-After": str(int(self.resilience.breaker.recovery_seconds))},
+        )
+
+    @staticmethod
+    def _truncated_error() -> HTTPException:
+        return HTTPException(
+            status_code=502,
+            detail={
+                "error": "ai_output_truncated",
+                "message": "AI output was cut off at the completion token limit"
+            }
+        )
+
+    @staticmethod
+    def _provider_error(e: Exception) -> HTTPException:
+        return HTTPException(
+            status_code=502,
+            detail=f"AI provider error: {str(e)}"
+        )
@@ -1,11 +1,14 @@
+from dataclasses import dataclass
 from fastapi import HTTPException
 from src.schema import (
     FeatureType,
     QuestionScale,
 )
+from src.ai_validation import TextStats
 from src.validation import (
     classify_question_scale,
     get_question_range,
+    segment_marker,
 )
 """
 API VERSION v1 CONTRACT
@@ -113,7 +116,17 @@ RULES:
 
 # Prompt Builder
 
-def build_prompt(
+def _question_scaling_rule(word_count: int) -> str:
+    scale: QuestionScale = classify_question_scale(word_count)
+    min_q, max_q = get_question_range(word_count)
+    return f"""
+DETERMINISTIC SCALING RULE:
+- Document classification: {scale.value}
+- Generate between {min_q} and {max_q} questions
+- Strictly respect this range
+"""
+
+def _feature_constraints(
     text: str,
     feature: FeatureType,
     *,
@@ -122,8 +135,8 @@ def build_prompt(
     target_language: str | None = None,
 ) -> str:
     """
-    Builds a contract-enforced AI prompt fully aligned
-    with schema + validation deterministic constraints.
+    Validates feature inputs and returns the per-request
+    (dynamic) constraint block shared by every prompt layout.
     """
 
     if feature not in FEATURE_RULES:
@@ -149,15 +162,7 @@ def build_prompt(
                 detail="Word count required for question generation"
             )
 
-        scale: QuestionScale = classify_question_scale(word_count)
-        min_q, max_q = get_question_range(word_count)
-
-        extra_constraints = f"""
-DETERMINISTIC SCALING RULE:
-- Document classification: {scale.value}
-- Generate between {min_q} and {max_q} questions
-- Strictly respect this range
-"""
+        extra_constraints = _question_scaling_rule(word_count)
 
     # Strict answer alignment
    
@@ -190,10 +195,218 @@ RULE:
 TARGET LANGUAGE:
 {target_language}
 """
+    return extra_constraints
+
+def build_prompt(
+    text: str,
+    feature: FeatureType,
+    *,
+    word_count: int | None = None,
+    questions: list[str] | None = None,
+    target_language: str | None = None,
+) -> str:
+    """
+    Builds a contract-enforced AI prompt fully aligned
+    with schema + validation deterministic constraints.
+    """
+    extra_constraints = _feature_constraints(
+        text,
+        feature,
+        word_count=word_count,
+        questions=questions,
+        target_language=target_language,
+    )
+    template = get_prompt_template(PROMPT_CONTRACT_V1, feature)
+    return template.render(extra_constraints, _rstrip(text))
+
+"""
+API VERSION v2 CONTRACT — PROMPT LAYOUT
+Same rules and guarantees as v1.
+Layout change only:
+- System message = BASE_CONSTRAINTS + FEATURE_RULES[feature],
+  byte-identical for every request of a feature (provider prefix cache)
+- User message = dynamic parts only, document last
+v1 prompts (build_prompt) are unchanged.
+"""
+
+PROMPT_CONTRACT_V1 = "v1"
+PROMPT_CONTRACT_V2 = "v2"
+
+@dataclass(frozen=True)
+class PromptMessages:
+    system: str
+    user: str
+
+# Precomputed once: one static system prefix per feature
+
+V2_SYSTEM_MESSAGES: dict[FeatureType, str] = {
+    feature: f"{BASE_CONSTRAINTS.strip()}\n\n{rules.strip()}"
+    for feature, rules in FEATURE_RULES.items()
+}
+
+def build_prompt_messages(
+    text: str,
+    feature: FeatureType,
+    *,
+    word_count: int | None = None,
+    questions: list[str] | None = None,
+    target_language: str | None = None,
+) -> PromptMessages:
+    """
+    v2 layout: static contract in the system message,
+    dynamic constraints then the document in the user message.
+    """
+    extra_constraints = _feature_constraints(
+        text,
+        feature,
+        word_count=word_count,
+        questions=questions,
+        target_language=target_language,
+    ).strip()
+    template = get_prompt_template(PROMPT_CONTRACT_V2, feature)
+    return PromptMessages(
+        system=template.system,
+        user=template.render(extra_constraints, _strip(text)),
+    )
+
+# Prompt Template Registry
+# Static segments per (contract, feature) are assembled at import time;
+# a request only joins them with its dynamic constraints and the
+# document, in one allocation.
+
+DOCUMENT_HEADER = "DOCUMENT CONTENT:\n"
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    contract: str
+    feature: FeatureType
+    system: str | None
+    head: str
+    separator: str
+
+    def render(self, extra_constraints: str, text: str) -> str:
+        """
+        v1 keeps its separator even without constraints;
+        v2 drops it so the user message starts with the document.
+        """
+        if not extra_constraints and self.contract != PROMPT_CONTRACT_V1:
+            return "".join((self.head, DOCUMENT_HEADER, text))
+        return "".join((self.head, extra_constraints, self.separator, DOCUMENT_HEADER, text))
+
+def _compile_templates() -> dict[tuple[str, FeatureType], PromptTemplate]:
+    templates = {}
+    for feature, rules in FEATURE_RULES.items():
+
+        # v1: the historical f-string layout, leading whitespace pre-stripped
+
+        templates[(PROMPT_CONTRACT_V1, feature)] = PromptTemplate(
+            PROMPT_CONTRACT_V1,
+            feature,
+            system=None,
+            head=f"\n{BASE_CONSTRAINTS}\n{rules}\n".lstrip(),
+            separator="\n\n",
+        )
+        templates[(PROMPT_CONTRACT_V2, feature)] = PromptTemplate(
+            PROMPT_CONTRACT_V2,
+            feature,
+            system=V2_SYSTEM_MESSAGES[feature],
+            head="",
+            separator="\n\n",
+        )
+    return templates
+
+PROMPT_TEMPLATES = _compile_templates()
+
+def get_prompt_template(contract: str, feature: FeatureType) -> PromptTemplate:
+    template = PROMPT_TEMPLATES.get((contract, feature))
+    if template is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported feature requested"
+        )
+    return template
+
+def _strip(text: str) -> str:
+    """
+    str.strip() without copying text that has nothing to strip.
+    """
+    if text[:1].isspace() or text[-1:].isspace():
+        return text.strip()
+    return text
+
+def _rstrip(text: str) -> str:
+    return text.rstrip() if text[-1:].isspace() else text
+
+# Segmented Prompt (incremental grammar correction)
+# Several independent paragraphs in one call, split back by marker lines.
+
+SEGMENTED_FEATURES = frozenset({FeatureType.grammar_correct})
+
+SEGMENT_RULES = """
+SEGMENTED INPUT:
+- The document is split into segments, each introduced by a marker line
+- Process each segment independently
+- Output every marker line exactly as given, followed by that segment's result
+- Do not merge, split, reorder, add or omit segments
+"""
+
+def build_segmented_prompt(segments: list[str], feature: FeatureType) -> str:
+    if feature not in SEGMENTED_FEATURES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Feature '{feature.value}' does not support segmented prompts."
+        )
+    if not segments or any(not segment.strip() for segment in segments):
+        raise HTTPException(
+            status_code=400,
+            detail="Segments cannot be empty."
+        )
+    document = "\n".join(
+        f"{segment_marker(index)}\n{segment}"
+        for index, segment in enumerate(segments, start=1)
+    )
     prompt = f"""
 {BASE_CONSTRAINTS}
 {FEATURE_RULES[feature]}
-{extra_constraints}
+{SEGMENT_RULES}
+
+DOCUMENT CONTENT:
+{document}
+"""
+    return prompt.strip()
+
+# Fused Question + Answer Prompt
+# One round trip instead of generate_questions then generate_answers.
+
+QA_RULES = """
+TASK: QUESTION AND ANSWER GENERATION
+RULES:
+- Generate questions strictly from document content
+- Answer each question strictly from document content
+- Follow deterministic question count limits provided
+- Number pairs sequentially starting at 1
+- Format every pair exactly as:
+  N. Q: <question>
+  A: <answer>
+- Do NOT include commentary
+- Output must be the numbered pairs only
+"""
+
+def build_qa_prompt(text: str, *, word_count: int | None = None) -> str:
+    if not text or not text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Empty content cannot be processed"
+        )
+    if word_count is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Word count required for question generation"
+        )
+    prompt = f"""
+{BASE_CONSTRAINTS}
+{QA_RULES}
+{_question_scaling_rule(word_count)}
 
 DOCUMENT CONTENT:
 {text}
@@ -209,13 +422,17 @@ def process_with_ai(
     word_count: int | None = None,
     questions: list[str] | None = None,
     target_language: str | None = None,
+    stats: TextStats | None = None,
 ) -> str:
     """
     Contract-compliant AI processing entry point.
 
     This function prepares AI behavior only.
     Actual AI model invocation is handled elsewhere.
+    A scan record from validation supersedes a caller-supplied word_count.
     """
+    if stats is not None:
+        word_count = stats.words
     prompt = build_prompt(
         text=text,
         feature=feature,
@@ -224,3 +441,22 @@ def process_with_ai(
         target_language=target_language,
     )
     return prompt
+
+# Startup Warm-Up
+
+WARMUP_SAMPLE_TEXT = "Warm-up document."
+
+def warm_prompt_templates() -> int:
+    """
+    Builds one prompt per feature so the first real request pays
+    no first-use cost. Returns the number of templates built.
+    """
+    for feature in FEATURE_RULES:
+        build_prompt(
+            WARMUP_SAMPLE_TEXT,
+            feature,
+            word_count=1,
+            questions=["1. Warm-up question?"],
+            target_language="English",
+        )
+    return len(FEATURE_RULES)
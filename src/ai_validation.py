@@ -1,7 +1,8 @@
+from dataclasses import dataclass
 from fastapi import HTTPException
+import re
 import string
 from src.schema import MAX_WORD_COUNT
-from src.extraction import count_words
 """
 AI INPUT VALIDATION LAYER — v1 CONTRACT
 Responsibilities:
@@ -14,21 +15,118 @@ This module MUST NOT:
 - Perform AI output validation (handled elsewhere)
 """
 MAX_INPUT_CHARS = 10000  # Hard safety ceiling (independent of word limit)
+MIN_LETTERS = 2
 
-# Low-Level Helpers
+# Text Scanner
+# One record per input, computed with C-level scans (bytes.translate,
+# bytes.count, compiled regex) instead of per-character Python loops.
 
-def _is_printable(text: str) -> bool:
-    return all(c in string.printable for c in text)
+@dataclass(frozen=True)
+class TextStats:
+    printable: bool
+    letters: int
+    words: int
+    paragraphs: int
 
-def _has_sufficient_text(text: str, min_letters: int = 2) -> bool:
-    letters = [c for c in text if c.isalpha()]
-    return len(letters) >= min_letters
+    # Trimmed bounds: text[start:end] == text.strip()
+
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+# ASCII whitespace as str.strip() / str.split() see it
+
+_ASCII_WHITESPACE = " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Byte shape: whitespace -> " ", anything else -> "x"
+
+_SHAPE = bytes(
+    0x20 if chr(b) in _ASCII_WHITESPACE else 0x78
+    for b in range(256)
+)
+
+# Line shape: newline -> "n", other whitespace dropped, anything else -> "x";
+# every "xnn" then starts a paragraph break
+
+_LINES = bytes(
+    0x6E if b == 0x0A else 0x20 if chr(b) in _ASCII_WHITESPACE else 0x78
+    for b in range(256)
+)
+_INLINE_WHITESPACE = _ASCII_WHITESPACE.replace("\n", "").encode("ascii")
+_LETTER_BYTES = string.ascii_letters.encode("ascii")
+_PRINTABLE_BYTES = string.printable.encode("ascii")
+_NON_PRINTABLE = re.compile(f"[^{re.escape(string.printable)}]")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+def scan_text(text: str) -> TextStats:
+    if not text.isascii():
+        return _scan_unicode(text)
+    raw = text.encode("ascii")
+    shape = raw.translate(_SHAPE)
+    start = shape.find(b"x")
+    if start == -1:
+        return TextStats(printable=True, letters=0, words=0, paragraphs=0, start=0, end=0)
+    end = shape.rfind(b"x") + 1
+
+    # Non-printable bytes outside the trimmed bounds are strippable
+    # separators (\x1c-\x1f), not content
+
+    non_printable = len(raw.translate(None, _PRINTABLE_BYTES))
+    if non_printable:
+        non_printable -= len(raw[:start].translate(None, _PRINTABLE_BYTES))
+        non_printable -= len(raw[end:].translate(None, _PRINTABLE_BYTES))
+    lines = raw[start:end].translate(_LINES, _INLINE_WHITESPACE)
+    return TextStats(
+        printable=not non_printable,
+        letters=len(raw) - len(raw.translate(None, _LETTER_BYTES)),
+        words=shape.count(b" x") + (start == 0),
+        paragraphs=lines.count(b"xnn") + 1,
+        start=start,
+        end=end,
+    )
+
+def _scan_unicode(text: str) -> TextStats:
+    """
+    Fallback for non-ASCII input. Such input always fails the
+    printable check, so this path only needs to be correct.
+    """
+    stripped = text.lstrip()
+    start = len(text) - len(stripped)
+    end = start + len(stripped.rstrip())
+    if start == end:
+        return TextStats(printable=True, letters=0, words=0, paragraphs=0, start=0, end=0)
+    return TextStats(
+        printable=_NON_PRINTABLE.search(text, start, end) is None,
+        letters=sum(map(str.isalpha, text)),
+        words=len(text.split()),
+        paragraphs=_count_paragraphs(text, start, end),
+        start=start,
+        end=end,
+    )
+
+def _count_paragraphs(text: str, start: int, end: int) -> int:
+    breaks = 0
+    for _ in _PARAGRAPH_BREAK.finditer(text, start, end):
+        breaks += 1
+    return breaks + 1
 
 # Core Validation
 
-def validate_text_input(text: str) -> str:
+def validate_text_with_stats(
+    text: str,
+    *,
+    max_chars: int = MAX_INPUT_CHARS,
+    max_words: int = MAX_WORD_COUNT,
+) -> tuple[str, TextStats]:
     """
     Deterministic validation for raw AI text input.
+    Returns the trimmed text with its scan record, so callers reuse
+    the server-side counts instead of client-supplied ones.
+    Limits default to the v1 contract; large-document mode
+    passes its own ceilings.
     Enforces:
     - Non-empty input
     - Character ceiling
@@ -44,11 +142,11 @@ def validate_text_input(text: str) -> str:
                 "message": "Input text cannot be null."
             }
         )
-    trimmed = text.strip()
+    stats = scan_text(text)
 
     # Empty input
 
-    if not trimmed:
+    if not stats.length:
         raise HTTPException(
             status_code=400,
             detail={
@@ -59,18 +157,18 @@ def validate_text_input(text: str) -> str:
 
     # Character length ceiling (transport-level safety)
     
-    if len(trimmed) > MAX_INPUT_CHARS:
+    if stats.length > max_chars:
         raise HTTPException(
             status_code=400,
             detail={
                 "error": "input_too_long",
-                "message": f"Input exceeds maximum allowed length of {MAX_INPUT_CHARS} characters."
+                "message": f"Input exceeds maximum allowed length of {max_chars} characters."
             }
         )
 
     # Printable + alphabetic density validation
     
-    if not _is_printable(trimmed) or not _has_sufficient_text(trimmed):
+    if not stats.printable or stats.letters < MIN_LETTERS:
         raise HTTPException(
             status_code=400,
             detail={
@@ -81,8 +179,7 @@ def validate_text_input(text: str) -> str:
 
     # Word count alignment with extraction contract
     
-    word_count = count_words(trimmed)
-    if word_count < 1:
+    if stats.words < 1:
         raise HTTPException(
             status_code=400,
             detail={
@@ -90,12 +187,26 @@ def validate_text_input(text: str) -> str:
                 "message": "Input contains no valid words."
             }
         )
-    if word_count > MAX_WORD_COUNT:
+    if stats.words > max_words:
         raise HTTPException(
             status_code=400,
             detail={
                 "error": "word_limit_exceeded",
-                "message": f"Input exceeds maximum allowed word count of {MAX_WORD_COUNT}."
+                "message": f"Input exceeds maximum allowed word count of {max_words}."
             }
         )
+    if stats.start or stats.end != len(text):
+        text = text[stats.start:stats.end]
+    return text, stats
+
+def validate_text_input(
+    text: str,
+    *,
+    max_chars: int = MAX_INPUT_CHARS,
+    max_words: int = MAX_WORD_COUNT,
+) -> str:
+    """
+    validate_text_with_stats() for callers that only need the text.
+    """
+    trimmed, _ = validate_text_with_stats(text, max_chars=max_chars, max_words=max_words)
     return trimmed
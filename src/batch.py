@@ -0,0 +1,262 @@
+from pathlib import Path
+from collections import deque
+from threading import Lock
+from typing import Iterator, List, Optional
+import argparse
+import concurrent.futures
+import json
+import sys
+import time
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from src.schema import FeatureType
+from src.ai_processing import process_with_ai
+from src.ai_client import AIClient
+from src.ai_validation import validate_text_with_stats
+from src.tokens import estimate_tokens, size_max_tokens
+"""
+OFFLINE BULK PROCESSING — v1
+Usage:
+    python -m src.batch requests.jsonl results.jsonl --workers 16 --rate 20
+Responsibilities:
+- Stream a JSONL file of /process-shaped records
+- Run validate_text_with_stats -> process_with_ai -> AIClient per record
+- Govern provider call rate across all workers
+- Write results in input order, so the last output line marks the resume point
+- Report throughput and latency percentiles
+This module MUST NOT:
+- Apply the per-IP HTTP rate limiter (no clients here)
+- Modify prompts or AI output
+"""
+
+DEFAULT_WORKERS = 8
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+# Record Shape (mirrors AIProcessRequest)
+
+class BatchRecord(BaseModel):
+    text: str
+    feature: FeatureType
+    word_count: Optional[int] = None
+    questions: Optional[List[str]] = None
+    target_language: Optional[str] = None
+
+# Provider Rate Governance
+
+class RateGovernor:
+    """
+    Blocking token bucket shared by every worker.
+    rate_per_second <= 0 disables governance.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+# Per-Record Pipeline
+
+def process_record(line: str, client: AIClient, governor: RateGovernor) -> dict:
+    """
+    Returns an output record; never raises for bad input or AI failure.
+    """
+    started = time.perf_counter()
+    try:
+        record = BatchRecord.model_validate_json(line)
+        text, stats = validate_text_with_stats(record.text)
+        prompt = process_with_ai(
+            text=text,
+            feature=record.feature,
+            questions=record.questions,
+            target_language=record.target_language,
+            stats=stats,
+        )
+        max_tokens = size_max_tokens(
+            record.feature,
+            estimate_tokens(text),
+            word_count=stats.words,
+            questions=record.questions,
+        )
+
+        # Cache hits cost no provider capacity
+
+        if client.lookup(prompt, max_tokens=max_tokens) is None:
+            governor.acquire()
+        result = client.generate(prompt, max_tokens=max_tokens)
+        output = {"status": "ok", "status_code": 200, "result": result}
+    except ValidationError as e:
+        output = {
+            "status": "error",
+            "status_code": 422,
+            "detail": {"error": "record_validation_error", "details": e.errors(include_url=False)},
+        }
+    except HTTPException as e:
+        output = {"status": "error", "status_code": e.status_code, "detail": e.detail}
+    except ValueError as e:
+        output = {"status": "error", "status_code": 400, "detail": {"error": "invalid_request", "message": str(e)}}
+    except Exception:
+        output = {
+            "status": "error",
+            "status_code": 500,
+            "detail": {"error": "internal_error", "message": "Unexpected processing error."},
+        }
+    output["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return output
+
+# Streaming Runner
+
+def iter_lines(path: Path, offset: int) -> Iterator[tuple[int, str]]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle):
+            if line_number < offset or not line.strip():
+                continue
+            yield line_number, line
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def run_batch(
+    input_path: Path,
+    output_path: Path,
+    *,
+    workers: int = DEFAULT_WORKERS,
+    rate_per_second: float = 0,
+    burst: int = 1,
+    offset: int = 0,
+    client: AIClient | None = None,
+) -> dict:
+    """
+    Processes input_path from `offset` and appends results to output_path.
+    At most 2 x workers records are held in memory at once.
+    """
+    client = client or AIClient()
+    governor = RateGovernor(rate_per_second, burst)
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    window = max(1, workers * 2)
+    pending: deque[tuple[int, concurrent.futures.Future]] = deque()
+    started = time.perf_counter()
+    next_offset = offset
+
+    def write(handle, line_number: int, result: dict) -> None:
+        nonlocal next_offset
+        result = {"line": line_number, **result}
+        handle.write(json.dumps(result) + "\n")
+        latencies.append(result["latency_ms"])
+        statuses[result["status_code"]] = statuses.get(result["status_code"], 0) + 1
+        next_offset = line_number + 1
+
+    mode = "a" if offset > 0 else "w"
+    with output_path.open(mode, encoding="utf-8") as handle, \
+         concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for line_number, line in iter_lines(input_path, offset):
+            pending.append((line_number, pool.submit(process_record, line, client, governor)))
+
+            # Write completed records in input order once the window is full
+
+            while len(pending) >= window:
+                done_line, future = pending.popleft()
+                write(handle, done_line, future.result())
+        for done_line, future in pending:
+            write(handle, done_line, future.result())
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "records": len(latencies),
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(len(latencies) / elapsed, 3) if elapsed > 0 else None,
+        "latency_ms": {f"p{p}": percentile(latencies, p) for p in LATENCY_PERCENTILES},
+        "status_codes": statuses,
+        "next_offset": next_offset,
+    }
+
+# CLI
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Run AI processing over a JSONL file of /process requests.",
+    )
+    parser.add_argument("input", type=Path, help="JSONL file of request records")
+    parser.add_argument("output", type=Path, help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent records in flight")
+    parser.add_argument("--rate", type=float, default=0, help="Max provider calls per second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=1, help="Provider calls allowed back-to-back")
+    resume = parser.add_mutually_exclusive_group()
+    resume.add_argument("--offset", type=int, default=0, help="Input line to start from")
+    resume.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue after the last record already in the output file",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    offset = args.offset
+    if args.resume:
+        last = _last_output_line(args.output)
+        offset = 0 if last is None else last + 1
+
+    summary = run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        rate_per_second=args.rate,
+        burst=args.burst,
+        offset=offset,
+    )
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 0
+
+def _last_output_line(path: Path) -> int | None:
+    """
+    Input line number of the last complete result, if any.
+    A trailing line cut short by a crash is truncated away, so the
+    resumed run appends right after the last complete record.
+    """
+    if not path.exists():
+        return None
+    last = None
+    complete_end = 0
+    with path.open("r+b") as handle:
+        for raw in handle:
+            if not raw.strip():
+                continue
+            try:
+                last = json.loads(raw)["line"]
+            except (ValueError, KeyError, TypeError):
+                break
+            complete_end = handle.tell()
+        if complete_end < handle.seek(0, 2):
+            handle.truncate(complete_end)
+        if complete_end:
+            handle.seek(complete_end - 1)
+            if handle.read(1) != b"\n":
+                handle.write(b"\n")
+    return last
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import re
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from src.schema import FeatureType, MAX_WORD_COUNT
+from src.extraction import count_words
+from src.tokens import estimate_tokens
+"""
+LARGE-DOCUMENT CHUNKING — v1
+Responsibilities:
+- Split documents beyond the per-call contract into paragraph-aligned chunks
+- Size chunks by token budget (and the per-call word contract)
+- Fan chunks out with bounded concurrency, reassemble outputs in order
+- Reduce partial summaries level by level, each call within budget
+This module MUST NOT:
+- Build prompts or call the AI provider directly
+- Relax the per-call v1 contract (every chunk still fits it)
+"""
+
+# Large-document mode ceilings (opt-in, independent of the v1 limits)
+
+LARGE_DOC_MAX_CHARS = int(os.getenv("AI_LARGE_DOC_MAX_CHARS", "200000"))
+LARGE_DOC_MAX_WORDS = int(os.getenv("AI_LARGE_DOC_MAX_WORDS", "30000"))
+
+# Per-chunk budget and fan-out width
+
+CHUNK_MAX_TOKENS = int(os.getenv("AI_CHUNK_MAX_TOKENS", "1000"))
+CHUNK_CONCURRENCY = int(os.getenv("AI_CHUNK_CONCURRENCY", "4"))
+
+# Features whose output is a per-paragraph rewrite (or a reducible summary)
+
+CHUNKABLE_FEATURES = frozenset({
+    FeatureType.summarize,
+    FeatureType.translate,
+    FeatureType.grammar_correct,
+    FeatureType.explain,
+})
+
+CHUNK_SEPARATOR = "\n\n"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+@dataclass(frozen=True)
+class ChunkedResult:
+    result: str
+    chunks: int
+
+# Splitting
+
+def split_paragraphs(text: str) -> list[str]:
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+
+def _pack(units: list[str], separator: str, max_tokens: int, max_words: int) -> list[str]:
+    """
+    Greedy in-order packing. Token estimates are summed per unit
+    (conservative: per-unit rounding only ever rounds up).
+    A single unit over budget is emitted on its own.
+    """
+    groups: list[str] = []
+    current: list[str] = []
+    tokens = words = 0
+    for unit in units:
+        unit_tokens = estimate_tokens(unit)
+        unit_words = count_words(unit)
+        if current and (tokens + unit_tokens > max_tokens or words + unit_words > max_words):
+            groups.append(separator.join(current))
+            current = []
+            tokens = words = 0
+        current.append(unit)
+        tokens += unit_tokens
+        words += unit_words
+    if current:
+        groups.append(separator.join(current))
+    return groups
+
+def _fits(text: str, max_tokens: int, max_words: int) -> bool:
+    return estimate_tokens(text) <= max_tokens and count_words(text) <= max_words
+
+def _split_paragraph(paragraph: str, max_tokens: int, max_words: int) -> list[str]:
+    """
+    Paragraphs over budget fall back to sentence, then word, boundaries.
+    """
+    if _fits(paragraph, max_tokens, max_words):
+        return [paragraph]
+    sentences: list[str] = []
+    for sentence in _SENTENCE_END.split(paragraph):
+        if _fits(sentence, max_tokens, max_words):
+            sentences.append(sentence)
+        else:
+            sentences.extend(_pack(sentence.split(), " ", max_tokens, max_words))
+    return _pack(sentences, " ", max_tokens, max_words)
+
+def chunk_text(
+    text: str,
+    *,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    max_words: int = MAX_WORD_COUNT,
+) -> list[str]:
+    """
+    Paragraph-aligned chunks, each within the token budget
+    and the per-call word contract.
+    """
+    units = [
+        piece
+        for paragraph in split_paragraphs(text)
+        for piece in _split_paragraph(paragraph, max_tokens, max_words)
+    ]
+    return _pack(units, CHUNK_SEPARATOR, max_tokens, max_words)
+
+# Map / Reduce
+
+async def map_chunks(
+    chunks: list[str],
+    run_chunk: Callable[[str], Awaitable[str]],
+    *,
+    concurrency: int = CHUNK_CONCURRENCY,
+) -> list[str]:
+    """
+    Runs every chunk with at most `concurrency` in flight.
+    Results keep input order; the first failure cancels the rest.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    async def run(chunk: str) -> str:
+        async with semaphore:
+            return await run_chunk(chunk)
+    tasks = [asyncio.create_task(run(chunk)) for chunk in chunks]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+async def process_chunked(
+    text: str,
+    feature: FeatureType,
+    run_chunk: Callable[[str], Awaitable[str]],
+    *,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    concurrency: int = CHUNK_CONCURRENCY,
+) -> ChunkedResult:
+    """
+    Map `run_chunk` over the chunks and reassemble in order.
+    summarize reduces hierarchically: partial summaries are re-chunked
+    within the same budget and summarized again until one remains,
+    so no call ever exceeds the per-call contract.
+    """
+    if feature not in CHUNKABLE_FEATURES:
+        raise ValueError(f"Feature '{feature.value}' does not support large-document mode")
+    chunks = chunk_text(text, max_tokens=max_tokens)
+    outputs = [
+        output.strip()
+        for output in await map_chunks(chunks, run_chunk, concurrency=concurrency)
+    ]
+    if feature == FeatureType.summarize:
+        while len(outputs) > 1:
+            partials = chunk_text(CHUNK_SEPARATOR.join(outputs), max_tokens=max_tokens)
+            if len(partials) >= len(outputs):
+                raise RuntimeError("Partial summaries are not shrinking; cannot reduce")
+            outputs = [
+                output.strip()
+                for output in await map_chunks(partials, run_chunk, concurrency=concurrency)
+            ]
+    return ChunkedResult(result=CHUNK_SEPARATOR.join(outputs), chunks=len(chunks))
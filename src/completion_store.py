@@ -0,0 +1,245 @@
+from pathlib import Path
+from threading import Lock, local
+import os
+import sqlite3
+import time
+import zlib
+"""
+PERSISTENT COMPLETION STORE — v1
+Responsibilities:
+- Share validated completions across worker processes on one host
+- Survive restarts and deploys (SQLite file in WAL mode)
+- Bound disk usage with LRU-style compaction
+- Store values zlib-compressed
+This module MUST NOT:
+- Build or modify prompts
+- Fail a request because the store is unavailable (errors count as misses)
+"""
+
+# Unset path disables the store
+
+AI_COMPLETION_STORE_PATH = os.getenv("AI_COMPLETION_STORE_PATH")
+AI_COMPLETION_STORE_MAX_BYTES = int(os.getenv("AI_COMPLETION_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Compaction trims down to this fraction of the cap, so it runs rarely
+
+COMPACTION_TARGET_RATIO = 0.9
+SQLITE_BUSY_TIMEOUT_MS = 2000
+
+# Hits queue their last_access update; queued updates are written in
+# one transaction once this many accumulate (or on the next set)
+
+ACCESS_FLUSH_BATCH = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS completions_last_access ON completions (last_access)"
+
+# Single-row running total of stored bytes, so nothing has to scan the
+# table to check the cap. Triggers keep it in step inside the writing
+# transaction, so concurrent writers cannot double-count a row.
+
+_META = """
+CREATE TABLE IF NOT EXISTS completions_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+)
+"""
+_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS completions_bytes_insert AFTER INSERT ON completions
+    BEGIN UPDATE completions_meta SET bytes = bytes + NEW.size WHERE id = 0; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS completions_bytes_update AFTER UPDATE OF size ON completions
+    BEGIN UPDATE completions_meta SET bytes = bytes + NEW.size - OLD.size WHERE id = 0; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS completions_bytes_delete AFTER DELETE ON completions
+    BEGIN UPDATE completions_meta SET bytes = bytes - OLD.size WHERE id = 0; END
+    """,
+)
+
+# Recomputed on open, which also repairs totals left by older versions
+
+_META_SYNC = (
+    "INSERT OR REPLACE INTO completions_meta (id, bytes) "
+    "SELECT 0, COALESCE(SUM(size), 0) FROM completions"
+)
+
+# An upsert (not INSERT OR REPLACE) so a replaced row fires the update
+# trigger rather than a delete that SQLite would not report
+
+_UPSERT = (
+    "INSERT INTO completions (key, value, size, last_access) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+    "size = excluded.size, last_access = excluded.last_access"
+)
+
+class CompletionStore:
+    """
+    SQLite-backed completion store shared by all workers on a host.
+    One connection per thread; WAL mode lets readers in every
+    process proceed while a single writer appends. Reads never
+    write: recency updates are batched into later write transactions.
+    Calls block on SQLite, so async callers run them in a thread.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = AI_COMPLETION_STORE_MAX_BYTES,
+        clock=time.time,
+    ):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._local = local()
+        self._lock = Lock()
+        self._accessed: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.compactions = 0
+        self.errors = 0
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(_SCHEMA)
+            conn.execute(_INDEX)
+            conn.execute(_META)
+            for trigger in _TRIGGERS:
+                conn.execute(trigger)
+            conn.execute(_META_SYNC)
+
+    def get(self, key: str) -> str | None:
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            value = zlib.decompress(row[0]).decode("utf-8")
+            self._count("hits")
+            if self._touch(key):
+                self._flush_access(conn)
+            return value
+        except (sqlite3.Error, zlib.error):
+            self._count("errors")
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        blob = zlib.compress(value.encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+        try:
+            conn = self._connect()
+            self._flush_access(conn)
+            with conn:
+                conn.execute(_UPSERT, (key, blob, len(blob), self._clock()))
+            if self._total_bytes(conn) > self.max_bytes:
+                self._compact(conn)
+        except sqlite3.Error:
+            self._count("errors")
+
+    def stats(self) -> dict:
+        try:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            total = self._total_bytes(conn)
+        except sqlite3.Error:
+            entries, total = None, None
+        with self._lock:
+            return {
+                "entries": entries,
+                "bytes": total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "compactions": self.compactions,
+                "errors": self.errors,
+            }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                self._flush_access(conn)
+            except sqlite3.Error:
+                self._count("errors")
+            conn.close()
+            self._local.conn = None
+
+    # Internals
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _total_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT bytes FROM completions_meta WHERE id = 0").fetchone()[0]
+
+    def _touch(self, key: str) -> bool:
+        """
+        Queues a recency update; True once a flush is due.
+        """
+        with self._lock:
+            self._accessed[key] = self._clock()
+            return len(self._accessed) >= ACCESS_FLUSH_BATCH
+
+    def _flush_access(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        if not accessed:
+            return
+        with conn:
+            conn.executemany(
+                "UPDATE completions SET last_access = ? WHERE key = ?",
+                [(when, key) for key, when in accessed.items()],
+            )
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        """
+        Deletes least recently used entries until the store is
+        back under COMPACTION_TARGET_RATIO of its cap. The scan runs
+        under the write lock, so concurrent compactions cannot pick
+        (and count) the same rows.
+        """
+        target = int(self.max_bytes * COMPACTION_TARGET_RATIO)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            excess = self._total_bytes(conn) - target
+            if excess <= 0:
+                return
+            rows = conn.execute(
+                "SELECT key, size FROM completions ORDER BY last_access ASC"
+            )
+            doomed = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+            conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+        self._count("compactions")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+def default_completion_store() -> CompletionStore | None:
+    if not AI_COMPLETION_STORE_PATH:
+        return None
+    return CompletionStore(AI_COMPLETION_STORE_PATH)
@@ -1,5 +1,13 @@
+import concurrent.futures
+import math
+import multiprocessing
+import os
+from collections import deque
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
-from typing import Tuple
+from threading import Lock
+from typing import Iterable, Iterator, Tuple
 from src.schema import (
     DocumentMetadata,
     DocumentPayload,
@@ -7,6 +15,7 @@ from src.schema import (
     MAX_FILE_SIZE_MB,
     MAX_WORD_COUNT,
 )
+from src.validation import construct_trusted
 
 # Real extraction libraries
 
@@ -15,6 +24,22 @@ import docx  # python-docx for DOCX
 import pytesseract
 from PIL import Image
 
+# PDF PAGE-PARALLEL EXTRACTION
+
+# PDFs with at least this many pages are split across worker processes
+
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+# Pages per worker task; at most PDF_MAX_WORKERS tasks run ahead of
+# the reader, which bounds the pages read past a word-limit abort
+
+PDF_PAGE_BATCH = int(os.getenv("PDF_PAGE_BATCH", "16"))
+
+# Plain-text files are read in pieces of this many characters
+
+TEXT_READ_CHUNK_CHARS = 64 * 1024
+
 # FILE SIZE VALIDATION
 
 def get_file_size_mb(file_path: Path) -> float:
@@ -33,12 +58,49 @@ def get_file_size_mb(file_path: Path) -> float:
 def extract_text_from_txt(file_path: Path) -> str:
     return file_path.read_text(encoding="utf-8")
 
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> list[str]:
+    """
+    Worker entry point: each call opens (and closes) its own handle.
+    """
+    with fitz.open(file_path) as doc:
+        return [doc[number].get_text() for number in range(start, stop)]
+
+def _page_ranges(page_count: int, parts: int) -> list[tuple[int, int]]:
+    """
+    Contiguous (start, stop) ranges covering every page, in order.
+    """
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for part in range(parts):
+        stop = start + size + (1 if part < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+_pdf_pool: concurrent.futures.ProcessPoolExecutor | None = None
+_pdf_pool_lock = Lock()
+
+def _get_pdf_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Created on first use and reused. Spawned, not forked:
+    the API process runs threads, and fork would copy their locks.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=PDF_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
 def extract_text_from_pdf(file_path: Path) -> str:
-    doc = fitz.open(file_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text.strip()
+    """
+    Page texts are joined once; large PDFs are read page-parallel.
+    """
+    return "".join(iter_text_from_pdf(file_path)).strip()
 
 def extract_text_from_docx(file_path: Path) -> str:
     doc = docx.Document(file_path)
@@ -49,6 +111,58 @@ def extract_text_from_image(file_path: Path) -> str:
     text = pytesseract.image_to_string(image)
     return text.strip()
 
+# STREAMING TEXT EXTRACTION
+# (chunks in document order; joined they equal the extract_* output
+# before stripping, so the word limit can stop reading early)
+
+def iter_text_from_txt(file_path: Path) -> Iterator[str]:
+    with file_path.open(encoding="utf-8") as handle:
+        while chunk := handle.read(TEXT_READ_CHUNK_CHARS):
+            yield chunk
+
+def iter_text_from_pdf(file_path: Path) -> Iterator[str]:
+    """
+    Page texts in order. Large PDFs are read in page batches across
+    the worker pool, a bounded number of batches ahead.
+    """
+    with fitz.open(file_path) as doc:
+        page_count = doc.page_count
+        if page_count < PDF_PARALLEL_MIN_PAGES or PDF_MAX_WORKERS < 2:
+            for page in doc:
+                yield page.get_text()
+            return
+    yield from _iter_pdf_batches(str(file_path), page_count)
+
+def _iter_pdf_batches(file_path: str, page_count: int) -> Iterator[str]:
+    """
+    Keeps PDF_MAX_WORKERS batches in flight and yields them in page
+    order. Closing the generator (word-limit abort) cancels the
+    batches that have not started.
+    """
+    pool = _get_pdf_pool()
+    batches = iter(_page_ranges(page_count, math.ceil(page_count / PDF_PAGE_BATCH)))
+    pending = deque(
+        pool.submit(_extract_pdf_pages, file_path, start, stop)
+        for start, stop in islice(batches, PDF_MAX_WORKERS)
+    )
+    try:
+        while pending:
+            pages = pending.popleft().result()
+            for start, stop in islice(batches, 1):
+                pending.append(pool.submit(_extract_pdf_pages, file_path, start, stop))
+            yield from pages
+    finally:
+        for future in pending:
+            future.cancel()
+
+def iter_text_from_docx(file_path: Path) -> Iterator[str]:
+    doc = docx.Document(file_path)
+    for index, paragraph in enumerate(doc.paragraphs):
+        yield paragraph.text if index == 0 else "\n" + paragraph.text
+
+def iter_text_from_image(file_path: Path) -> Iterator[str]:
+    yield extract_text_from_image(file_path)
+
 # WORD COUNT
 
 def count_words(text: str) -> int:
@@ -60,6 +174,30 @@ def enforce_word_limit(word_count: int) -> None:
     if word_count > MAX_WORD_COUNT:
         raise ValueError("Document exceeds maximum allowed word count")
 
+def collect_text(chunks: Iterable[str], max_words: int = MAX_WORD_COUNT) -> Tuple[str, int]:
+    """
+    Joins extracted chunks with a running word count and stops reading
+    as soon as the count passes max_words. A word split across two
+    chunks is counted once.
+    Returns:
+        text (str, stripped)
+        word_count (int)
+    """
+    parts: list[str] = []
+    word_count = 0
+    ends_in_word = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        word_count += len(chunk.split())
+        if ends_in_word and not chunk[0].isspace():
+            word_count -= 1
+        ends_in_word = not chunk[-1].isspace()
+        parts.append(chunk)
+        if word_count > max_words:
+            raise ValueError("Document exceeds maximum allowed word count")
+    return "".join(parts).strip(), word_count
+
 # FORMAT ROUTER
 
 def detect_format(file_path: Path) -> InputFormat:
@@ -86,6 +224,24 @@ def extract_text_by_format(file_path: Path, fmt: InputFormat) -> Tuple[str, bool
 
     raise ValueError(f"Unsupported file format: {fmt}")
 
+def iter_text_by_format(file_path: Path, fmt: InputFormat) -> Tuple[Iterator[str], bool]:
+    """
+    Streaming counterpart of extract_text_by_format.
+    Returns:
+        chunks (generator of str)
+        ocr_used (bool)
+    """
+    if fmt == InputFormat.txt:
+        return iter_text_from_txt(file_path), False
+    if fmt == InputFormat.pdf:
+        return iter_text_from_pdf(file_path), False
+    if fmt == InputFormat.docx:
+        return iter_text_from_docx(file_path), False
+    if fmt in (InputFormat.jpg, InputFormat.jpeg):
+        return iter_text_from_image(file_path), True
+
+    raise ValueError(f"Unsupported file format: {fmt}")
+
 # PUBLIC ENTRYPOINT
 
 def build_document_payload(file_path: str) -> DocumentPayload:
@@ -94,9 +250,9 @@ def build_document_payload(file_path: str) -> DocumentPayload:
 
     1. Detect format
     2. Validate file size
-    3. Extract text
+    3. Extract text, aborting once the word limit is exceeded
     4. Enforce word count limits
-    5. Build schema-compliant payload
+    5. Build schema-compliant payload (validated once, above)
     """
 
     path = Path(file_path)
@@ -106,20 +262,30 @@ def build_document_payload(file_path: str) -> DocumentPayload:
 
     input_format = detect_format(path)
     file_size_mb = get_file_size_mb(path)
-    text, ocr_used = extract_text_by_format(path, input_format)
+    chunks, ocr_used = iter_text_by_format(path, input_format)
+
+    # Closing the generator releases file / document handles on abort
 
-    if not text.strip():
+    with closing(chunks):
+        text, word_count = collect_text(chunks)
+
+    if not text:
         raise ValueError("File is empty")
 
-    word_count = count_words(text)
     enforce_word_limit(word_count)
-    metadata = DocumentMetadata(
+
+    # Every field was checked above (size, word limit, stripped text);
+    # ocr_used comes from the format router, so it matches input_format
+
+    metadata = construct_trusted(
+        DocumentMetadata,
         input_format=input_format,
         file_size_mb=file_size_mb,
         extracted_word_count=word_count,
         ocr_used=ocr_used,
     )
-    return DocumentPayload(
+    return construct_trusted(
+        DocumentPayload,
         text=text,
         metadata=metadata,
     )
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Callable
+from src.schema import FeatureType
+from src.ai_client import AIClient
+from src.ai_processing import SEGMENTED_FEATURES, build_prompt, build_segmented_prompt
+from src.chunking import CHUNK_SEPARATOR, map_chunks, split_paragraphs
+from src.tokens import estimate_tokens, size_max_tokens
+from src.validation import parse_segmented_output
+"""
+INCREMENTAL (PARAGRAPH-LEVEL) PROCESSING — v1
+Responsibilities:
+- Split a document into paragraphs and reuse stored per-paragraph results
+- Send only unseen paragraphs to the provider, batched into one prompt
+- Stitch results back together in the original order
+This module MUST NOT:
+- Charge rate limits itself (the caller decides via on_provider_call)
+- Bypass the AI client (all calls go through its cache / resilience layers)
+Each paragraph result is stored under the key of the single-paragraph
+v1 prompt, so /process on one paragraph and incremental runs share entries.
+"""
+
+# Marker line + newline per batched segment, in completion tokens
+
+SEGMENT_MARKER_TOKENS = 8
+
+@dataclass(frozen=True)
+class IncrementalResult:
+    result: str
+    segments: int
+    reused: int
+
+# Per-Segment Requests
+
+def _segment_request(segment: str, feature: FeatureType) -> tuple[str, int]:
+    prompt = build_prompt(segment, feature)
+    return prompt, size_max_tokens(feature, estimate_tokens(segment))
+
+async def _process_segment(segment: str, feature: FeatureType, client: AIClient) -> str:
+    prompt, max_tokens = _segment_request(segment, feature)
+    return await client.generate_async(prompt, max_tokens=max_tokens)
+
+async def _process_segments(segments: list[str], feature: FeatureType, client: AIClient) -> list[str]:
+    """
+    One batched call for every unseen segment. A batched output that
+    cannot be split back falls back to one call per segment.
+    """
+    if len(segments) == 1:
+        return [await _process_segment(segments[0], feature, client)]
+    prompt = build_segmented_prompt(segments, feature)
+    max_tokens = size_max_tokens(
+        feature,
+        sum(estimate_tokens(segment) for segment in segments)
+        + SEGMENT_MARKER_TOKENS * len(segments),
+    )
+    output = await client.generate_async(prompt, max_tokens=max_tokens)
+    try:
+        return parse_segmented_output(output, len(segments))
+    except ValueError:
+        return await map_chunks(
+            segments,
+            lambda segment: _process_segment(segment, feature, client),
+        )
+
+# Entry Point
+
+async def process_incrementally(
+    text: str,
+    feature: FeatureType,
+    client: AIClient,
+    *,
+    on_provider_call: Callable[[], None] | None = None,
+) -> IncrementalResult:
+    """
+    on_provider_call runs once, only if at least one paragraph
+    needs the provider (cost controls for cache-only runs are skipped).
+    """
+    if feature not in SEGMENTED_FEATURES:
+        raise ValueError(f"Feature '{feature.value}' does not support incremental mode")
+    paragraphs = split_paragraphs(text)
+    results: dict[str, str] = {}
+    unseen: dict[str, tuple[str, int]] = {}
+    for paragraph in paragraphs:
+        if paragraph in results or paragraph in unseen:
+            continue
+        prompt, max_tokens = _segment_request(paragraph, feature)
+        cached = await client.lookup_async(prompt, max_tokens=max_tokens)
+        if cached is None:
+            unseen[paragraph] = (prompt, max_tokens)
+        else:
+            results[paragraph] = cached
+    reused = sum(1 for paragraph in paragraphs if paragraph in results)
+    if unseen:
+        if on_provider_call is not None:
+            on_provider_call()
+        processed = await _process_segments(list(unseen), feature, client)
+        for (paragraph, (prompt, max_tokens)), result in zip(unseen.items(), processed):
+            await client.remember_async(prompt, result, max_tokens=max_tokens)
+            results[paragraph] = result
+    return IncrementalResult(
+        result=CHUNK_SEPARATOR.join(results[paragraph] for paragraph in paragraphs),
+        segments=len(paragraphs),
+        reused=reused,
+    )
@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator
+import asyncio
+import math
+import os
+import random
+import re
+import time
+"""
+AI PROVIDER BACKENDS — v1
+Responsibilities:
+- Define the provider interface AIClient depends on
+- Ship a deterministic, network-free fake backend for load testing
+This module MUST NOT:
+- Apply timeouts, retries, caching or output validation (AIClient owns those)
+- Depend on any vendor SDK (the OpenAI backend lives in ai_client.py)
+"""
+
+# Completion Request
+
+@dataclass(frozen=True)
+class CompletionRequest:
+    prompt: str
+    model: str
+    system: str
+    max_tokens: int
+    temperature: float = 0.0
+
+# Provider Interface
+
+class AIProvider(ABC):
+    """
+    One chat-completion backend.
+    complete() runs on AIClient's worker pool; complete_async() and
+    stream_async() run on the event loop.
+    """
+
+    name: str = "provider"
+
+    @abstractmethod
+    def complete(self, request: CompletionRequest) -> str:
+        ...
+
+    @abstractmethod
+    async def complete_async(self, request: CompletionRequest) -> str:
+        ...
+
+    @abstractmethod
+    def stream_async(self, request: CompletionRequest) -> AsyncIterator[str]:
+        ...
+
+    def warm_up(self) -> None:
+        """
+        Pre-opens connections; a no-op for backends without any.
+        """
+
+    async def warm_up_async(self) -> None:
+        """
+        Async counterpart of warm_up().
+        """
+
+class CompletionTruncatedError(Exception):
+    """
+    The completion stopped at max_tokens. Backends raise it instead of
+    returning the partial text, so it is never served or cached.
+    """
+
+# Fake Provider Configuration
+
+AI_FAKE_LATENCY_DISTRIBUTION = os.getenv("AI_FAKE_LATENCY_DISTRIBUTION", "fixed")
+AI_FAKE_LATENCY_MS = float(os.getenv("AI_FAKE_LATENCY_MS", "0"))
+AI_FAKE_LATENCY_SPREAD_MS = float(os.getenv("AI_FAKE_LATENCY_SPREAD_MS", "0"))
+AI_FAKE_ERROR_RATE = float(os.getenv("AI_FAKE_ERROR_RATE", "0"))
+AI_FAKE_TOKENS_PER_SECOND = float(os.getenv("AI_FAKE_TOKENS_PER_SECOND", "0"))
+AI_FAKE_SEED = int(os.getenv("AI_FAKE_SEED", "0"))
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+class FakeProviderError(ConnectionError):
+    """
+    Injected failure; a ConnectionError so it is retried like a real outage.
+    """
+
+class LatencyModel:
+    """
+    Time-to-first-token distribution in milliseconds.
+    - fixed:     always mean_ms
+    - uniform:   mean_ms +/- spread_ms
+    - lognormal: median mean_ms, spread_ms sets the tail (sigma = spread/mean)
+    """
+
+    def __init__(self, distribution: str = "fixed", mean_ms: float = 0, spread_ms: float = 0):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unsupported latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.spread_ms = spread_ms
+
+    def sample_seconds(self, rng: random.Random) -> float:
+        if self.mean_ms <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            ms = rng.uniform(self.mean_ms - self.spread_ms, self.mean_ms + self.spread_ms)
+        elif self.distribution == "lognormal":
+            sigma = self.spread_ms / self.mean_ms if self.spread_ms > 0 else 0.0
+            ms = rng.lognormvariate(math.log(self.mean_ms), sigma)
+        else:
+            ms = self.mean_ms
+        return max(0.0, ms) / 1000
+
+# Deterministic Output Synthesis
+
+_QUESTION_RANGE = re.compile(r"Generate between (\d+) and (\d+) questions")
+_TARGET_LANGUAGE = re.compile(r"TARGET LANGUAGE:\s*\n\s*(.+)")
+_QUESTION_LINE = re.compile(r"^\s*(\d+)\.\s*(.+)$", re.MULTILINE)
+_DOCUMENT_MARKER = "DOCUMENT CONTENT:"
+_ANSWERS_MARKER = "QUESTIONS TO ANSWER:"
+
+def _document_of(prompt: str) -> str:
+    _, marker, document = prompt.rpartition(_DOCUMENT_MARKER)
+    return document.strip() if marker else prompt.strip()
+
+def synthesize_output(system: str, prompt: str) -> str:
+    """
+    Feature-appropriate output derived only from the prompt text,
+    so identical prompts always produce identical completions.
+    """
+    contract = f"{system}\n{prompt}"
+    document = _document_of(prompt)
+    words = document.split()
+    if "TASK: QUESTION AND ANSWER GENERATION" in contract:
+        match = _QUESTION_RANGE.search(contract)
+        count = int(match.group(2)) if match else 3
+        return "\n".join(
+            f"{i}. Q: What does the document say about \"{words[(i - 1) % len(words)]}\"?\n"
+            f"A: The document states: {' '.join(words[:12])}"
+            for i in range(1, count + 1)
+        )
+    if "TASK: QUESTION GENERATION" in contract:
+        match = _QUESTION_RANGE.search(contract)
+        count = int(match.group(2)) if match else 3
+        return "\n".join(
+            f"{i}. What does the document say about \"{words[(i - 1) % len(words)]}\"?"
+            for i in range(1, count + 1)
+        )
+    if "TASK: ANSWER GENERATION" in contract:
+        _, _, block = contract.partition(_ANSWERS_MARKER)
+        block, _, _ = block.partition(_DOCUMENT_MARKER)
+        numbers = [m.group(1) for m in _QUESTION_LINE.finditer(block)] or ["1"]
+        return "\n".join(
+            f"{n}. The document states: {' '.join(words[:12])}" for n in numbers
+        )
+    if "TASK: COMPRESSION-ONLY SUMMARIZATION" in contract:
+        return " ".join(words[: max(1, len(words) // 4)])
+    if "TASK: LANGUAGE TRANSLATION" in contract:
+        match = _TARGET_LANGUAGE.search(contract)
+        language = match.group(1).strip() if match else "target"
+        return f"[{language}] {document}"
+    if "TASK: CONTENT EXPLANATION" in contract:
+        return f"This document explains: {' '.join(words[:40])}"
+    return document
+
+# Fake Provider
+
+class FakeProvider(AIProvider):
+    """
+    Deterministic, network-free provider for load tests and benchmarks.
+    Latency = sampled time-to-first-token + output tokens / token throughput.
+    Errors are injected at `error_rate` before any output is produced.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: LatencyModel | None = None,
+        error_rate: float = 0.0,
+        tokens_per_second: float = 0.0,
+        seed: int = 0,
+    ):
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.tokens_per_second = tokens_per_second
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeProvider":
+        return cls(
+            latency=LatencyModel(
+                AI_FAKE_LATENCY_DISTRIBUTION,
+                AI_FAKE_LATENCY_MS,
+                AI_FAKE_LATENCY_SPREAD_MS,
+            ),
+            error_rate=AI_FAKE_ERROR_RATE,
+            tokens_per_second=AI_FAKE_TOKENS_PER_SECOND,
+            seed=AI_FAKE_SEED,
+        )
+
+    def complete(self, request: CompletionRequest) -> str:
+        first_token, output, generation = self._plan(request)
+        time.sleep(first_token + generation)
+        return output
+
+    async def complete_async(self, request: CompletionRequest) -> str:
+        first_token, output, generation = self._plan(request)
+        await asyncio.sleep(first_token + generation)
+        return output
+
+    async def stream_async(self, request: CompletionRequest) -> AsyncIterator[str]:
+        first_token, output, generation = self._plan(request)
+        await asyncio.sleep(first_token)
+        pieces = re.findall(r"\S+\s*|\s+", output)
+        per_piece = generation / len(pieces) if pieces else 0.0
+        for piece in pieces:
+            if per_piece:
+                await asyncio.sleep(per_piece)
+            yield piece
+
+    def _plan(self, request: CompletionRequest) -> tuple[float, str, float]:
+        """
+        Returns (time to first token, output, generation time).
+        """
+        self.calls += 1
+        first_token = self.latency.sample_seconds(self._rng)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeProviderError("Injected fake provider failure")
+        output = synthesize_output(request.system, request.prompt)
+        if _approx_tokens(output) > request.max_tokens:
+            raise CompletionTruncatedError("Fake completion exceeded max_tokens")
+        generation = 0.0
+        if self.tokens_per_second > 0:
+            generation = _approx_tokens(output) / self.tokens_per_second
+        return first_token, output, generation
+
+def _approx_tokens(text: str) -> int:
+
+    # ~4 characters per token, matching typical English BPE density
+
+    return max(1, len(text) // 4)
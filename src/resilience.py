@@ -0,0 +1,413 @@
+from collections import deque
+from threading import Lock
+import asyncio
+import concurrent.futures
+import os
+import random
+import time
+"""
+PROVIDER RESILIENCE LAYER — v1
+Responsibilities:
+- Retry transient provider failures with jittered exponential backoff
+- Fail fast through a circuit breaker while the provider is unhealthy
+- Optionally hedge slow calls with a duplicate request
+- Keep every attempt inside the caller's overall deadline
+This module MUST NOT:
+- Know about prompts, features or HTTP status codes
+- Decide which errors are transient (the caller supplies a classifier)
+"""
+
+AI_RETRY_MAX_ATTEMPTS = int(os.getenv("AI_RETRY_MAX_ATTEMPTS", "3"))
+AI_RETRY_BASE_DELAY_SECONDS = float(os.getenv("AI_RETRY_BASE_DELAY_SECONDS", "0.25"))
+AI_RETRY_MAX_DELAY_SECONDS = float(os.getenv("AI_RETRY_MAX_DELAY_SECONDS", "2.0"))
+AI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", "5"))
+AI_BREAKER_RECOVERY_SECONDS = float(os.getenv("AI_BREAKER_RECOVERY_SECONDS", "30"))
+AI_HEDGE_ENABLED = os.getenv("AI_HEDGE_ENABLED", "false").lower() == "true"
+AI_HEDGE_QUANTILE = float(os.getenv("AI_HEDGE_QUANTILE", "0.95"))
+AI_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("AI_HEDGE_MIN_DELAY_SECONDS", "1.0"))
+AI_HEDGE_MIN_SAMPLES = int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20"))
+LATENCY_WINDOW_SIZE = 200
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider the breaker considers unhealthy.
+    """
+
+# Retry Policy
+
+class RetryPolicy:
+    """
+    Bounded retries with "full jitter" exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = AI_RETRY_MAX_ATTEMPTS,
+        base_delay: float = AI_RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = AI_RETRY_MAX_DELAY_SECONDS,
+        rng: random.Random | None = None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("Retry policy requires at least one attempt")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def backoff(self, retry_number: int) -> float:
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (retry_number - 1)))
+        return self._rng.uniform(0, ceiling)
+
+# Circuit Breaker
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half_open once `recovery_seconds` have passed.
+    half_open admits one probe call; its outcome closes or reopens.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = AI_BREAKER_FAILURE_THRESHOLD,
+        recovery_seconds: float = AI_BREAKER_RECOVERY_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.transitions = {self.CLOSED: 0, self.OPEN: 0, self.HALF_OPEN: 0}
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if self._clock() - self._opened_at < self.recovery_seconds:
+                    self.rejected += 1
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._opened_at = self._clock()
+                self._transition(self.OPEN)
+
+    def release(self) -> None:
+        """
+        Frees a half-open probe slot whose call ended without an
+        outcome (e.g. the caller was cancelled).
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "transitions": dict(self.transitions),
+                "rejected": self.rejected,
+                "successes": self.successes,
+                "failures": self.failures,
+            }
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self.transitions[state] += 1
+
+# Latency Tracking
+
+class LatencyWindow:
+    """
+    Rolling window of recent call latencies with quantile lookup.
+    """
+
+    def __init__(self, size: int = LATENCY_WINDOW_SIZE):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+class OutcomeWindow:
+    """
+    Rolling window of recent call outcomes (True = failed).
+    """
+
+    def __init__(self, size: int = LATENCY_WINDOW_SIZE):
+        self._outcomes: deque[bool] = deque(maxlen=size)
+        self._failures = 0
+        self._lock = Lock()
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+                self._failures -= 1
+            self._outcomes.append(failed)
+            if failed:
+                self._failures += 1
+
+    def __len__(self) -> int:
+        return len(self._outcomes)
+
+    def error_rate(self) -> float | None:
+        with self._lock:
+            if not self._outcomes:
+                return None
+            return self._failures / len(self._outcomes)
+
+# Hedging Policy
+
+class HedgePolicy:
+    """
+    Decides when to send a duplicate request.
+    The delay tracks the observed latency quantile once enough
+    samples exist, and never drops below `min_delay`.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = AI_HEDGE_ENABLED,
+        quantile: float = AI_HEDGE_QUANTILE,
+        min_delay: float = AI_HEDGE_MIN_DELAY_SECONDS,
+        min_samples: int = AI_HEDGE_MIN_SAMPLES,
+    ):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+
+    def delay(self, latencies: LatencyWindow) -> float | None:
+        if not self.enabled:
+            return None
+        if len(latencies) < self.min_samples:
+            return self.min_delay
+        return max(self.min_delay, latencies.quantile(self.quantile))
+
+# Resilient Caller
+
+class ResilientCaller:
+    """
+    Runs provider attempts under retry, breaker and hedging policies.
+    Sync callers pass `submit` (returns a Future) and `abandon`;
+    async callers pass a coroutine factory.
+    """
+
+    def __init__(
+        self,
+        is_transient,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge: HedgePolicy | None = None,
+        clock=time.monotonic,
+    ):
+        self.is_transient = is_transient
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge or HedgePolicy()
+        self.latencies = LatencyWindow()
+        self.outcomes = OutcomeWindow()
+        self._clock = clock
+        self._lock = Lock()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def call(self, submit, abandon, timeout: float):
+        deadline = self._clock() + timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow():
+                raise CircuitOpenError("AI provider circuit is open")
+            try:
+                result = self._attempt(submit, abandon, deadline)
+            except Exception as e:
+                delay = self._after_failure(e, attempt, deadline)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self.outcomes.record(False)
+            return result
+
+    async def call_async(self, coro_fn, timeout: float):
+        deadline = self._clock() + timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow():
+                raise CircuitOpenError("AI provider circuit is open")
+            try:
+                result = await self._attempt_async(coro_fn, deadline)
+            except Exception as e:
+                delay = self._after_failure(e, attempt, deadline)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self.outcomes.record(False)
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+            }
+        counters["breaker"] = self.breaker.stats()
+        counters["latency_p95_seconds"] = self.latencies.quantile(0.95)
+        counters["error_rate"] = self.outcomes.error_rate()
+        return counters
+
+    # Internals
+
+    def _after_failure(self, error: Exception, attempt: int, deadline: float) -> float:
+        """
+        Records the failure and returns the backoff before the next
+        attempt, or re-raises when no further attempt is allowed.
+        """
+        if isinstance(error, (TimeoutError, concurrent.futures.TimeoutError)):
+            self.breaker.record_failure()
+            self.outcomes.record(True)
+            raise error
+        if not self.is_transient(error):
+
+            # The provider answered; it is healthy even if the call failed
+
+            self.breaker.record_success()
+            self.outcomes.record(False)
+            raise error
+        self.breaker.record_failure()
+        self.outcomes.record(True)
+        if attempt >= self.retry.max_attempts:
+            raise error
+        delay = self.retry.backoff(attempt)
+        if self._clock() + delay >= deadline:
+            raise error
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def _attempt(self, submit, abandon, deadline: float):
+        started = self._clock()
+        futures = [submit()]
+        hedge_delay = self.hedge.delay(self.latencies)
+        if hedge_delay is not None and started + hedge_delay < deadline:
+            done, _ = concurrent.futures.wait(futures, timeout=hedge_delay)
+            if not done:
+                futures.append(submit())
+                with self._lock:
+                    self.hedges += 1
+        pending = set(futures)
+        error = None
+        while pending:
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+            done, pending = concurrent.futures.wait(
+                pending,
+                timeout=remaining,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        abandon(loser)
+                    self._record_win(future is not futures[0], started)
+                    return future.result()
+                error = future.exception()
+        for future in pending:
+            abandon(future)
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError("AI provider did not respond in time")
+
+    async def _attempt_async(self, coro_fn, deadline: float):
+        started = self._clock()
+        primary = asyncio.ensure_future(coro_fn())
+        tasks = [primary]
+        hedge_delay = self.hedge.delay(self.latencies)
+        if hedge_delay is not None and started + hedge_delay < deadline:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(coro_fn()))
+                with self._lock:
+                    self.hedges += 1
+        pending = set(tasks)
+        error = None
+        try:
+            while pending:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._record_win(task is not primary, started)
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError("AI provider did not respond in time")
+
+    def _record_win(self, hedge_won: bool, started: float) -> None:
+        self.latencies.record(self._clock() - started)
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from threading import Lock
+import json
+import math
+import os
+from src.schema import FeatureType
+from src.resilience import LatencyWindow
+"""
+LOAD-AWARE MODEL ROUTING — v1
+Responsibilities:
+- Pick a model and completion budget per request from a policy table
+- Match tiers on feature, input size and live load signals
+  (in-flight provider calls, recent p95 latency, recent error rate)
+- Track latency per chosen route for comparison
+This module MUST NOT:
+- Build prompts or call the AI provider
+- Collect load signals itself (the AI client supplies them)
+Tiers are checked in order; the first match wins, and the last tier
+should match unconditionally.
+"""
+
+# JSON policy table; unset builds the default two-tier table below
+
+AI_ROUTING_POLICY_PATH = os.getenv("AI_ROUTING_POLICY_PATH")
+
+# Off unless a policy file is configured: routing to another model
+# changes the cache key, so it is opt-in rather than a default
+
+AI_ROUTING_ENABLED = os.getenv(
+    "AI_ROUTING_ENABLED", "true" if AI_ROUTING_POLICY_PATH else "false"
+).lower() == "true"
+
+# Default table: fall back to a faster model under any sign of pressure
+
+AI_ROUTING_FALLBACK_MODEL = os.getenv("AI_ROUTING_FALLBACK_MODEL", "gpt-4.1-nano")
+AI_ROUTING_MAX_IN_FLIGHT = int(os.getenv("AI_ROUTING_MAX_IN_FLIGHT", "64"))
+AI_ROUTING_MAX_P95_SECONDS = float(os.getenv("AI_ROUTING_MAX_P95_SECONDS", "8"))
+AI_ROUTING_MAX_ERROR_RATE = float(os.getenv("AI_ROUTING_MAX_ERROR_RATE", "0.25"))
+
+# Latency / error-rate signals are ignored until this many samples exist
+
+AI_ROUTING_MIN_SAMPLES = int(os.getenv("AI_ROUTING_MIN_SAMPLES", "20"))
+
+# Budgets are never scaled below this
+
+MIN_ROUTED_MAX_TOKENS = 128
+
+@dataclass(frozen=True)
+class LoadSignals:
+    in_flight: int = 0
+    latency_p95_seconds: float | None = None
+    error_rate: float | None = None
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    model: str
+    max_tokens: int
+
+@dataclass(frozen=True)
+class RouteTier:
+    """
+    One policy row. Pressure thresholds are alternatives (any one
+    reached triggers the tier); a tier without thresholds always
+    matches once its feature / input-size filters pass.
+    """
+    name: str
+    model: str
+    max_tokens_scale: float = 1.0
+    features: frozenset[FeatureType] | None = None
+    max_input_tokens: int | None = None
+    min_in_flight: int | None = None
+    min_latency_p95_seconds: float | None = None
+    min_error_rate: float | None = None
+
+    @classmethod
+    def from_config(cls, row: dict) -> "RouteTier":
+        features = row.get("features")
+        return cls(
+            name=row["name"],
+            model=row["model"],
+            max_tokens_scale=float(row.get("max_tokens_scale", 1.0)),
+            features=frozenset(FeatureType(f) for f in features) if features is not None else None,
+            max_input_tokens=row.get("max_input_tokens"),
+            min_in_flight=row.get("min_in_flight"),
+            min_latency_p95_seconds=row.get("min_latency_p95_seconds"),
+            min_error_rate=row.get("min_error_rate"),
+        )
+
+    def matches(self, feature: FeatureType, input_tokens: int, signals: LoadSignals) -> bool:
+        if self.features is not None and feature not in self.features:
+            return False
+        if self.max_input_tokens is not None and input_tokens > self.max_input_tokens:
+            return False
+        thresholds = (
+            (self.min_in_flight, signals.in_flight),
+            (self.min_latency_p95_seconds, signals.latency_p95_seconds),
+            (self.min_error_rate, signals.error_rate),
+        )
+        configured = [(limit, value) for limit, value in thresholds if limit is not None]
+        if not configured:
+            return True
+        return any(value is not None and value >= limit for limit, value in configured)
+
+# Router
+
+class ModelRouter:
+
+    def __init__(self, tiers: list[RouteTier], *, enabled: bool = True):
+        if not tiers:
+            raise ValueError("Routing policy requires at least one tier")
+        self.tiers = tiers
+        self.enabled = enabled
+        self._latencies: dict[str, LatencyWindow] = {}
+        self._counts: dict[str, int] = {}
+        self._lock = Lock()
+
+    @classmethod
+    def from_env(cls, default_model: str) -> "ModelRouter":
+        if AI_ROUTING_POLICY_PATH:
+            with open(AI_ROUTING_POLICY_PATH, encoding="utf-8") as f:
+                rows = json.load(f)["tiers"]
+            return cls([RouteTier.from_config(row) for row in rows], enabled=AI_ROUTING_ENABLED)
+        return cls([
+            RouteTier(
+                name="fallback",
+                model=AI_ROUTING_FALLBACK_MODEL,
+                min_in_flight=AI_ROUTING_MAX_IN_FLIGHT,
+                min_latency_p95_seconds=AI_ROUTING_MAX_P95_SECONDS,
+                min_error_rate=AI_ROUTING_MAX_ERROR_RATE,
+            ),
+            RouteTier(name="standard", model=default_model),
+        ], enabled=AI_ROUTING_ENABLED)
+
+    def select(
+        self,
+        feature: FeatureType,
+        input_tokens: int,
+        max_tokens: int,
+        signals: LoadSignals,
+    ) -> Route:
+        """
+        Disabled routing (or no matching tier) pins the last tier.
+        """
+        tier = self.tiers[-1]
+        if self.enabled:
+            for candidate in self.tiers:
+                if candidate.matches(feature, input_tokens, signals):
+                    tier = candidate
+                    break
+        return self._route(tier, max_tokens)
+
+    def standard(self, max_tokens: int) -> Route:
+        """
+        The unconditional last tier, whatever the load.
+        """
+        return self._route(self.tiers[-1], max_tokens)
+
+    @staticmethod
+    def _route(tier: RouteTier, max_tokens: int) -> Route:
+        scaled = max_tokens
+        if tier.max_tokens_scale != 1.0:
+            scaled = max(MIN_ROUTED_MAX_TOKENS, math.ceil(max_tokens * tier.max_tokens_scale))
+        return Route(name=tier.name, model=tier.model, max_tokens=scaled)
+
+    def record(self, route: Route, seconds: float) -> None:
+        with self._lock:
+            window = self._latencies.get(route.name)
+            if window is None:
+                window = self._latencies[route.name] = LatencyWindow()
+            self._counts[route.name] = self._counts.get(route.name, 0) + 1
+        window.record(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            windows = dict(self._latencies)
+            counts = dict(self._counts)
+        return {
+            "enabled": self.enabled,
+            "tiers": [tier.name for tier in self.tiers],
+            "routes": {
+                name: {
+                    "calls": counts[name],
+                    "latency_p50_seconds": window.quantile(0.5),
+                    "latency_p95_seconds": window.quantile(0.95),
+                }
+                for name, window in windows.items()
+            },
+        }
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List, Optional, Literal, Annotated
+from typing import List, Optional, Literal, Annotated, Union
 from pydantic import BaseModel, Field, StringConstraints, field_validator
 
 # CONTRACT CONSTANTS (HARD LIMITS)
@@ -97,14 +97,43 @@ class AnswerGenerationRequest(BaseModel):
                 raise ValueError("Questions must be sequentially numbered starting at 1")
         return v
 
+# FEATURE PAYLOAD UNION (TAGGED BY `feature`)
+
+# The `feature` literal selects the member directly, so only one
+# model is ever tried and errors name that model alone
+
+AnalyzerPayload = Annotated[
+    Union[
+        ConversionRequest,
+        SummarizationRequest,
+        GrammarCorrectionRequest,
+        TranslationRequest,
+        ExplanationRequest,
+        QuestionGenerationRequest,
+        AnswerGenerationRequest,
+    ],
+    Field(discriminator="feature"),
+]
+
+# Declared action → expected payload model (built once)
+
+ACTION_PAYLOAD_MODELS: dict[FeatureType, type[BaseModel]] = {
+    FeatureType.convert: ConversionRequest,
+    FeatureType.summarize: SummarizationRequest,
+    FeatureType.grammar_correct: GrammarCorrectionRequest,
+    FeatureType.translate: TranslationRequest,
+    FeatureType.explain: ExplanationRequest,
+    FeatureType.generate_questions: QuestionGenerationRequest,
+    FeatureType.generate_answers: AnswerGenerationRequest,
+}
+
 # UNIFIED REQUEST ENVELOPE (STATELESS)
 
 class AnalyzerRequest(BaseModel):
     user_tier: UserTier
     action: FeatureType
     document: DocumentPayload
-    payload: Optional[ConversionRequest|SummarizationRequest|GrammarCorrectionRequest|TranslationRequest
-|ExplanationRequest|QuestionGenerationRequest|AnswerGenerationRequest]
+    payload: Optional[AnalyzerPayload]
 
 # QUESTION SCALING CONTRACT
 
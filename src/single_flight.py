@@ -0,0 +1,98 @@
+from threading import Lock
+import asyncio
+import concurrent.futures
+"""
+SINGLE-FLIGHT COALESCING — v1
+Responsibilities:
+- Collapse concurrent identical calls into one execution
+- Deliver the leader's result (or error) to every waiting caller
+- Work for sync (thread) and async (event loop) callers alike
+- Count coalesced calls to measure saved provider spend
+"""
+
+class SingleFlight:
+    """
+    Keyed in-flight call registry.
+    Each flight is a concurrent.futures.Future, so threads can block
+    on it and coroutines can await it through asyncio.wrap_future.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._flights: dict[str, concurrent.futures.Future] = {}
+
+        # Detached async flights, held until done (the loop keeps only weak refs)
+
+        self._tasks: set[asyncio.Task] = set()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn):
+        """
+        Runs fn() once per key among concurrent sync callers.
+        """
+        flight, leader = self._join(key)
+        if not leader:
+            return flight.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, flight, error=e)
+            raise
+        self._finish(key, flight, result=result)
+        return result
+
+    async def do_async(self, key: str, coro_fn):
+        """
+        Awaits coro_fn() once per key among concurrent callers.
+        The flight runs in a detached task and every caller, leader
+        included, awaits it shielded: cancelling any caller (e.g. a
+        sibling chunk cancelled by map_chunks) never cancels the
+        flight the others are waiting on.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(coro_fn())
+            with self._lock:
+                self._tasks.add(task)
+            task.add_done_callback(lambda done: self._settle(key, flight, done))
+        return await asyncio.shield(asyncio.wrap_future(flight))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
+
+    # Internals
+
+    def _join(self, key: str) -> tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = concurrent.futures.Future()
+            self._flights[key] = flight
+            self.leaders += 1
+            return flight, True
+
+    def _settle(self, key: str, flight: concurrent.futures.Future, task: asyncio.Task) -> None:
+        with self._lock:
+            self._tasks.discard(task)
+        if task.cancelled():
+            self._finish(key, flight, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, flight, error=task.exception())
+        else:
+            self._finish(key, flight, result=task.result())
+
+    def _finish(self, key: str, flight: concurrent.futures.Future, *, result=None, error=None) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
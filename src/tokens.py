@@ -0,0 +1,121 @@
+import math
+from fastapi import HTTPException
+from src.schema import FeatureType
+from src.validation import get_question_range
+"""
+LOCAL TOKEN ESTIMATION — v1
+Responsibilities:
+- Estimate prompt / document token counts without network or tokenizer files
+- Size max_tokens per feature from the input size
+- Reject requests that cannot fit the model context before any provider call
+This module MUST NOT:
+- Build or modify prompts
+- Call the AI provider
+"""
+
+# BPE density: ~4 characters per token for English / ASCII text,
+# denser for non-ASCII scripts where tokens cover fewer characters.
+
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_CHARS_PER_TOKEN = 2.0
+
+# Per-message framing tokens added by the chat format
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4.1-mini": 1_047_576,
+    "gpt-4.1-nano": 1_047_576,
+}
+DEFAULT_CONTEXT_TOKENS = 128_000
+
+# Completion sizing rules
+
+# Budgets are caps, not charges: too small a cap truncates the answer
+# (a 502), while unused headroom costs nothing
+
+MIN_COMPLETION_TOKENS = 256
+COMPLETION_MARGIN_TOKENS = 64
+COMPLETION_TOKENS_CEILING = 4096
+TOKENS_PER_QUESTION = 40
+TOKENS_PER_ANSWER = 120
+
+# Output size as a multiple of input size, per feature.
+# Translations into denser scripts take more tokens than the source;
+# explanations usually run longer than the text they explain.
+
+FEATURE_OUTPUT_RATIOS = {
+    FeatureType.summarize: 0.5,
+    FeatureType.grammar_correct: 1.1,
+    FeatureType.translate: 2.5,
+    FeatureType.explain: 3.0,
+    FeatureType.convert: 1.1,
+}
+
+# Estimation
+
+def estimate_tokens(text: str) -> int:
+    """
+    O(1) for ASCII strings (CPython tracks the ASCII flag),
+    one C-level scan otherwise.
+    """
+    if not text:
+        return 0
+    density = ASCII_CHARS_PER_TOKEN if text.isascii() else NON_ASCII_CHARS_PER_TOKEN
+    return math.ceil(len(text) / density)
+
+def estimate_prompt_tokens(system: str, prompt: str) -> int:
+    return estimate_tokens(system) + estimate_tokens(prompt) + 2 * MESSAGE_OVERHEAD_TOKENS
+
+# Completion Sizing
+
+def size_max_tokens(
+    feature: FeatureType,
+    input_tokens: int,
+    *,
+    word_count: int | None = None,
+    questions: list[str] | None = None,
+) -> int:
+    """
+    Completion budget for one feature.
+    Rewrites scale with the input; question / answer lists scale
+    with the number of items the contract allows.
+    """
+    if feature == FeatureType.generate_questions:
+        _, max_questions = get_question_range(word_count)
+        needed = max_questions * TOKENS_PER_QUESTION
+    elif feature == FeatureType.generate_answers:
+        needed = len(questions or []) * TOKENS_PER_ANSWER
+    else:
+        needed = math.ceil(input_tokens * FEATURE_OUTPUT_RATIOS[feature])
+    needed += COMPLETION_MARGIN_TOKENS
+    return min(COMPLETION_TOKENS_CEILING, max(MIN_COMPLETION_TOKENS, needed))
+
+def size_qa_max_tokens(word_count: int) -> int:
+    """
+    Fused Q&A: one question and one answer per allowed pair.
+    """
+    _, max_questions = get_question_range(word_count)
+    needed = max_questions * (TOKENS_PER_QUESTION + TOKENS_PER_ANSWER) + COMPLETION_MARGIN_TOKENS
+    return min(COMPLETION_TOKENS_CEILING, max(MIN_COMPLETION_TOKENS, needed))
+
+# Context Budget
+
+def context_limit(model: str) -> int:
+    return MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+
+def ensure_context_budget(model: str, prompt_tokens: int, max_tokens: int) -> None:
+    limit = context_limit(model)
+    if prompt_tokens + max_tokens > limit:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "token_budget_exceeded",
+                "message": (
+                    f"Estimated {prompt_tokens} prompt tokens plus {max_tokens} "
+                    f"completion tokens exceed the {limit}-token context of {model}."
+                ),
+            }
+        )
@@ -1,22 +1,39 @@
-from typing import Type
+import os
+import re
+from typing import Iterable, TypeVar
+from pydantic import BaseModel
 from src.schema import (
+    ACTION_PAYLOAD_MODELS,
     AnalyzerRequest,
     FeatureType,
     UserTier,
     MAX_DAILY_ACTIONS_FREE,
+    MAX_WORD_COUNT,
     QUESTION_SCALING_RULES,
     QuestionScale,
     StructuredTextResponse,
     NumberedListResponse,
-    ConversionRequest,
-    SummarizationRequest,
-    GrammarCorrectionRequest,
-    TranslationRequest,
-    ExplanationRequest,
-    QuestionGenerationRequest,
-    AnswerGenerationRequest,
 )
 
+# TRUSTED CONSTRUCTION
+
+# Debug switch: run full model validation even for values the
+# pipeline computed and checked itself
+
+SCHEMA_VALIDATE_TRUSTED = os.getenv("SCHEMA_VALIDATE_TRUSTED", "false").lower() == "true"
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+def construct_trusted(model: type[ModelT], **values) -> ModelT:
+    """
+    Builds a schema object from already-checked values without
+    re-running field validators or string constraints (which copy
+    large texts). Callers own every constraint the model declares.
+    """
+    if SCHEMA_VALIDATE_TRUSTED:
+        return model(**values)
+    return model.model_construct(**values)
+
 # CORE VALIDATION FUNCTIONS
 
 def validate_usage(snapshot) -> None:
@@ -33,16 +50,7 @@ def validate_action_payload_consistency(request: AnalyzerRequest) -> None:
     """
     if request.payload is None:
         raise ValueError("Payload is required")
-    action_payload_map: dict[FeatureType, Type] = {
-        FeatureType.convert: ConversionRequest,
-        FeatureType.summarize: SummarizationRequest,
-        FeatureType.grammar_correct: GrammarCorrectionRequest,
-        FeatureType.translate: TranslationRequest,
-        FeatureType.explain: ExplanationRequest,
-        FeatureType.generate_questions: QuestionGenerationRequest,
-        FeatureType.generate_answers: AnswerGenerationRequest,
-    }
-    expected_model = action_payload_map.get(request.action)
+    expected_model = ACTION_PAYLOAD_MODELS[request.action]
     if not isinstance(request.payload, expected_model):
         raise ValueError("Payload does not match declared action")
 
@@ -53,7 +61,7 @@ def validate_word_count_bounds(request: AnalyzerRequest) -> None:
     word_count = request.document.metadata.extracted_word_count
     if word_count < 1:
         raise ValueError("Document contains no words")
-    if word_count > 1000:
+    if word_count > MAX_WORD_COUNT:
         raise ValueError("Document exceeds maximum allowed word count")
 
 # QUESTION SCALING LOGIC
@@ -84,9 +92,13 @@ def validate_structured_text_response(content: str) -> StructuredTextResponse:
     """
     Ensures structured text response meets schema contract.
     """
-    if not content or not content.strip():
+    stripped = content.strip() if content else ""
+    if not stripped:
         raise ValueError("Response content cannot be empty")
-    return StructuredTextResponse(content=content)
+
+    # Non-empty after strip is the whole content constraint
+
+    return construct_trusted(StructuredTextResponse, content=stripped)
 
 def validate_numbered_list_response(items: list[str]) -> NumberedListResponse:
     """
@@ -99,6 +111,217 @@ def validate_numbered_list_response(items: list[str]) -> NumberedListResponse:
     
     return NumberedListResponse(items=items)
 
+# STREAMED NUMBERED LIST PARSING
+
+# Longest item number recognised ("N." with up to this many digits)
+
+_MAX_NUMBER_DIGITS = 4
+
+# "1.", "2.", ... precomputed for the whole-completion fast path
+
+_ITEM_PREFIXES = tuple(f"{n}." for n in range(1, 1001))
+
+class NumberedListStream:
+    """
+    Incremental numbered-list parser for streamed AI output.
+    Feed raw deltas; an item is released once the next item
+    (or the end of the stream) proves it complete.
+    Wrapped continuation lines are folded into the current item.
+    An optional (min, max) count_range fails as soon as an extra item
+    appears, and at close() when too few arrived.
+    """
+
+    def __init__(self, count_range: tuple[int, int] | None = None):
+        self._partial: list[str] = []
+        self._current: list[str] | None = None
+        self._expected = 1
+        self._max_items = count_range[1] if count_range is not None else None
+        self._count_range = count_range
+
+    def feed(self, chunk: str) -> list[str]:
+        """
+        Returns the items completed by this chunk.
+        """
+        if "\n" not in chunk:
+
+            # Mid-line delta: buffer without re-copying the partial line
+
+            self._partial.append(chunk)
+            return []
+        lines = chunk.split("\n")
+        if self._partial:
+            self._partial.append(lines[0])
+            lines[0] = "".join(self._partial)
+        self._partial = [lines.pop()]
+        return self._consume(lines)
+
+    def close(self) -> list[str]:
+        """
+        Flushes the final item at end of stream.
+        """
+        completed = self._consume(["".join(self._partial)])
+        self._partial = []
+        if self._current is None:
+            raise ValueError("Response list cannot be empty")
+        completed.append(" ".join(self._current))
+        self._current = None
+        if self._count_range is not None and self._expected - 1 < self._count_range[0]:
+            raise self._count_error(self._expected - 1)
+        return completed
+
+    def parse(self, text: str) -> list[str]:
+        """
+        Whole-completion entry point. Returns every item and closes
+        the stream. When every non-empty line opens the next item
+        (the usual shape), one split, one strip per line and a C-level
+        prefix check settle it; wrapped items and bad numbering go
+        through the line parser for its exact items and errors.
+        """
+        if self._current is None and not self._partial:
+            items = list(filter(None, map(str.strip, text.split("\n"))))
+            count = len(items)
+            if 0 < count <= len(_ITEM_PREFIXES) and all(map(str.startswith, items, _ITEM_PREFIXES)):
+                if self._count_range is not None and not (
+                    self._count_range[0] <= count <= self._count_range[1]
+                ):
+                    raise self._count_error(count if count < self._count_range[0] else "more")
+                self._expected = count + 1
+                return items
+        *lines, last = text.split("\n")
+        completed = self._consume(lines)
+        self._partial.append(last)
+        return completed + self.close()
+
+    def _consume(self, lines: list[str]) -> list[str]:
+        """
+        A line is a new item when its leading digits before "." are
+        present; they must equal the expected number. Anything else
+        continues the current item.
+        """
+        completed = []
+        current = self._current
+        expected = self._expected
+        max_items = self._max_items
+        for line in lines:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            dot = stripped.find(".", 1, _MAX_NUMBER_DIGITS + 1)
+            if dot < 0 or not stripped[:dot].isdecimal():
+                if current is None:
+                    raise ValueError("Items must be sequentially numbered starting at 1")
+                current.append(stripped)
+                continue
+            if int(stripped[:dot]) != expected:
+                raise ValueError("Items must be sequentially numbered starting at 1")
+            if max_items is not None and expected > max_items:
+                raise self._count_error("more")
+            if current is not None:
+                completed.append(current[0] if len(current) == 1 else " ".join(current))
+            current = [stripped]
+            expected += 1
+        self._current = current
+        self._expected = expected
+        return completed
+
+    def _count_error(self, got: int | str) -> ValueError:
+        low, high = self._count_range
+        return ValueError(f"Expected between {low} and {high} items, got {got}")
+
+def parse_numbered_list(
+    source: str | Iterable[str],
+    *,
+    count_range: tuple[int, int] | None = None,
+) -> NumberedListResponse:
+    """
+    One-pass parse of a raw completion (whole string or chunk stream)
+    into a NumberedListResponse. Items leave the parser stripped,
+    non-empty and sequentially numbered, so the model is not
+    re-validated item by item.
+    """
+    parser = NumberedListStream(count_range)
+    if isinstance(source, str):
+        return construct_trusted(NumberedListResponse, items=parser.parse(source))
+    items = []
+    for chunk in source:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    return construct_trusted(NumberedListResponse, items=items)
+
+def numbered_list_count_range(
+    feature: FeatureType,
+    *,
+    word_count: int | None = None,
+    questions: list[str] | None = None,
+) -> tuple[int, int] | None:
+    """
+    Item count the contract allows for a numbered-list feature.
+    """
+    if feature == FeatureType.generate_questions and word_count is not None:
+        return get_question_range(word_count)
+    if feature == FeatureType.generate_answers and questions:
+        return (len(questions), len(questions))
+    return None
+
+# FUSED Q&A OUTPUT PARSING
+
+_ANSWER_LABEL = re.compile(r"\s+A:\s*")
+_QUESTION_LABEL = re.compile(r"(\d+\.)\s*Q:\s*")
+
+def parse_qa_output(
+    output: str,
+    word_count: int,
+) -> tuple[NumberedListResponse, NumberedListResponse]:
+    """
+    Parses "N. Q: ... / A: ..." pairs into numbered question and
+    answer lists, validated like generate_questions / generate_answers.
+    """
+    parser = NumberedListStream()
+    items = parser.feed(output) + parser.close()
+    questions: list[str] = []
+    answers: list[str] = []
+    for item in items:
+        label = _QUESTION_LABEL.match(item)
+        if label is None:
+            raise ValueError("Each pair must start with a numbered question")
+        parts = _ANSWER_LABEL.split(item[label.end():], maxsplit=1)
+        if len(parts) != 2 or not parts[0].strip() or not parts[1].strip():
+            raise ValueError("Each question must be followed by an answer")
+        questions.append(f"{label.group(1)} {parts[0].strip()}")
+        answers.append(f"{label.group(1)} {parts[1].strip()}")
+    min_q, max_q = get_question_range(word_count)
+    if not min_q <= len(questions) <= max_q:
+        raise ValueError(f"Expected between {min_q} and {max_q} questions, got {len(questions)}")
+    return (
+        validate_numbered_list_response(questions),
+        validate_numbered_list_response(answers),
+    )
+
+# SEGMENTED OUTPUT PARSING
+
+SEGMENT_MARKER = "<<<SEGMENT {index}>>>"
+_SEGMENT_MARKER_LINE = re.compile(r"^[ \t]*<<<SEGMENT (\d+)>>>[ \t]*$", re.MULTILINE)
+
+def segment_marker(index: int) -> str:
+    return SEGMENT_MARKER.format(index=index)
+
+def parse_segmented_output(output: str, expected: int) -> list[str]:
+    """
+    Splits a batched output on its marker lines.
+    Markers must appear exactly once each, in order 1..expected,
+    with non-empty text after each.
+    """
+    matches = list(_SEGMENT_MARKER_LINE.finditer(output))
+    if [int(m.group(1)) for m in matches] != list(range(1, expected + 1)):
+        raise ValueError("Segment markers missing, duplicated or out of order")
+    if output[:matches[0].start()].strip():
+        raise ValueError("Unexpected text before the first segment marker")
+    ends = [m.start() for m in matches[1:]] + [len(output)]
+    segments = [output[m.end():end].strip() for m, end in zip(matches, ends)]
+    if not all(segments):
+        raise ValueError("Segment cannot be empty")
+    return segments
+
 # MASTER REQUEST VALIDATOR
 
 def validate_analyzer_request(
@@ -109,6 +332,13 @@ def validate_analyzer_request(
     Full deterministic validation pipeline.
     """
     validate_usage(usage_snapshot)
+    validate_analyzer_contract(request)
+
+def validate_analyzer_contract(request: AnalyzerRequest) -> None:
+    """
+    Request-only checks (no usage snapshot), for callers whose
+    quota is enforced elsewhere.
+    """
     validate_action_payload_consistency(request)
     validate_word_count_bounds(request)
 
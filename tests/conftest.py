@@ -0,0 +1,24 @@
+import pytest
+
+# Helpers
+
+class FakeClock:
+    """
+    Manually driven clock for TTL, breaker, LRU and pacing tests.
+    step advances the time on every read; sleep() advances it by hand.
+    """
+
+    def __init__(self, now: float = 1000.0, step: float = 0.0):
+        self.now = now
+        self.step = step
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,73 @@
+import pytest
+from src.ai_cache import ResponseCache, completion_key
+
+# KEYING
+
+def test_completion_key_is_stable():
+    assert completion_key("m", 10, "sys", "prompt") == completion_key("m", 10, "sys", "prompt")
+
+@pytest.mark.parametrize("args", [
+    ("other", 10, "sys", "prompt"),
+    ("m", 11, "sys", "prompt"),
+    ("m", 10, "other", "prompt"),
+    ("m", 10, "sys", "other"),
+    ("m", 10, "sysp", "rompt"),
+])
+def test_completion_key_changes_with_every_field(args):
+    assert completion_key(*args) != completion_key("m", 10, "sys", "prompt")
+
+# HIT / MISS
+
+def test_get_miss_then_hit():
+    cache = ResponseCache()
+    assert cache.get("k") is None
+    cache.set("k", "value")
+    assert cache.get("k") == "value"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_precheck_miss_is_not_counted():
+    cache = ResponseCache()
+    assert cache.get("k", record_miss=False) is None
+    assert cache.stats()["misses"] == 0
+
+# TTL
+
+def test_expired_entry_is_evicted(clock):
+    cache = ResponseCache(ttl_seconds=10, clock=clock)
+    cache.set("k", "value")
+    clock.now += 11
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+
+# LRU BOUNDS
+
+def test_entry_limit_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+def test_byte_limit_evicts_until_within_bound():
+    cache = ResponseCache(max_bytes=400)
+    cache.set("a", "x" * 100)
+    cache.set("b", "y" * 100)
+    cache.set("c", "z" * 100)
+    stats = cache.stats()
+    assert stats["bytes"] <= 400
+    assert cache.get("c") == "z" * 100
+    assert cache.get("a") is None
+
+def test_value_larger_than_cache_is_not_stored():
+    cache = ResponseCache(max_bytes=100)
+    cache.set("k", "x" * 1000)
+    assert cache.stats()["entries"] == 0
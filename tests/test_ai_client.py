@@ -1,8 +1,20 @@
 import pytest
 from fastapi import HTTPException
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
+import asyncio
+import httpx
+import openai
 import concurrent.futures
-from src.ai_client import AIClient
+import threading
+import time
+from src import ai_client
+from src.ai_client import AI_MODEL, AIClient, ProviderExecutor
+from src.ai_cache import ResponseCache
+from src.completion_store import CompletionStore
+from src.resilience import CircuitBreaker, ResilientCaller, RetryPolicy
+from src.ai_client import is_transient_provider_error
+from src.routing import AI_ROUTING_MIN_SAMPLES
+from src.schema import FeatureType
 
 # Helpers
 
@@ -57,6 +69,18 @@ def test_ai_returns_null_content():
         assert exc.value.status_code == 502
         assert "null content" in exc.value.detail.lower()
 
+def test_truncated_completion_raises_502_and_is_not_cached():
+    client = AIClient()
+    response = mock_openai_response("Cut off mid")
+    response.choices[0].finish_reason = "length"
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = response
+        with pytest.raises(HTTPException) as exc:
+            client.generate("Valid prompt")
+    assert exc.value.status_code == 502
+    assert exc.value.detail["error"] == "ai_output_truncated"
+    assert client.lookup("Valid prompt") is None
+
 def test_provider_timeout():
     client = AIClient()
     with patch(
@@ -91,3 +115,416 @@ def test_validation_failure_propagates():
             client.generate("Valid prompt")
         assert exc.value.status_code == 422
         assert exc.value.detail == "Invalid structure"
+
+# Async execution path
+
+def test_generate_async_success():
+    client = AIClient()
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value = mock_openai_response("Async response")
+        result = asyncio.run(client.generate_async("Valid prompt"))
+        assert result == "Async response"
+        mock_create.assert_awaited_once()
+
+def test_generate_async_empty_prompt_raises_500():
+    client = AIClient()
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(client.generate_async("   "))
+    assert exc.value.status_code == 500
+
+def test_generate_async_timeout(monkeypatch):
+    client = AIClient()
+    async def slow_provider(prompt):
+        await asyncio.sleep(1)
+        return "late"
+    monkeypatch.setattr("src.ai_client.AI_TIMEOUT_SECONDS", 0.01)
+    with patch.object(client, "_call_provider_async", side_effect=slow_provider):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(client.generate_async("Valid prompt"))
+    assert exc.value.status_code == 504
+    assert exc.value.detail["error"] == "ai_timeout"
+
+def test_builtin_timeout_maps_to_504_without_aliases(monkeypatch):
+
+    # Before 3.11 the concurrent.futures / asyncio timeouts are distinct
+    # from the builtin TimeoutError that ResilientCaller raises
+
+    monkeypatch.setattr(concurrent.futures, "TimeoutError", type("FuturesTimeout", (Exception,), {}))
+    monkeypatch.setattr(asyncio, "TimeoutError", type("AsyncioTimeout", (Exception,), {}))
+    client = AIClient()
+    async def timed_out(*args, **kwargs):
+        raise TimeoutError("AI provider did not respond in time")
+    with patch.object(client.resilience, "call", side_effect=TimeoutError("late")):
+        with pytest.raises(HTTPException) as exc:
+            client.generate("Sync timeout prompt")
+    assert exc.value.status_code == 504
+    with patch.object(client.resilience, "call_async", side_effect=timed_out):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(client.generate_async("Async timeout prompt"))
+    assert exc.value.status_code == 504
+
+def test_generate_async_provider_exception():
+    client = AIClient()
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock,
+        side_effect=Exception("Provider crashed")
+    ):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(client.generate_async("Valid prompt"))
+    assert exc.value.status_code == 502
+    assert "Provider crashed" in exc.value.detail
+
+# Shared executor
+
+def test_sync_timeout_returns_without_waiting_for_provider(monkeypatch):
+    client = AIClient()
+    release = threading.Event()
+    def slow_provider(prompt):
+        release.wait(5)
+        return "late"
+    monkeypatch.setattr("src.ai_client.AI_TIMEOUT_SECONDS", 0.05)
+    with patch.object(client, "_call_provider", side_effect=slow_provider):
+        started = time.monotonic()
+        with pytest.raises(HTTPException) as exc:
+            client.generate("Valid prompt")
+        elapsed = time.monotonic() - started
+    release.set()
+    assert exc.value.status_code == 504
+    assert elapsed < 1
+
+def test_executor_reports_queue_depth_and_active_workers():
+    executor = ProviderExecutor(max_workers=1)
+    release = threading.Event()
+    running = executor.submit(release.wait, 5)
+    queued = executor.submit(lambda: "queued")
+    deadline = time.monotonic() + 2
+    while executor.stats()["active_workers"] != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = executor.stats()
+    assert stats == {"max_workers": 1, "queue_depth": 1, "active_workers": 1}
+
+    # Abandoning a queued call cancels it and frees its queue slot
+    
+    executor.abandon(queued)
+    assert queued.cancelled()
+    assert executor.stats()["queue_depth"] == 0
+    release.set()
+    running.result(timeout=2)
+    assert executor.stats()["active_workers"] == 0
+    executor.shutdown()
+
+def test_executor_rejects_zero_workers():
+    with pytest.raises(ValueError):
+        ProviderExecutor(max_workers=0)
+
+def test_configure_executor_replaces_shared_pool():
+    previous_size = ai_client.get_executor_stats()["max_workers"]
+    try:
+        ai_client.configure_executor(3)
+        assert ai_client.get_executor_stats()["max_workers"] == 3
+    finally:
+        ai_client.configure_executor(previous_size)
+
+def test_configure_executor_lets_queued_calls_finish():
+    previous_size = ai_client.get_executor_stats()["max_workers"]
+    ai_client.configure_executor(1)
+    old = ai_client._executor
+    release = threading.Event()
+    try:
+        running = old.submit(release.wait, 5)
+        queued = old.submit(lambda: "queued")
+        ai_client.configure_executor(previous_size)
+        release.set()
+        assert running.result(timeout=2) is True
+        assert queued.result(timeout=2) == "queued"
+    finally:
+        release.set()
+        ai_client.configure_executor(previous_size)
+
+# Response cache
+
+def test_repeated_prompt_served_from_cache():
+    client = AIClient()
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = mock_openai_response("Cached response")
+        assert client.generate("Same prompt") == "Cached response"
+        assert client.generate("Same prompt") == "Cached response"
+        assert mock_create.call_count == 1
+    assert client.lookup("Same prompt") == "Cached response"
+    assert client.cache.stats()["hits"] == 2
+
+def test_async_path_shares_cache():
+    client = AIClient()
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = mock_openai_response("Shared response")
+        client.generate("Shared prompt")
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock
+    ) as mock_async_create:
+        assert asyncio.run(client.generate_async("Shared prompt")) == "Shared response"
+        mock_async_create.assert_not_awaited()
+
+def test_failed_generation_is_not_cached():
+    client = AIClient(cache=ResponseCache())
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = mock_openai_response("")
+        with pytest.raises(HTTPException):
+            client.generate("Failing prompt")
+    assert client.lookup("Failing prompt") is None
+
+# Persistent completion store
+
+def test_store_hit_skips_provider_and_warms_memory(tmp_path):
+    store = CompletionStore(tmp_path / "completions.db")
+    writer = AIClient(store=store)
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = mock_openai_response("Persisted response")
+        writer.generate("Persisted prompt")
+
+    # A fresh client (new worker / restart) shares the warm store
+    
+    reader = AIClient(store=CompletionStore(tmp_path / "completions.db"))
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        assert reader.generate("Persisted prompt") == "Persisted response"
+        mock_create.assert_not_called()
+    assert reader.cache.get(reader.cache_key("Persisted prompt")) == "Persisted response"
+
+def test_async_store_calls_run_off_the_event_loop(tmp_path):
+    store = CompletionStore(tmp_path / "completions.db")
+    client = AIClient(store=store)
+    loop_threads = []
+    store_threads = []
+    original_get, original_set = store.get, store.set
+    def get(key):
+        store_threads.append(threading.get_ident())
+        return original_get(key)
+    def set_(key, value):
+        store_threads.append(threading.get_ident())
+        original_set(key, value)
+    async def run():
+        loop_threads.append(threading.get_ident())
+        return await client.generate_async("Async stored prompt")
+    with patch.object(store, "get", get), patch.object(store, "set", set_), \
+         patch("src.ai_client.async_client.chat.completions.create", new_callable=AsyncMock) as mock_create:
+        mock_create.return_value = mock_openai_response("Stored async")
+        assert asyncio.run(run()) == "Stored async"
+    assert len(store_threads) == 2
+    assert loop_threads[0] not in store_threads
+
+# Single-flight coalescing
+
+def test_identical_async_prompts_share_one_provider_call():
+    client = AIClient()
+    async def slow_response(**kwargs):
+        await asyncio.sleep(0.05)
+        return mock_openai_response("Coalesced response")
+    async def run():
+        return await asyncio.gather(
+            *(client.generate_async("Popular prompt") for _ in range(5))
+        )
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock,
+        side_effect=slow_response
+    ) as mock_create:
+        results = asyncio.run(run())
+    assert results == ["Coalesced response"] * 5
+    assert mock_create.await_count == 1
+    assert client.flights.stats()["coalesced"] == 4
+
+# Streaming
+
+def mock_stream_chunk(content, finish_reason=None):
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = content
+    chunk.choices[0].finish_reason = finish_reason
+    return chunk
+
+async def collect(agen):
+    return [part async for part in agen]
+
+def test_stream_async_yields_deltas_and_caches_result():
+    client = AIClient()
+    async def fake_stream():
+        for part in ["Hello", None, " world"]:
+            yield mock_stream_chunk(part)
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock,
+        return_value=fake_stream()
+    ) as mock_create:
+        parts = asyncio.run(collect(client.stream_async("Stream prompt")))
+    assert parts == ["Hello", " world"]
+    assert mock_create.call_args.kwargs["stream"] is True
+    assert client.lookup("Stream prompt") == "Hello world"
+
+    # Cached completions are replayed whole
+    
+    assert asyncio.run(collect(client.stream_async("Stream prompt"))) == ["Hello world"]
+
+def test_stream_async_empty_stream_raises_502():
+    client = AIClient()
+    async def empty_stream():
+        for part in []:
+            yield part
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock,
+        return_value=empty_stream()
+    ):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(collect(client.stream_async("Stream prompt")))
+    assert exc.value.status_code == 502
+
+def test_stream_async_truncated_stream_raises_502_and_is_not_cached():
+    client = AIClient()
+    async def truncated_stream():
+        yield mock_stream_chunk("Cut off")
+        yield mock_stream_chunk(None, finish_reason="length")
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock,
+        return_value=truncated_stream()
+    ):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(collect(client.stream_async("Stream prompt")))
+    assert exc.value.detail["error"] == "ai_output_truncated"
+    assert client.lookup("Stream prompt") is None
+
+# Resilience layer
+
+def make_resilient_client(**kwargs) -> AIClient:
+    kwargs.setdefault("retry", RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.001))
+    return AIClient(resilience=ResilientCaller(is_transient_provider_error, **kwargs))
+
+def test_transient_provider_error_is_retried():
+    client = make_resilient_client()
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.side_effect = [
+            ConnectionError("connection reset"),
+            mock_openai_response("Recovered response"),
+        ]
+        assert client.generate("Valid prompt") == "Recovered response"
+        assert mock_create.call_count == 2
+
+def test_open_circuit_fails_fast_with_503():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30)
+    client = make_resilient_client(retry=RetryPolicy(max_attempts=1), breaker=breaker)
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.side_effect = ConnectionError("provider down")
+        with pytest.raises(HTTPException) as first:
+            client.generate("First prompt")
+        assert first.value.status_code == 502
+        with pytest.raises(HTTPException) as second:
+            asyncio.run(client.generate_async("Second prompt"))
+        assert mock_create.call_count == 1
+    assert second.value.status_code == 503
+    assert second.value.detail["error"] == "ai_unavailable"
+    assert second.value.headers["Retry-After"] == "30"
+
+# Token budget
+
+def test_max_tokens_is_forwarded_and_part_of_cache_key():
+    client = AIClient()
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = mock_openai_response("Sized response")
+        client.generate("Sized prompt", max_tokens=200)
+        assert mock_create.call_args.kwargs["max_tokens"] == 200
+        client.generate("Sized prompt", max_tokens=300)
+        assert mock_create.call_count == 2
+
+def test_system_override_is_forwarded_and_part_of_cache_key():
+    client = AIClient()
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = mock_openai_response("Layout response")
+        client.generate("Layout prompt", system="Static contract")
+        messages = mock_create.call_args.kwargs["messages"]
+        assert messages[0] == {"role": "system", "content": "Static contract"}
+        client.generate("Layout prompt")
+        assert mock_create.call_count == 2
+    assert client.cache_key("Layout prompt", system="Static contract") != client.cache_key("Layout prompt")
+
+def test_model_override_is_forwarded_and_part_of_cache_key():
+    client = AIClient()
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        mock_create.return_value = mock_openai_response("Routed response")
+        client.generate("Routed prompt", model="gpt-4.1-nano")
+        assert mock_create.call_args.kwargs["model"] == "gpt-4.1-nano"
+        client.generate("Routed prompt")
+        assert mock_create.call_args.kwargs["model"] == AI_MODEL
+        assert mock_create.call_count == 2
+
+# Load-aware routing
+
+def test_load_signals_withhold_sparse_latency_and_errors():
+    client = AIClient()
+    client.resilience.latencies.record(30.0)
+    client.resilience.outcomes.record(True)
+    signals = client.load_signals()
+    assert signals.latency_p95_seconds is None
+    assert signals.error_rate is None
+    assert client.select_route(FeatureType.summarize, 100, 300).model == AI_MODEL
+
+def make_routed_client() -> AIClient:
+    with patch("src.routing.AI_ROUTING_ENABLED", True):
+        client = AIClient()
+    for _ in range(AI_ROUTING_MIN_SAMPLES):
+        client.resilience.outcomes.record(True)
+    return client
+
+def test_sustained_errors_route_to_fallback_tier():
+    route = make_routed_client().select_route(FeatureType.summarize, 100, 300)
+    assert route.name == "fallback"
+    assert route.model != AI_MODEL
+
+def test_routed_lookup_serves_standard_tier_cache_under_pressure():
+    client = make_routed_client()
+    client.remember("Warm prompt", "Standard answer", max_tokens=300)
+    cached, route = asyncio.run(
+        client.lookup_routed_async("Warm prompt", FeatureType.summarize, 100, 300)
+    )
+    assert cached == "Standard answer"
+    assert route.name == "standard"
+    cached, route = asyncio.run(
+        client.lookup_routed_async("Cold prompt", FeatureType.summarize, 100, 300)
+    )
+    assert cached is None
+    assert route.name == "fallback"
+
+def test_oversized_prompt_rejected_before_provider_call():
+    client = AIClient()
+    with patch("src.ai_client.client.chat.completions.create") as mock_create:
+        with pytest.raises(HTTPException) as exc:
+            client.generate("word " * 200_000)
+        mock_create.assert_not_called()
+    assert exc.value.status_code == 413
+
+# Connection warm-up
+
+def test_warm_up_opens_connections_and_tolerates_http_errors():
+    client = AIClient()
+    status_error = openai.APIStatusError(
+        "unauthorized",
+        response=httpx.Response(401, request=httpx.Request("GET", "https://api.test/v1/models")),
+        body=None,
+    )
+    with patch("src.ai_client.async_client.with_options") as mock_async_options, \
+         patch("src.ai_client.client.with_options") as mock_sync_options:
+        mock_async_options.return_value.models.list = AsyncMock(side_effect=status_error)
+        mock_sync_options.return_value.models.list.side_effect = status_error
+        asyncio.run(client.warm_up_async())
+        assert mock_async_options.return_value.models.list.await_count == ai_client.AI_WARMUP_CONNECTIONS
+        mock_sync_options.return_value.models.list.assert_called_once()
+
+def test_warm_up_surfaces_connection_failures():
+    client = AIClient()
+    with patch("src.ai_client.async_client.with_options") as mock_async_options:
+        mock_async_options.return_value.models.list = AsyncMock(side_effect=ConnectionError("dns"))
+        with pytest.raises(ConnectionError):
+            asyncio.run(client.warm_up_async())
@@ -1,7 +1,20 @@
 import pytest
 from fastapi import HTTPException
 from src.schema import FeatureType
-from src.ai_processing import build_prompt, process_with_ai
+from src.ai_processing import (
+    build_prompt,
+    build_prompt_messages,
+    build_qa_prompt,
+    process_with_ai,
+    warm_prompt_templates,
+    BASE_CONSTRAINTS,
+    FEATURE_RULES,
+    PROMPT_CONTRACT_V1,
+    PROMPT_CONTRACT_V2,
+    PROMPT_TEMPLATES,
+    get_prompt_template,
+    V2_SYSTEM_MESSAGES,
+)
 
 # BASIC SUCCESS CASES
 
@@ -116,3 +129,79 @@ def test_process_with_ai_returns_prompt():
     )
     assert isinstance(result, str)
     assert text in result
+
+# STARTUP WARM-UP
+
+def test_warm_prompt_templates_builds_every_feature():
+    assert warm_prompt_templates() == len(FEATURE_RULES)
+
+# V2 PROMPT LAYOUT
+
+def test_v2_system_message_is_identical_across_requests():
+    first = build_prompt_messages(
+        "First document.",
+        FeatureType.generate_questions,
+        word_count=100,
+    )
+    second = build_prompt_messages(
+        "A completely different second document.",
+        FeatureType.generate_questions,
+        word_count=900,
+    )
+    assert first.system == second.system == V2_SYSTEM_MESSAGES[FeatureType.generate_questions]
+    assert first.user != second.user
+
+def test_v2_user_message_puts_document_last():
+    messages = build_prompt_messages(
+        "Bonjour le monde.",
+        FeatureType.translate,
+        target_language="German",
+    )
+    assert "German" in messages.user
+    assert "German" not in messages.system
+    assert messages.user.endswith("DOCUMENT CONTENT:\nBonjour le monde.")
+
+def test_v2_validates_like_v1():
+    with pytest.raises(HTTPException) as exc:
+        build_prompt_messages("Some text", FeatureType.translate)
+    assert exc.value.status_code == 400
+
+# FUSED Q&A PROMPT
+
+def test_qa_prompt_uses_question_scaling():
+    prompt = build_qa_prompt("Sample text.", word_count=500)
+    assert "QUESTION AND ANSWER GENERATION" in prompt
+    assert "between 8 and 10 questions" in prompt
+    assert prompt.endswith("Sample text.")
+
+def test_qa_prompt_requires_word_count():
+    with pytest.raises(HTTPException):
+        build_qa_prompt("Sample text.")
+
+# PROMPT TEMPLATE REGISTRY
+
+def test_registry_covers_every_contract_and_feature():
+    assert set(PROMPT_TEMPLATES) == {
+        (contract, feature)
+        for contract in (PROMPT_CONTRACT_V1, PROMPT_CONTRACT_V2)
+        for feature in FEATURE_RULES
+    }
+
+@pytest.mark.parametrize("text", ["Plain text.", "  Padded text. \n", "Ünïcode tëxt"])
+def test_v1_prompt_matches_legacy_layout(text):
+    legacy = f"""
+{BASE_CONSTRAINTS}
+{FEATURE_RULES[FeatureType.translate]}
+
+TARGET LANGUAGE:
+German
+
+
+DOCUMENT CONTENT:
+{text}
+""".strip()
+    assert build_prompt(text, FeatureType.translate, target_language="German") == legacy
+
+def test_unknown_template_is_rejected():
+    with pytest.raises(HTTPException):
+        get_prompt_template("v0", FeatureType.summarize)
@@ -1,6 +1,6 @@
 import pytest
 from fastapi import HTTPException
-from src.ai_validation import validate_text_input, MAX_INPUT_CHARS
+from src.ai_validation import scan_text, validate_text_input, validate_text_with_stats, MAX_INPUT_CHARS
 from src.schema import MAX_WORD_COUNT
 
 # SUCCESS CASE
@@ -85,3 +85,32 @@ def test_word_limit_exact_boundary_passes():
     text = "word " * MAX_WORD_COUNT
     result = validate_text_input(text)
     assert result.strip() == text.strip()
+
+# TEXT SCANNER
+
+def test_scan_reports_counts_and_trimmed_bounds():
+    text = "  First paragraph here.\n\n  Second one.\n "
+    stats = scan_text(text)
+    assert text[stats.start:stats.end] == text.strip()
+    assert stats.words == 5
+    assert stats.paragraphs == 2
+    assert stats.letters == sum(c.isalpha() for c in text)
+    assert stats.printable
+
+def test_scan_flags_control_and_non_ascii_characters():
+    assert not scan_text("Hello\x00world").printable
+    assert not scan_text("Héllo world").printable
+
+def test_scan_matches_str_split_on_ascii_separators():
+    text = "one\x1ctwo\tthree\x0bfour"
+    assert scan_text(text).words == len(text.split())
+
+def test_scan_of_whitespace_only_text_is_empty():
+    stats = scan_text(" \n\t ")
+    assert stats.length == 0
+    assert stats.words == 0
+
+def test_validate_text_with_stats_returns_trimmed_text_and_record():
+    text, stats = validate_text_with_stats("  Hello brave new world  ")
+    assert text == "Hello brave new world"
+    assert stats.words == 4
@@ -1,8 +1,9 @@
+import time
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import HTTPException
-from unittest.mock import patch
-from backend.api import app
+from unittest.mock import patch, AsyncMock
+from backend.api import BODY_LIMITS, DEFAULT_BODY_LIMIT, app
 
 client = TestClient(app)
 
@@ -16,9 +17,90 @@ def test_health_check():
     assert body["service"] == "AI Document Analyzer"
     assert body["version"] == "1.0.0"
 
+# READINESS CHECK
+
+def test_ready_reports_warming_up_before_startup():
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+@patch("backend.api.ai_client.warm_up_async", new_callable=AsyncMock)
+def test_ready_after_warm_up(mock_warm_up):
+    with TestClient(app) as started:
+        deadline = time.monotonic() + 5
+        response = started.get("/ready")
+        while response.status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            response = started.get("/ready")
+        assert response.status_code == 200
+        checks = response.json()["checks"]
+        assert checks["provider"] == "ok"
+        assert checks["prompt_templates"] == 7
+        mock_warm_up.assert_awaited_once()
+
+@patch(
+    "backend.api.ai_client.warm_up_async",
+    new_callable=AsyncMock,
+    side_effect=ConnectionError("dns failure")
+)
+def test_provider_warm_up_failure_does_not_block_readiness(mock_warm_up):
+    with TestClient(app) as started:
+        deadline = time.monotonic() + 5
+        response = started.get("/ready")
+        while response.status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            response = started.get("/ready")
+        assert response.json()["checks"]["provider"] == "failed: ConnectionError"
+
+# RUNTIME METRICS
+
+def test_metrics_exposes_executor_stats():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    stats = response.json()["ai_executor"]
+    assert {"max_workers", "queue_depth", "active_workers"} <= stats.keys()
+
+def test_metrics_exposes_routing_signals():
+    routing = client.get("/metrics").json()["ai_routing"]
+    assert routing["tiers"][-1] == "standard"
+    assert {"in_flight", "latency_p95_seconds", "error_rate"} <= routing["signals"].keys()
+
+# REQUEST BODY CEILING
+
+@patch("backend.route.ai_client.generate_async")
+def test_declared_oversized_body_rejected_before_read(mock_generate):
+    body = b'{"text": "' + b"a" * DEFAULT_BODY_LIMIT + b'", "feature": "summarize"}'
+    response = client.post(
+        "/api/v1/process",
+        content=body,
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"]["error"] == "payload_too_large"
+    mock_generate.assert_not_called()
+
+@patch("backend.route.ai_client.generate_async")
+def test_chunked_oversized_body_rejected_while_streaming(mock_generate):
+    def chunks():
+        yield b'{"text": "'
+        for _ in range(DEFAULT_BODY_LIMIT // 1024 + 10):
+            yield b"a" * 1024
+        yield b'", "feature": "summarize"}'
+    response = client.post(
+        "/api/v1/process",
+        content=chunks(),
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"]["error"] == "payload_too_large"
+    mock_generate.assert_not_called()
+
+def test_large_document_route_has_a_higher_ceiling():
+    assert BODY_LIMITS["/api/v1/process/large"] > DEFAULT_BODY_LIMIT
+
 # ROUTER REGISTRATION
 
-@patch("backend.route.ai_client.generate")
+@patch("backend.route.ai_client.generate_async")
 @patch("backend.route.rate_limit_ai")
 def test_v1_route_registered(mock_rate_limit, mock_generate):
     mock_generate.return_value = "OK"
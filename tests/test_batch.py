@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+import pytest
+from fastapi import HTTPException
+from src.batch import RateGovernor, main, process_record, run_batch
+
+# Helpers
+
+def write_jsonl(path: Path, records: list) -> Path:
+    path.write_text(
+        "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records) + "\n",
+        encoding="utf-8",
+    )
+    return path
+
+def read_jsonl(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+def fake_client(result: str = "AI output") -> MagicMock:
+    client = MagicMock()
+    client.lookup.return_value = None
+    client.generate.return_value = result
+    return client
+
+# PER-RECORD PIPELINE
+
+def test_process_record_success():
+    client = fake_client("Summary")
+    line = json.dumps({"text": "Hello world", "feature": "summarize"})
+    output = process_record(line, client, RateGovernor(0))
+    assert output["status"] == "ok"
+    assert output["result"] == "Summary"
+    assert "latency_ms" in output
+
+def test_process_record_reports_validation_errors():
+    output = process_record(json.dumps({"text": " ", "feature": "summarize"}), fake_client(), RateGovernor(0))
+    assert output["status_code"] == 400
+    assert output["detail"]["error"] == "empty_input"
+
+def test_process_record_reports_bad_records():
+    output = process_record('{"text": "Hello world"}', fake_client(), RateGovernor(0))
+    assert output["status_code"] == 422
+
+def test_process_record_reports_ai_errors():
+    client = fake_client()
+    client.generate.side_effect = HTTPException(status_code=504, detail={"error": "ai_timeout"})
+    output = process_record(json.dumps({"text": "Hello world", "feature": "summarize"}), client, RateGovernor(0))
+    assert output["status_code"] == 504
+
+def test_cache_hits_skip_rate_governor():
+    client = fake_client()
+    client.lookup.return_value = "cached"
+    governor = MagicMock()
+    process_record(json.dumps({"text": "Hello world", "feature": "summarize"}), client, governor)
+    governor.acquire.assert_not_called()
+
+# RATE GOVERNANCE
+
+def test_rate_governor_spaces_calls(clock):
+    started = clock.now
+    governor = RateGovernor(2, burst=1, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        governor.acquire()
+    assert clock.now - started == pytest.approx(2.0)
+
+# RUNNER
+
+def test_run_batch_preserves_input_order_and_reports_stats(tmp_path):
+    records = [{"text": f"Document number {i}", "feature": "summarize"} for i in range(10)]
+    records.insert(3, "not json")
+    input_path = write_jsonl(tmp_path / "in.jsonl", records)
+    output_path = tmp_path / "out.jsonl"
+    summary = run_batch(input_path, output_path, workers=4, client=fake_client())
+    results = read_jsonl(output_path)
+    assert [r["line"] for r in results] == list(range(11))
+    assert results[3]["status_code"] == 422
+    assert summary["records"] == 11
+    assert summary["status_codes"] == {200: 10, 422: 1}
+    assert summary["next_offset"] == 11
+    assert set(summary["latency_ms"]) == {"p50", "p90", "p95", "p99"}
+
+def test_run_batch_from_offset_appends(tmp_path):
+    records = [{"text": f"Document number {i}", "feature": "summarize"} for i in range(4)]
+    input_path = write_jsonl(tmp_path / "in.jsonl", records)
+    output_path = tmp_path / "out.jsonl"
+    output_path.write_text(json.dumps({"line": 0, "status": "ok"}) + "\n", encoding="utf-8")
+    run_batch(input_path, output_path, offset=1, client=fake_client())
+    assert [r["line"] for r in read_jsonl(output_path)] == [0, 1, 2, 3]
+
+def test_cli_resume_continues_after_last_written_line(tmp_path, monkeypatch):
+    records = [{"text": f"Document number {i}", "feature": "summarize"} for i in range(3)]
+    input_path = write_jsonl(tmp_path / "in.jsonl", records)
+    output_path = tmp_path / "out.jsonl"
+    output_path.write_text(json.dumps({"line": 1, "status": "ok"}) + "\n", encoding="utf-8")
+    monkeypatch.setattr("src.batch.AIClient", lambda: fake_client())
+    assert main([str(input_path), str(output_path), "--resume"]) == 0
+    assert [r["line"] for r in read_jsonl(output_path)] == [1, 2]
+
+def test_cli_resume_drops_half_written_last_line(tmp_path, monkeypatch):
+    records = [{"text": f"Document number {i}", "feature": "summarize"} for i in range(3)]
+    input_path = write_jsonl(tmp_path / "in.jsonl", records)
+    output_path = tmp_path / "out.jsonl"
+    output_path.write_text(
+        json.dumps({"line": 0, "status": "ok"}) + "\n" + '{"line": 1, "sta',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr("src.batch.AIClient", lambda: fake_client())
+    assert main([str(input_path), str(output_path), "--resume"]) == 0
+    assert [r["line"] for r in read_jsonl(output_path)] == [0, 1, 2]
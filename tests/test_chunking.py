@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+from src.schema import FeatureType
+from src.chunking import chunk_text, map_chunks, process_chunked, split_paragraphs
+from src.tokens import estimate_tokens
+
+def _paragraph(index: int, words: int = 50) -> str:
+    return " ".join(f"p{index}w{i}" for i in range(words)) + "."
+
+# SPLITTING
+
+def test_split_paragraphs_drops_blank_runs():
+    assert split_paragraphs("One.\n\n\n  \nTwo.\n\nThree.") == ["One.", "Two.", "Three."]
+
+def test_chunks_are_paragraph_aligned_and_within_budget():
+    paragraphs = [_paragraph(i) for i in range(40)]
+    chunks = chunk_text("\n\n".join(paragraphs), max_tokens=300)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 300 for chunk in chunks)
+    assert [p for chunk in chunks for p in chunk.split("\n\n")] == paragraphs
+
+def test_oversized_paragraph_splits_on_sentences():
+    sentences = [f"Sentence number {i} has a few words." for i in range(200)]
+    chunks = chunk_text(" ".join(sentences), max_tokens=100)
+    assert len(chunks) > 1
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == " ".join(sentences)
+
+def test_chunks_respect_word_contract():
+    text = " ".join("a" for _ in range(2500))
+    chunks = chunk_text(text, max_tokens=100_000, max_words=1000)
+    assert [len(chunk.split()) for chunk in chunks] == [1000, 1000, 500]
+
+# MAP / REDUCE
+
+def test_map_chunks_keeps_order_and_bounds_concurrency():
+    active = 0
+    peak = 0
+    async def run_chunk(chunk: str) -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01 if chunk == "0" else 0)
+        active -= 1
+        return chunk.upper()
+    chunks = [str(i) for i in range(10)]
+    outputs = asyncio.run(map_chunks(chunks, run_chunk, concurrency=3))
+    assert outputs == chunks
+    assert peak == 3
+
+def test_map_chunks_cancels_remaining_on_failure():
+    cancelled = []
+    async def run_chunk(chunk: str) -> str:
+        if chunk == "bad":
+            raise ValueError("boom")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(chunk)
+            raise
+        return chunk
+    with pytest.raises(ValueError):
+        asyncio.run(map_chunks(["slow", "bad"], run_chunk, concurrency=2))
+    assert cancelled == ["slow"]
+
+def test_summarize_gets_one_reduce_pass_when_summaries_fit():
+    calls = []
+    async def run_chunk(chunk: str) -> str:
+        calls.append(chunk)
+        return f"summary {len(calls)}"
+    text = "\n\n".join(_paragraph(i) for i in range(20))
+    result = asyncio.run(process_chunked(text, FeatureType.summarize, run_chunk, max_tokens=300))
+    assert result.chunks == len(calls) - 1
+    assert calls[-1].startswith("summary 1\n\nsummary 2")
+    assert result.result == f"summary {len(calls)}"
+
+def test_summarize_reduces_hierarchically_within_budget():
+    calls = []
+    async def run_chunk(chunk: str) -> str:
+        calls.append(chunk)
+
+        # Each summary keeps a quarter of its input
+
+        words = chunk.split()
+        return " ".join(words[: max(1, len(words) // 4)])
+    text = "\n\n".join(_paragraph(i, words=200) for i in range(60))
+    result = asyncio.run(process_chunked(text, FeatureType.summarize, run_chunk, max_tokens=300))
+    assert result.chunks > 16
+    assert all(estimate_tokens(call) <= 300 for call in calls)
+    assert len(calls) > result.chunks + 1
+    assert "\n\n" not in result.result
+
+def test_summarize_reduce_stops_when_summaries_do_not_shrink():
+    async def run_chunk(chunk: str) -> str:
+        return chunk
+    text = "\n\n".join(_paragraph(i) for i in range(20))
+    with pytest.raises(RuntimeError):
+        asyncio.run(process_chunked(text, FeatureType.summarize, run_chunk, max_tokens=300))
+
+def test_rewrite_features_reassemble_without_reduce():
+    async def run_chunk(chunk: str) -> str:
+        return chunk.upper()
+    text = "\n\n".join(_paragraph(i) for i in range(20))
+    result = asyncio.run(process_chunked(text, FeatureType.grammar_correct, run_chunk, max_tokens=300))
+    assert result.result == text.upper()
+
+def test_non_chunkable_feature_rejected():
+    async def run_chunk(chunk: str) -> str:
+        return chunk
+    with pytest.raises(ValueError):
+        asyncio.run(process_chunked("Some text.", FeatureType.generate_questions, run_chunk))
@@ -0,0 +1,135 @@
+import secrets
+import sqlite3
+import threading
+import zlib
+import pytest
+from src.completion_store import CompletionStore
+
+# Helpers
+
+@pytest.fixture
+def store(tmp_path):
+    store = CompletionStore(tmp_path / "completions.db")
+    yield store
+    store.close()
+
+# BASIC PERSISTENCE
+
+def test_set_then_get_roundtrip(store):
+    store.set("k", "Stored completion")
+    assert store.get("k") == "Stored completion"
+    stats = store.stats()
+    assert stats["hits"] == 1
+    assert stats["entries"] == 1
+
+def test_missing_key_counts_miss(store):
+    assert store.get("absent") is None
+    assert store.stats()["misses"] == 1
+
+def test_values_are_compressed(store):
+    value = "repeated text " * 500
+    store.set("k", value)
+    assert store.stats()["bytes"] < len(value) / 10
+
+def test_uses_wal_mode(store):
+    store.set("k", "v")
+    conn = sqlite3.connect(store.path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+# SHARED ACROSS INSTANCES (workers / restarts)
+
+def test_second_instance_reads_same_file(tmp_path):
+    path = tmp_path / "shared.db"
+    writer = CompletionStore(path)
+    writer.set("k", "From another worker")
+    reader = CompletionStore(path)
+    assert reader.get("k") == "From another worker"
+    writer.close()
+    reader.close()
+
+# LRU COMPACTION
+
+def test_compaction_drops_least_recently_used(tmp_path, clock):
+    clock.step = 1
+    values = {name: secrets.token_hex(40) for name in ("old", "recent", "new")}
+    entry_size = len(zlib.compress(values["old"].encode("utf-8")))
+    store = CompletionStore(
+        tmp_path / "small.db",
+        max_bytes=entry_size * 2 + entry_size // 2,
+        clock=clock,
+    )
+    store.set("old", values["old"])
+    store.set("recent", values["recent"])
+    store.get("old")  # "recent" is now least recently used
+    store.set("new", values["new"])
+    assert store.get("recent") is None
+    assert store.get("old") == values["old"]
+    assert store.get("new") == values["new"]
+    assert store.stats()["compactions"] == 1
+    store.close()
+
+# READS NEVER WRITE
+
+def test_get_does_not_take_the_write_lock(tmp_path):
+    path = tmp_path / "shared.db"
+    store = CompletionStore(path)
+    store.set("k", "Readable while locked")
+    blocker = sqlite3.connect(path, timeout=0)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        assert store.get("k") == "Readable while locked"
+    finally:
+        blocker.rollback()
+        blocker.close()
+        store.close()
+
+def test_access_updates_are_flushed_in_batches(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr("src.completion_store.ACCESS_FLUSH_BATCH", 2)
+    clock.step = 1
+    store = CompletionStore(tmp_path / "batched.db", clock=clock)
+    store.set("a", "A")
+    store.set("b", "B")
+    def last_access(key):
+        return store._connect().execute(
+            "SELECT last_access FROM completions WHERE key = ?", (key,)
+        ).fetchone()[0]
+    before = last_access("a")
+    store.get("a")
+    assert last_access("a") == before
+    store.get("b")
+    assert last_access("a") > before
+    store.close()
+
+def test_running_byte_total_tracks_replacements(store):
+    store.set("k", "first value")
+    store.set("k", "a different, longer value")
+    store.set("j", "another")
+    actual = store._connect().execute("SELECT SUM(size) FROM completions").fetchone()[0]
+    assert store.stats()["bytes"] == actual
+
+def test_running_byte_total_survives_concurrent_writers(tmp_path):
+    path = tmp_path / "shared.db"
+    stores = [CompletionStore(path, max_bytes=150) for _ in range(8)]
+    def write(store, seed):
+        for n in range(150):
+            store.set(f"k{(seed + n) % 5}", secrets.token_hex(8 + (seed * n) % 40))
+    threads = [threading.Thread(target=write, args=(store, seed)) for seed, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for store in stores:
+        store.close()
+    reader = sqlite3.connect(path)
+    tracked = reader.execute("SELECT bytes FROM completions_meta").fetchone()[0]
+    actual = reader.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+    reader.close()
+    assert tracked == actual
+
+# FAILURE ISOLATION
+
+def test_store_errors_count_as_misses(store):
+    store._connect().execute("DROP TABLE completions")
+    assert store.get("k") is None
+    assert store.stats()["errors"] == 1
@@ -1,8 +1,16 @@
+import concurrent.futures
 import pytest
+from contextlib import closing
 from pathlib import Path
+from unittest.mock import patch
 from PIL import Image, ImageDraw
 from src.extraction import (
+    _extract_pdf_pages,
+    _page_ranges,
     build_document_payload,
+    collect_text,
+    extract_text_from_pdf,
+    iter_text_from_pdf,
     count_words,
     enforce_word_limit,
 )
@@ -68,6 +76,48 @@ def test_pdf_extraction(tmp_path):
     assert payload.metadata.input_format == InputFormat.pdf
     assert payload.metadata.ocr_used is False
 
+def create_multipage_pdf_file(tmp_path: Path, pages: int) -> Path:
+    import fitz
+    file_path = tmp_path / "pages.pdf"
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number} text")
+    doc.save(file_path)
+    doc.close()
+    return file_path
+
+def test_page_ranges_cover_every_page_in_order():
+    assert _page_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert _page_ranges(2, 4) == [(0, 1), (1, 2)]
+
+def test_parallel_pdf_extraction_matches_sequential(tmp_path):
+    file_path = create_multipage_pdf_file(tmp_path, 6)
+    sequential = extract_text_from_pdf(file_path)
+    with patch("src.extraction.PDF_PARALLEL_MIN_PAGES", 2), \
+         patch("src.extraction.PDF_MAX_WORKERS", 2), \
+         patch("src.extraction.PDF_PAGE_BATCH", 2):
+        parallel = extract_text_from_pdf(file_path)
+        streamed, _ = collect_text(iter_text_from_pdf(file_path))
+    assert parallel == sequential == streamed
+    assert sequential.index("Page 0") < sequential.index("Page 5")
+
+def test_parallel_pdf_word_limit_abort_cancels_pending_batches(tmp_path):
+    file_path = create_multipage_pdf_file(tmp_path, 8)
+
+    # Threads stand in for worker processes so the calls can be counted
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    with patch("src.extraction.PDF_PARALLEL_MIN_PAGES", 2), \
+         patch("src.extraction.PDF_MAX_WORKERS", 2), \
+         patch("src.extraction.PDF_PAGE_BATCH", 1), \
+         patch("src.extraction._get_pdf_pool", return_value=pool), \
+         patch("src.extraction._extract_pdf_pages", wraps=_extract_pdf_pages) as extract:
+        chunks = iter_text_from_pdf(file_path)
+        with pytest.raises(ValueError), closing(chunks):
+            collect_text(chunks, max_words=2)
+    pool.shutdown()
+    assert extract.call_count < 8
+
 def test_image_ocr_extraction(tmp_path):
     content = "OCR Test"
     file_path = create_image_file(tmp_path, content)
@@ -87,6 +137,16 @@ def test_image_ocr_extraction(tmp_path):
     
     assert payload.metadata.extracted_word_count >= 1
 
+# TRUSTED CONSTRUCTION
+
+def test_txt_payload_matches_fully_validated_payload(tmp_path):
+    file_path = create_txt_file(tmp_path, "  Padded text body.\n\n")
+    trusted = build_document_payload(file_path)
+    with patch("src.validation.SCHEMA_VALIDATE_TRUSTED", True):
+        validated = build_document_payload(file_path)
+    assert trusted == validated
+    assert trusted.text == "Padded text body."
+
 # WORD COUNT VALIDATION
 
 def test_count_words():
@@ -104,6 +164,34 @@ def test_enforce_word_limit_too_many():
     with pytest.raises(ValueError):
         enforce_word_limit(MAX_WORD_COUNT + 1)
 
+# EARLY ABORT ON WORD LIMIT
+
+def test_collect_text_counts_word_split_across_chunks():
+    text, word_count = collect_text(["Hel", "lo wor", "ld\n", "again"])
+    assert text == "Hello world\nagain"
+    assert word_count == count_words(text) == 3
+
+def test_collect_text_stops_reading_once_limit_exceeded():
+    consumed = []
+    def chunks():
+        for number in range(100):
+            consumed.append(number)
+            yield "word " * 10
+    with pytest.raises(ValueError, match="exceeds maximum allowed word count"):
+        collect_text(chunks(), max_words=25)
+    assert consumed == [0, 1, 2]
+
+def test_oversized_txt_rejected_with_word_limit_error(tmp_path):
+    file_path = create_txt_file(tmp_path, "word " * (MAX_WORD_COUNT * 50))
+    with patch("src.extraction.TEXT_READ_CHUNK_CHARS", 1024):
+        with pytest.raises(ValueError, match="exceeds maximum allowed word count"):
+            build_document_payload(file_path)
+
+def test_oversized_pdf_rejected_with_word_limit_error(tmp_path):
+    file_path = create_multipage_pdf_file(tmp_path, MAX_WORD_COUNT // 3 + 2)
+    with pytest.raises(ValueError, match="exceeds maximum allowed word count"):
+        build_document_payload(file_path)
+
 # EMPTY FILE / TEXT CHECKS
 
 def test_empty_txt_file(tmp_path):
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from src.schema import FeatureType
+from src.ai_client import AIClient
+from src.ai_cache import ResponseCache
+from src.incremental import process_incrementally
+from src.validation import segment_marker
+
+def make_client() -> AIClient:
+    return AIClient(cache=ResponseCache(max_entries=100, max_bytes=1_000_000, ttl_seconds=60))
+
+def fake_corrector(calls: list[str]):
+    """
+    Upper-cases every segment; echoes markers for batched prompts.
+    """
+    async def generate_async(prompt, **kwargs):
+        calls.append(prompt)
+        document = prompt.split("DOCUMENT CONTENT:\n", 1)[1]
+        return "\n".join(
+            line if line.startswith("<<<SEGMENT") else line.upper()
+            for line in document.splitlines()
+        )
+    return generate_async
+
+DOCUMENT = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
+
+def test_first_run_batches_every_paragraph_into_one_call():
+    client = make_client()
+    calls = []
+    on_provider_call = MagicMock()
+    with patch.object(client, "generate_async", side_effect=fake_corrector(calls)):
+        result = asyncio.run(process_incrementally(
+            DOCUMENT, FeatureType.grammar_correct, client, on_provider_call=on_provider_call,
+        ))
+    assert result.result == DOCUMENT.upper()
+    assert (result.segments, result.reused) == (3, 0)
+    assert len(calls) == 1
+    assert segment_marker(3) in calls[0]
+    on_provider_call.assert_called_once()
+
+def test_resubmit_sends_only_the_edited_paragraph():
+    client = make_client()
+    calls = []
+    with patch.object(client, "generate_async", side_effect=fake_corrector(calls)):
+        asyncio.run(process_incrementally(DOCUMENT, FeatureType.grammar_correct, client))
+        edited = DOCUMENT.replace("Second", "Edited second")
+        result = asyncio.run(process_incrementally(edited, FeatureType.grammar_correct, client))
+    assert result.result == edited.upper()
+    assert result.reused == 2
+    assert len(calls) == 2
+    assert "<<<SEGMENT" not in calls[1]
+    assert "Edited second paragraph." in calls[1]
+    assert "First paragraph." not in calls[1]
+
+def test_fully_cached_document_skips_provider_and_cost_controls():
+    client = make_client()
+    calls = []
+    on_provider_call = MagicMock()
+    with patch.object(client, "generate_async", side_effect=fake_corrector(calls)):
+        asyncio.run(process_incrementally(DOCUMENT, FeatureType.grammar_correct, client))
+        result = asyncio.run(process_incrementally(
+            DOCUMENT, FeatureType.grammar_correct, client, on_provider_call=on_provider_call,
+        ))
+    assert result.reused == 3
+    assert len(calls) == 1
+    on_provider_call.assert_not_called()
+
+def test_unsplittable_batch_output_falls_back_to_per_paragraph_calls():
+    client = make_client()
+    calls = []
+    corrector = fake_corrector(calls)
+    async def generate_async(prompt, **kwargs):
+        if "<<<SEGMENT" in prompt:
+            calls.append(prompt)
+            return "All paragraphs merged into one."
+        return await corrector(prompt, **kwargs)
+    with patch.object(client, "generate_async", side_effect=generate_async):
+        result = asyncio.run(process_incrementally(DOCUMENT, FeatureType.grammar_correct, client))
+    assert result.result == DOCUMENT.upper()
+    assert len(calls) == 4
+
+def test_other_features_are_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(process_incrementally(DOCUMENT, FeatureType.summarize, make_client()))
@@ -0,0 +1,118 @@
+import asyncio
+import random
+import time
+import pytest
+from src.schema import FeatureType
+from src.ai_processing import build_prompt, build_qa_prompt
+from src.tokens import size_qa_max_tokens
+from src.ai_client import AIClient, SYSTEM_MESSAGE
+from src.providers import (
+    CompletionRequest,
+    CompletionTruncatedError,
+    FakeProvider,
+    FakeProviderError,
+    LatencyModel,
+    synthesize_output,
+)
+from src.validation import get_question_range, parse_qa_output, validate_numbered_list_response
+
+# Helpers
+
+def make_request(prompt: str, max_tokens: int = 1200) -> CompletionRequest:
+    return CompletionRequest(
+        prompt=prompt,
+        model="fake-model",
+        system=SYSTEM_MESSAGE,
+        max_tokens=max_tokens,
+    )
+
+DOCUMENT = "Solar panels convert sunlight into electricity for homes and businesses."
+
+# FEATURE-APPROPRIATE OUTPUT
+
+def test_fake_questions_follow_scaling_rule():
+    word_count = 200
+    prompt = build_prompt(DOCUMENT, FeatureType.generate_questions, word_count=word_count)
+    output = FakeProvider().complete(make_request(prompt))
+    items = output.splitlines()
+    validate_numbered_list_response(items)
+    min_q, max_q = get_question_range(word_count)
+    assert min_q <= len(items) <= max_q
+
+def test_fake_qa_pairs_parse_within_scaling_range():
+    word_count = len(DOCUMENT.split())
+    prompt = build_qa_prompt(DOCUMENT, word_count=word_count)
+    output = FakeProvider().complete(make_request(prompt, size_qa_max_tokens(word_count)))
+    questions, answers = parse_qa_output(output, word_count)
+    min_q, max_q = get_question_range(word_count)
+    assert min_q <= len(questions.items) <= max_q
+    assert len(answers.items) == len(questions.items)
+
+def test_fake_answers_preserve_question_numbering():
+    questions = ["1. What is converted?", "2. Who benefits?"]
+    prompt = build_prompt(DOCUMENT, FeatureType.generate_answers, questions=questions)
+    output = FakeProvider().complete(make_request(prompt))
+    items = output.splitlines()
+    assert len(items) == 2
+    validate_numbered_list_response(items)
+
+def test_fake_translation_mentions_target_language():
+    prompt = build_prompt(DOCUMENT, FeatureType.translate, target_language="French")
+    assert FakeProvider().complete(make_request(prompt)).startswith("[French]")
+
+def test_fake_summary_is_shorter_than_document():
+    prompt = build_prompt(DOCUMENT, FeatureType.summarize)
+    output = FakeProvider().complete(make_request(prompt))
+    assert 0 < len(output) < len(DOCUMENT)
+
+def test_fake_output_is_deterministic():
+    prompt = build_prompt(DOCUMENT, FeatureType.explain)
+    assert synthesize_output(SYSTEM_MESSAGE, prompt) == synthesize_output(SYSTEM_MESSAGE, prompt)
+
+def test_fake_output_over_max_tokens_is_reported_truncated():
+    prompt = build_prompt(DOCUMENT, FeatureType.grammar_correct)
+    with pytest.raises(CompletionTruncatedError):
+        FakeProvider().complete(make_request(prompt, max_tokens=2))
+
+# LATENCY, THROUGHPUT, ERRORS
+
+@pytest.mark.parametrize("distribution", ["fixed", "uniform", "lognormal"])
+def test_latency_distributions_sample_near_mean(distribution):
+    model = LatencyModel(distribution, mean_ms=100, spread_ms=20)
+    rng = random.Random(1)
+    samples = sorted(model.sample_seconds(rng) for _ in range(500))
+    median = samples[len(samples) // 2]
+    assert 0.08 <= median <= 0.12
+
+def test_unknown_latency_distribution_rejected():
+    with pytest.raises(ValueError):
+        LatencyModel("pareto")
+
+def test_latency_is_applied():
+    provider = FakeProvider(latency=LatencyModel("fixed", mean_ms=50))
+    started = time.monotonic()
+    provider.complete(make_request(build_prompt(DOCUMENT, FeatureType.summarize)))
+    assert time.monotonic() - started >= 0.05
+
+def test_error_rate_injects_transient_failures():
+    provider = FakeProvider(error_rate=1.0)
+    with pytest.raises(FakeProviderError):
+        provider.complete(make_request("prompt"))
+    assert isinstance(FakeProviderError(), ConnectionError)
+
+def test_stream_yields_whole_output_in_pieces():
+    provider = FakeProvider(tokens_per_second=10_000)
+    prompt = build_prompt(DOCUMENT, FeatureType.grammar_correct)
+    async def collect():
+        return [piece async for piece in provider.stream_async(make_request(prompt))]
+    pieces = asyncio.run(collect())
+    assert len(pieces) > 1
+    assert "".join(pieces) == DOCUMENT
+
+# AICLIENT INTEGRATION
+
+def test_ai_client_runs_on_fake_provider():
+    client = AIClient(provider=FakeProvider())
+    prompt = build_prompt(DOCUMENT, FeatureType.explain)
+    assert client.generate(prompt).startswith("This document explains")
+    assert asyncio.run(client.generate_async(prompt)).startswith("This document explains")
@@ -111,3 +111,23 @@ def test_heavy_vs_normal_limits():
         rate_limit_ai(request, heavy_feature)
     with pytest.raises(HTTPException):
         rate_limit_ai(request, heavy_feature)
+
+def test_weighted_charge_is_all_or_nothing():
+    ip = "4.4.4.4"
+    request = mock_request(ip)
+    feature = FeatureType.summarize
+    rate_limit_ai(request, feature, cost=AI_RATE_LIMIT - 1)
+    with pytest.raises(HTTPException) as exc:
+        rate_limit_ai(request, feature, cost=2)
+    assert exc.value.status_code == 429
+
+    # The rejected charge consumed nothing
+    
+    rate_limit_ai(request, feature)
+    assert len(rate_limit._requests[ip]) == AI_RATE_LIMIT
+
+def test_cost_above_limit_never_fits():
+    request = mock_request("5.5.5.5")
+    with pytest.raises(HTTPException) as exc:
+        rate_limit_ai(request, FeatureType.summarize, cost=AI_RATE_LIMIT + 1)
+    assert exc.value.detail["retry_after_seconds"] == AI_WINDOW_SECONDS
@@ -0,0 +1,202 @@
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+import pytest
+from src.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgePolicy,
+    LatencyWindow,
+    OutcomeWindow,
+    ResilientCaller,
+    RetryPolicy,
+)
+
+# Local fake provider
+
+class FakeProvider:
+    """
+    Scripted provider: each call pops the next behavior.
+    A behavior is a return value, an exception, or (delay, value).
+    """
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            behavior = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(behavior, tuple):
+            delay, behavior = behavior
+            time.sleep(delay)
+        if isinstance(behavior, Exception):
+            raise behavior
+        return behavior
+    async def call_async(self):
+        with self._lock:
+            self.calls += 1
+            behavior = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(behavior, tuple):
+            delay, behavior = behavior
+            await asyncio.sleep(delay)
+        if isinstance(behavior, Exception):
+            raise behavior
+        return behavior
+
+def is_transient(error: Exception) -> bool:
+    return isinstance(error, ConnectionError)
+
+def make_caller(**kwargs) -> ResilientCaller:
+    kwargs.setdefault("retry", RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.002))
+    return ResilientCaller(is_transient, **kwargs)
+
+@pytest.fixture
+def pool():
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def run_sync(caller, provider, pool, timeout=2.0):
+    return caller.call(lambda: pool.submit(provider), lambda f: f.cancel(), timeout=timeout)
+
+# RETRIES
+
+def test_transient_failures_are_retried(pool):
+    provider = FakeProvider(ConnectionError("reset"), ConnectionError("reset"), "ok")
+    caller = make_caller()
+    assert run_sync(caller, provider, pool) == "ok"
+    assert provider.calls == 3
+    assert caller.stats()["retries"] == 2
+
+def test_retries_are_bounded(pool):
+    provider = FakeProvider(ConnectionError("down"))
+    caller = make_caller()
+    with pytest.raises(ConnectionError):
+        run_sync(caller, provider, pool)
+    assert provider.calls == 3
+
+def test_non_transient_errors_are_not_retried(pool):
+    provider = FakeProvider(ValueError("bad request"))
+    caller = make_caller()
+    with pytest.raises(ValueError):
+        run_sync(caller, provider, pool)
+    assert provider.calls == 1
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+def test_outcomes_feed_rolling_error_rate(pool):
+    provider = FakeProvider(ConnectionError("reset"), "ok")
+    caller = make_caller()
+    run_sync(caller, provider, pool)
+    assert caller.stats()["error_rate"] == pytest.approx(0.5)
+
+def test_outcome_window_forgets_old_failures():
+    window = OutcomeWindow(size=4)
+    assert window.error_rate() is None
+    for failed in (True, True, False, False, False, False):
+        window.record(failed)
+    assert window.error_rate() == 0.0
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0, rng=random.Random(7))
+    delays = [policy.backoff(n) for n in range(1, 10)]
+    assert all(0 <= d <= 4.0 for d in delays)
+    assert len(set(delays)) > 1
+
+def test_attempts_stop_at_deadline(pool):
+    provider = FakeProvider((5, "late"))
+    caller = make_caller()
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        run_sync(caller, provider, pool, timeout=0.05)
+    assert time.monotonic() - started < 1
+
+# CIRCUIT BREAKER
+
+def test_breaker_opens_after_threshold_and_fails_fast(pool, clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=30, clock=clock)
+    caller = make_caller(retry=RetryPolicy(max_attempts=1), breaker=breaker)
+    provider = FakeProvider(ConnectionError("down"))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            run_sync(caller, provider, pool)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        run_sync(caller, provider, pool)
+    assert provider.calls == 2
+    assert breaker.stats()["rejected"] == 1
+
+def test_breaker_half_open_probe_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 31
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # single probe only
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["transitions"] == {"closed": 1, "open": 1, "half_open": 1}
+
+def test_breaker_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=30, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_released_probe_slot_is_reusable(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+# HEDGING
+
+def test_hedge_policy_disabled_returns_none():
+    assert HedgePolicy(enabled=False).delay(LatencyWindow()) is None
+
+def test_hedge_delay_tracks_latency_quantile():
+    latencies = LatencyWindow()
+    for ms in range(1, 101):
+        latencies.record(ms / 100)
+    policy = HedgePolicy(enabled=True, quantile=0.95, min_delay=0.1, min_samples=10)
+    assert policy.delay(latencies) == pytest.approx(0.96)
+
+def test_hedged_request_wins_when_primary_is_slow(pool):
+    provider = FakeProvider((2, "slow primary"), "fast hedge")
+    caller = make_caller(hedge=HedgePolicy(enabled=True, min_delay=0.05, min_samples=100))
+    started = time.monotonic()
+    assert run_sync(caller, provider, pool) == "fast hedge"
+    assert time.monotonic() - started < 1
+    stats = caller.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+def test_async_hedged_request_wins_and_cancels_primary():
+    provider = FakeProvider((2, "slow primary"), "fast hedge")
+    caller = make_caller(hedge=HedgePolicy(enabled=True, min_delay=0.05, min_samples=100))
+    result = asyncio.run(caller.call_async(provider.call_async, timeout=2.0))
+    assert result == "fast hedge"
+    assert caller.stats()["hedge_wins"] == 1
+
+# ASYNC PATH
+
+def test_async_transient_failures_are_retried():
+    provider = FakeProvider(ConnectionError("reset"), "ok")
+    caller = make_caller()
+    assert asyncio.run(caller.call_async(provider.call_async, timeout=2.0)) == "ok"
+    assert caller.stats()["retries"] == 1
+
+def test_async_timeout_counts_as_breaker_failure():
+    provider = FakeProvider((5, "late"))
+    caller = make_caller()
+    with pytest.raises(TimeoutError):
+        asyncio.run(caller.call_async(provider.call_async, timeout=0.05))
+    assert caller.breaker.stats()["failures"] == 1
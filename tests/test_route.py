@@ -1,15 +1,21 @@
+import asyncio
+import json
+import time
 import pytest
 from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from src.schema import FeatureType
-from backend.route import router
+from src.routing import Route
+from backend.route import router, router_v2
+from src.ai_validation import validate_text_with_stats
 from backend.rate_limit import _requests  # <-- important
 
 # Test App Setup
 
 app = FastAPI()
 app.include_router(router)
+app.include_router(router_v2, prefix="/v2")
 client = TestClient(app)
 
 # TEST ISOLATION FIX
@@ -24,7 +30,7 @@ def clear_rate_limit_store():
 
 # SUCCESS CASE
 
-@patch("backend.route.ai_client.generate")
+@patch("backend.route.ai_client.generate_async")
 @patch("backend.route.rate_limit_ai")
 def test_process_success(mock_rate_limit, mock_generate):
     mock_generate.return_value = "Processed result"
@@ -39,6 +45,287 @@ def test_process_success(mock_rate_limit, mock_generate):
     assert response.json()["result"] == "Processed result"
     mock_rate_limit.assert_called_once()
 
+    # Completion budget is sized from the input, not the fixed ceiling
+    
+    assert mock_generate.call_args.kwargs["max_tokens"] < 1200
+
+    # Idle service: standard tier, recorded on the response
+
+    assert response.json()["route"] == "standard"
+
+# LOAD-AWARE ROUTING
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.select_route")
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_process_uses_selected_route(mock_rate_limit, mock_generate, mock_select, mock_lookup):
+    mock_select.return_value = Route(name="fallback", model="fast-model", max_tokens=150)
+    mock_generate.return_value = "Processed result"
+    response = client.post(
+        "/process",
+        json={
+            "text": "Hello world",
+            "feature": FeatureType.summarize.value
+        }
+    )
+    assert response.status_code == 200
+    assert response.json()["route"] == "fallback"
+    assert mock_generate.call_args.kwargs["model"] == "fast-model"
+    assert mock_generate.call_args.kwargs["max_tokens"] == 150
+
+# CACHE HIT SKIPS RATE LIMIT + PROVIDER
+
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.ai_client.lookup_async")
+@patch("backend.route.rate_limit_ai")
+def test_cache_hit_skips_rate_limit(mock_rate_limit, mock_lookup, mock_generate):
+    mock_lookup.return_value = "Cached result"
+    response = client.post(
+        "/process",
+        json={
+            "text": "Hello world",
+            "feature": FeatureType.summarize.value
+        }
+    )
+    assert response.status_code == 200
+    assert response.json()["result"] == "Cached result"
+    mock_rate_limit.assert_not_called()
+    mock_generate.assert_not_called()
+
+# CONTRACT FAILURES ARE NOT CACHED
+
+def mock_completion(content: str) -> MagicMock:
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.choices[0].finish_reason = "stop"
+    return response
+
+@patch("backend.route.rate_limit_ai")
+def test_invalid_list_output_is_not_served_from_cache(mock_rate_limit):
+    too_many = "\n".join(f"{i}. Question {i}?" for i in range(1, 30))
+    body = {
+        "text": "Uncached contract check text",
+        "feature": FeatureType.generate_questions.value
+    }
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock,
+        return_value=mock_completion(too_many),
+    ) as mock_create:
+        for _ in range(3):
+            response = client.post("/process", json=body)
+            assert response.status_code == 502
+            assert response.json()["detail"]["error"] == "invalid_ai_output"
+    assert mock_create.await_count == 3
+
+@patch("backend.route.rate_limit_ai")
+def test_invalid_qa_output_is_not_served_from_cache(mock_rate_limit):
+    with patch(
+        "src.ai_client.async_client.chat.completions.create",
+        new_callable=AsyncMock,
+        return_value=mock_completion("1. Q: Unpaired question?"),
+    ) as mock_create:
+        for _ in range(2):
+            response = client.post("/process/qa", json={"text": "Uncached pairing check text"})
+            assert response.status_code == 502
+    assert mock_create.await_count == 2
+
+# LARGE-DOCUMENT MODE
+
+def _large_text(paragraphs: int = 30, words: int = 100) -> str:
+    return "\n\n".join(
+        " ".join(f"p{p}w{w}" for w in range(words)) + "." for p in range(paragraphs)
+    )
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_large_document_is_chunked_and_charged_once(mock_rate_limit, mock_generate, mock_lookup):
+    async def fake_generate(prompt, **kwargs):
+        return "rewritten chunk"
+    mock_generate.side_effect = fake_generate
+    response = client.post(
+        "/process/large",
+        json={
+            "text": _large_text(),
+            "feature": FeatureType.grammar_correct.value
+        }
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["chunks"] > 1
+    assert body["result"] == "\n\n".join(["rewritten chunk"] * body["chunks"])
+    assert mock_generate.call_count == body["chunks"]
+    mock_rate_limit.assert_called_once()
+
+def test_large_document_rejects_non_chunkable_feature():
+    response = client.post(
+        "/process/large",
+        json={
+            "text": _large_text(),
+            "feature": FeatureType.generate_questions.value
+        }
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "feature_not_chunkable"
+
+@patch("backend.route.rate_limit_ai")
+def test_large_document_checks_feature_contract_before_charging(mock_rate_limit):
+    response = client.post(
+        "/process/large",
+        json={
+            "text": _large_text(),
+            "feature": FeatureType.translate.value
+        }
+    )
+    assert response.status_code == 400
+    mock_rate_limit.assert_not_called()
+
+def test_regular_process_keeps_word_limit():
+    response = client.post(
+        "/process",
+        json={
+            "text": _large_text(),
+            "feature": FeatureType.summarize.value
+        }
+    )
+    assert response.status_code == 400
+
+# FUSED Q&A
+
+QA_OUTPUT = "\n".join(f"{i}. Q: Question {i}?\nA: Answer {i}." for i in range(1, 6))
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_qa_returns_parsed_pairs_from_one_call(mock_rate_limit, mock_generate, mock_lookup):
+    mock_generate.return_value = QA_OUTPUT
+    response = client.post(
+        "/process/qa",
+        json={"text": "Hello world", "word_count": 2}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["questions"][0] == "1. Question 1?"
+    assert body["answers"][4] == "5. Answer 5."
+    mock_generate.assert_called_once()
+    mock_rate_limit.assert_called_once_with(mock_rate_limit.call_args.args[0], FeatureType.generate_questions)
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_qa_malformed_output_is_bad_gateway(mock_rate_limit, mock_generate, mock_lookup):
+    mock_generate.return_value = "Here are some questions about the text."
+    response = client.post(
+        "/process/qa",
+        json={"text": "Hello world", "word_count": 2}
+    )
+    assert response.status_code == 502
+    assert response.json()["detail"]["error"] == "invalid_ai_output"
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_qa_counts_words_server_side(mock_rate_limit, mock_generate, mock_lookup):
+    mock_generate.return_value = QA_OUTPUT
+    response = client.post("/process/qa", json={"text": "Hello world"})
+    assert response.status_code == 200
+    assert "Generate between 4 and 6 questions" in mock_generate.call_args.args[0]
+
+# INCREMENTAL MODE
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.remember_async")
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_incremental_returns_stitched_result(mock_rate_limit, mock_generate, mock_remember, mock_lookup):
+    async def fake_generate(prompt, **kwargs):
+        return "<<<SEGMENT 1>>>\nFixed one.\n<<<SEGMENT 2>>>\nFixed two."
+    mock_generate.side_effect = fake_generate
+    response = client.post(
+        "/process/incremental",
+        json={"text": "Paragraf one.\n\nParagraf two."}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "result": "Fixed one.\n\nFixed two.",
+        "segments": 2,
+        "reused": 0,
+    }
+    mock_rate_limit.assert_called_once()
+    assert mock_remember.call_count == 2
+
+# ANALYZER ROUTE
+
+def _analyzer_body(action: str, payload: dict | None) -> dict:
+    return {
+        "user_tier": "free",
+        "action": action,
+        "document": {
+            "text": "Hello world",
+            "metadata": {
+                "input_format": "txt",
+                "file_size_mb": 0.1,
+                "extracted_word_count": 2,
+                "ocr_used": False,
+            },
+        },
+        "payload": payload,
+    }
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_analyze_dispatches_to_feature_handler(mock_rate_limit, mock_generate, mock_lookup):
+    mock_generate.return_value = "Bonjour le monde"
+    response = client.post(
+        "/analyze",
+        json=_analyzer_body("translate", {"feature": "translate", "target_language": "French"}),
+    )
+    assert response.status_code == 200
+    assert response.json()["result"] == "Bonjour le monde"
+    assert "French" in mock_generate.call_args.args[0]
+    mock_rate_limit.assert_called_once_with(mock_rate_limit.call_args.args[0], FeatureType.translate)
+
+def test_analyze_rejects_payload_for_other_action():
+    response = client.post(
+        "/analyze",
+        json=_analyzer_body("summarize", {"feature": "explain"}),
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "invalid_request"
+
+def test_analyze_rejects_unknown_payload_tag():
+    response = client.post(
+        "/analyze",
+        json=_analyzer_body("summarize", {"feature": "paraphrase"}),
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "union_tag_invalid"
+
+# V2 PROMPT LAYOUT
+
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_v2_process_sends_static_contract_as_system(mock_rate_limit, mock_generate):
+    mock_generate.return_value = "Processed result"
+    response = client.post(
+        "/v2/process",
+        json={
+            "text": "Hello world",
+            "feature": FeatureType.summarize.value
+        }
+    )
+    assert response.status_code == 200
+    assert response.json()["result"] == "Processed result"
+    prompt = mock_generate.call_args.args[0]
+    system = mock_generate.call_args.kwargs["system"]
+    assert prompt.endswith("Hello world")
+    assert "TASK: COMPRESSION-ONLY SUMMARIZATION" in system
+    assert "Hello world" not in system
+
 # INPUT VALIDATION FAILURE
 
 def test_empty_input_fails():
@@ -54,16 +341,40 @@ def test_empty_input_fails():
 
 # FEATURE CONTRACT FAILURE
 
-def test_generate_questions_requires_word_count():
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_generate_questions_uses_server_word_count(mock_rate_limit, mock_generate, mock_lookup):
+    mock_generate.return_value = "1. One?\n2. Two?\n3. Three?\n4. Four?"
     response = client.post(
         "/process",
         json={
             "text": "Valid text here",
-            "feature": FeatureType.generate_questions.value
+            "feature": FeatureType.generate_questions.value,
+            "word_count": 900
         }
     )
-    assert response.status_code == 400
-    assert "Word count required" in str(response.json()["detail"])
+    assert response.status_code == 200
+    assert response.json()["items"] == ["1. One?", "2. Two?", "3. Three?", "4. Four?"]
+
+    # Three scanned words (small scale), not the client's 900
+
+    assert "Generate between 4 and 6 questions" in mock_generate.call_args.args[0]
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_generate_answers_rejects_wrong_item_count(mock_rate_limit, mock_generate, mock_lookup):
+    mock_generate.return_value = "1. Only one answer."
+    response = client.post(
+        "/process",
+        json={
+            "text": "Valid text here",
+            "feature": FeatureType.generate_answers.value,
+            "questions": ["One?", "Two?"]
+        }
+    )
+    assert response.status_code == 502
+    assert response.json()["detail"]["error"] == "invalid_ai_output"
 def test_generate_answers_requires_questions():
     response = client.post(
         "/process",
@@ -105,7 +416,7 @@ def test_rate_limit_error_propagates(mock_rate_limit):
 
 # INTERNAL ERROR PROTECTION
 
-@patch("backend.route.ai_client.generate")
+@patch("backend.route.ai_client.generate_async")
 @patch("backend.route.rate_limit_ai")
 def test_internal_error_returns_500(mock_rate_limit, mock_generate):
     mock_generate.side_effect = Exception("Unexpected failure")
@@ -118,3 +429,245 @@ def test_internal_error_returns_500(mock_rate_limit, mock_generate):
     )
     assert response.status_code == 500
     assert response.json()["detail"]["error"] == "internal_error"
+
+# STREAMING ENDPOINT
+
+def fake_stream(*parts):
+    async def stream(prompt, **kwargs):
+        for part in parts:
+            yield part
+    return stream
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+@patch("backend.route.ai_client.stream_async")
+@patch("backend.route.rate_limit_ai")
+def test_stream_forwards_text_deltas(mock_rate_limit, mock_stream):
+    mock_stream.side_effect = fake_stream("Short ", "summary")
+    response = client.post(
+        "/process/stream",
+        json={
+            "text": "Hello world",
+            "feature": FeatureType.summarize.value
+        }
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_sse(response.text) == [
+        ("delta", {"text": "Short "}),
+        ("delta", {"text": "summary"}),
+        ("done", {"result": "Short summary", "route": "standard"}),
+    ]
+    mock_rate_limit.assert_called_once()
+
+@patch("backend.route.ai_client.stream_async")
+@patch("backend.route.rate_limit_ai")
+def test_stream_emits_numbered_items(mock_rate_limit, mock_stream):
+    mock_stream.side_effect = fake_stream("1. What is", " it?\n2. Why", "?\n3. How?\n4. When?")
+    response = client.post(
+        "/process/stream",
+        json={
+            "text": "Hello world",
+            "feature": FeatureType.generate_questions.value,
+            "word_count": 2
+        }
+    )
+    events = parse_sse(response.text)
+    assert events[:4] == [
+        ("item", {"text": "1. What is it?"}),
+        ("item", {"text": "2. Why?"}),
+        ("item", {"text": "3. How?"}),
+        ("item", {"text": "4. When?"}),
+    ]
+    assert events[4][0] == "done"
+
+@patch("backend.route.ai_client.stream_async")
+@patch("backend.route.rate_limit_ai")
+def test_stream_fails_fast_on_too_many_items(mock_rate_limit, mock_stream):
+    mock_stream.side_effect = fake_stream(*(f"{i}. Q{i}?\n" for i in range(1, 9)))
+    response = client.post(
+        "/process/stream",
+        json={
+            "text": "Hello world",
+            "feature": FeatureType.generate_questions.value
+        }
+    )
+    events = parse_sse(response.text)
+    assert [event for event, _ in events[:-1]] == ["item"] * 5
+    assert events[-1][0] == "error"
+    assert events[-1][1]["status_code"] == 502
+
+@patch("backend.route.ai_client.stream_async")
+@patch("backend.route.rate_limit_ai")
+def test_stream_reports_bad_numbering_as_error_event(mock_rate_limit, mock_stream):
+    mock_stream.side_effect = fake_stream("1. First\n3. Third\n")
+    response = client.post(
+        "/process/stream",
+        json={
+            "text": "Hello world",
+            "feature": FeatureType.generate_questions.value,
+            "word_count": 2
+        }
+    )
+    event, data = parse_sse(response.text)[-1]
+    assert event == "error"
+    assert data["detail"]["error"] == "invalid_ai_output"
+
+def test_stream_validation_errors_are_plain_http_errors():
+    response = client.post(
+        "/process/stream",
+        json={
+            "text": "Valid text here",
+            "feature": FeatureType.translate.value
+        }
+    )
+    assert response.status_code == 400
+
+# BATCH ENDPOINT
+
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.validate_text_with_stats", wraps=validate_text_with_stats)
+@patch("backend.route.rate_limit_ai")
+def test_batch_returns_per_feature_results(mock_rate_limit, mock_validate, mock_generate):
+    async def fake_generate(prompt, **kwargs):
+        return "Summary" if "SUMMARIZATION" in prompt else "Explanation"
+    mock_generate.side_effect = fake_generate
+    response = client.post(
+        "/process/batch",
+        json={
+            "text": "Hello world",
+            "features": [
+                {"feature": FeatureType.summarize.value},
+                {"feature": FeatureType.explain.value},
+                {"feature": FeatureType.translate.value},
+            ]
+        }
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["result"] == "Summary"
+    assert results[1]["result"] == "Explanation"
+
+    # One bad feature spec fails alone
+    
+    assert results[2]["status_code"] == 400
+    assert "Target language required" in str(results[2]["error"])
+    mock_validate.assert_called_once()
+
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_batch_runs_features_concurrently(mock_rate_limit, mock_generate):
+    async def slow_generate(prompt, **kwargs):
+        await asyncio.sleep(0.2)
+        return "done"
+    mock_generate.side_effect = slow_generate
+    started = time.monotonic()
+    response = client.post(
+        "/process/batch",
+        json={
+            "text": "Hello world",
+            "features": [
+                {"feature": FeatureType.summarize.value},
+                {"feature": FeatureType.explain.value},
+                {"feature": FeatureType.grammar_correct.value},
+            ]
+        }
+    )
+    assert response.status_code == 200
+    assert time.monotonic() - started < 0.5
+
+@patch("backend.route.ai_client.generate_async")
+@patch("backend.route.rate_limit_ai")
+def test_batch_streams_in_completion_order(mock_rate_limit, mock_generate):
+    async def staggered_generate(prompt, **kwargs):
+        if "SUMMARIZATION" in prompt:
+            await asyncio.sleep(0.1)
+            return "Slow summary"
+        return "Fast explanation"
+    mock_generate.side_effect = staggered_generate
+    response = client.post(
+        "/process/batch",
+        json={
+            "text": "Hello world",
+            "stream": True,
+            "features": [
+                {"feature": FeatureType.summarize.value},
+                {"feature": FeatureType.explain.value},
+            ]
+        }
+    )
+    events = parse_sse(response.text)
+    assert [e for e, _ in events] == ["result", "result", "done"]
+    assert events[0][1]["index"] == 1
+    assert events[1][1]["index"] == 0
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+def test_batch_is_charged_per_uncached_prompt(mock_generate, mock_lookup):
+    mock_generate.return_value = "Done"
+    body = {
+        "text": "Hello world",
+        "features": [
+            {"feature": FeatureType.summarize.value},
+            {"feature": FeatureType.explain.value},
+        ]
+    }
+    response = client.post("/process/batch", json=body)
+    assert [r["status_code"] for r in response.json()["results"]] == [200, 200]
+
+    # Two calls charged: a second pair does not fit the limit of three
+    
+    assert client.post("/process/batch", json=body).status_code == 429
+
+    # Repeated specs share one provider call and one charge
+    
+    repeated = {
+        "text": "Hello world",
+        "features": [{"feature": FeatureType.translate.value, "target_language": "French"}] * 7,
+    }
+    assert client.post("/process/batch", json=repeated).status_code == 200
+    assert client.post("/process/batch", json=repeated).status_code == 429
+
+@patch("backend.route.ai_client.lookup_async", return_value=None)
+@patch("backend.route.ai_client.generate_async")
+def test_batch_with_heavy_feature_is_rejected_whole(mock_generate, mock_lookup):
+    response = client.post(
+        "/process/batch",
+        json={
+            "text": "Hello world",
+            "features": [
+                {"feature": FeatureType.summarize.value},
+                {"feature": FeatureType.explain.value},
+                {"feature": FeatureType.generate_questions.value},
+            ]
+        }
+    )
+    assert response.status_code == 429
+    mock_generate.assert_not_called()
+
+@patch("backend.route.ai_client.lookup_async", return_value="Cached")
+@patch("backend.route.ai_client.generate_async")
+def test_cached_batch_features_are_not_charged(mock_generate, mock_lookup):
+    body = {
+        "text": "Hello world",
+        "features": [
+            {"feature": FeatureType.summarize.value},
+            {"feature": FeatureType.explain.value},
+        ]
+    }
+    for _ in range(3):
+        assert client.post("/process/batch", json=body).status_code == 200
+    mock_generate.assert_not_called()
+
+def test_batch_requires_at_least_one_feature():
+    response = client.post(
+        "/process/batch",
+        json={"text": "Hello world", "features": []}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,86 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.schema import FeatureType
+from src.routing import LoadSignals, ModelRouter, Route, RouteTier
+
+def make_router(**kwargs) -> ModelRouter:
+    return ModelRouter([
+        RouteTier(
+            name="fallback",
+            model="fast-model",
+            max_tokens_scale=0.5,
+            min_in_flight=10,
+            min_latency_p95_seconds=5.0,
+            min_error_rate=0.3,
+        ),
+        RouteTier(name="standard", model="main-model"),
+    ], **kwargs)
+
+# TIER SELECTION
+
+def test_idle_load_uses_standard_tier():
+    route = make_router().select(FeatureType.summarize, 100, 400, LoadSignals())
+    assert route == Route(name="standard", model="main-model", max_tokens=400)
+
+@pytest.mark.parametrize("signals", [
+    LoadSignals(in_flight=10),
+    LoadSignals(latency_p95_seconds=6.0),
+    LoadSignals(error_rate=0.5),
+])
+def test_any_pressure_signal_triggers_fallback(signals):
+    route = make_router().select(FeatureType.summarize, 100, 400, signals)
+    assert route == Route(name="fallback", model="fast-model", max_tokens=200)
+
+def test_scaled_budget_keeps_a_floor():
+    route = make_router().select(FeatureType.summarize, 10, 130, LoadSignals(in_flight=50))
+    assert route.max_tokens == 128
+
+def test_disabled_router_pins_last_tier():
+    router = make_router(enabled=False)
+    route = router.select(FeatureType.summarize, 100, 400, LoadSignals(in_flight=50))
+    assert route.name == "standard"
+
+def test_feature_and_input_size_filters():
+    router = ModelRouter([
+        RouteTier(name="small-rewrite", model="cheap", features=frozenset({FeatureType.grammar_correct}), max_input_tokens=500),
+        RouteTier(name="standard", model="main-model"),
+    ])
+    assert router.select(FeatureType.grammar_correct, 400, 500, LoadSignals()).name == "small-rewrite"
+    assert router.select(FeatureType.grammar_correct, 900, 500, LoadSignals()).name == "standard"
+    assert router.select(FeatureType.summarize, 400, 500, LoadSignals()).name == "standard"
+
+# CONFIG
+
+def test_policy_table_loads_from_json(tmp_path):
+    path = tmp_path / "routing.json"
+    path.write_text(json.dumps({"tiers": [
+        {"name": "shed", "model": "fast-model", "features": ["summarize"], "min_in_flight": 2},
+        {"name": "standard", "model": "main-model"},
+    ]}))
+    with patch("src.routing.AI_ROUTING_POLICY_PATH", str(path)), \
+         patch("src.routing.AI_ROUTING_ENABLED", True):
+        router = ModelRouter.from_env("ignored-default")
+    assert [tier.name for tier in router.tiers] == ["shed", "standard"]
+    assert router.select(FeatureType.summarize, 10, 200, LoadSignals(in_flight=3)).model == "fast-model"
+
+def test_default_table_ends_with_given_model():
+    router = ModelRouter.from_env("main-model")
+    assert router.tiers[-1].model == "main-model"
+
+def test_routing_is_off_without_a_policy_file():
+    assert ModelRouter.from_env("main-model").enabled is False
+
+def test_standard_route_ignores_load():
+    assert make_router().standard(400) == Route(name="standard", model="main-model", max_tokens=400)
+
+# PER-ROUTE LATENCY
+
+def test_stats_report_latency_per_route():
+    router = make_router()
+    standard = Route(name="standard", model="main-model", max_tokens=100)
+    for seconds in (0.1, 0.2, 0.3):
+        router.record(standard, seconds)
+    stats = router.stats()["routes"]["standard"]
+    assert stats["calls"] == 3
+    assert stats["latency_p50_seconds"] == 0.2
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.single_flight import SingleFlight
+
+# SYNC CALLERS
+
+def test_concurrent_sync_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "shared"
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("k", work)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2
+    while flights.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == ["shared"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+def test_error_is_delivered_to_followers():
+    flights = SingleFlight()
+    release = threading.Event()
+    def failing():
+        release.wait(5)
+        raise RuntimeError("provider down")
+    errors = []
+    def call():
+        try:
+            flights.do("k", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2
+    while flights.stats()["coalesced"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert errors == ["provider down"] * 3
+
+def test_sequential_calls_are_not_coalesced():
+    flights = SingleFlight()
+    assert flights.do("k", lambda: 1) == 1
+    assert flights.do("k", lambda: 2) == 2
+    assert flights.stats()["coalesced"] == 0
+
+# ASYNC CALLERS
+
+def test_concurrent_async_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "shared"
+    async def run():
+        return await asyncio.gather(
+            *(flights.do_async("k", work) for _ in range(10))
+        )
+    assert asyncio.run(run()) == ["shared"] * 10
+    assert len(calls) == 1
+    assert flights.stats()["coalesced"] == 9
+
+def test_cancelled_async_follower_does_not_cancel_flight():
+    flights = SingleFlight()
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+    async def run():
+        leader = asyncio.ensure_future(flights.do_async("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do_async("k", work))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+    assert asyncio.run(run()) == "done"
+
+def test_cancelled_async_leader_does_not_cancel_followers():
+    flights = SingleFlight()
+    calls = []
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+    async def run():
+        leader = asyncio.ensure_future(flights.do_async("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do_async("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        result = await follower
+        assert not follower.cancelled()
+        return result
+    assert asyncio.run(run()) == "done"
+    assert calls == [1]
+    assert flights.stats()["in_flight"] == 0
+
+def test_async_follower_joins_sync_leader():
+    flights = SingleFlight()
+    release = threading.Event()
+    def work():
+        release.wait(5)
+        return "from thread"
+    leader = threading.Thread(target=lambda: flights.do("k", work))
+    leader.start()
+    while flights.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+    async def follow():
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        return await flights.do_async("k", work)
+    assert asyncio.run(follow()) == "from thread"
+    leader.join(5)
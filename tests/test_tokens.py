@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+from src.schema import FeatureType
+from src.tokens import (
+    COMPLETION_TOKENS_CEILING,
+    MIN_COMPLETION_TOKENS,
+    TOKENS_PER_ANSWER,
+    TOKENS_PER_QUESTION,
+    context_limit,
+    ensure_context_budget,
+    estimate_prompt_tokens,
+    estimate_tokens,
+    size_max_tokens,
+    size_qa_max_tokens,
+)
+from src.validation import get_question_range
+
+# ESTIMATION
+
+def test_empty_text_has_no_tokens():
+    assert estimate_tokens("") == 0
+
+def test_ascii_estimate_is_about_four_chars_per_token():
+    assert estimate_tokens("word " * 100) == 125
+
+def test_non_ascii_text_is_denser():
+    assert estimate_tokens("é" * 100) > estimate_tokens("e" * 100)
+
+def test_prompt_estimate_includes_message_framing():
+    assert estimate_prompt_tokens("system", "prompt") > estimate_tokens("system") + estimate_tokens("prompt")
+
+# COMPLETION SIZING
+
+def test_summary_budget_is_a_fraction_of_input():
+    assert size_max_tokens(FeatureType.summarize, 1000) < size_max_tokens(FeatureType.grammar_correct, 1000)
+
+def test_rewrite_budgets_cover_the_input():
+    for feature in (FeatureType.grammar_correct, FeatureType.translate):
+        assert size_max_tokens(feature, 1000) > 1000
+
+def test_explanation_budget_exceeds_short_input():
+    input_tokens = 27  # ~20 words
+    assert size_max_tokens(FeatureType.explain, input_tokens) >= 2 * input_tokens + 128
+    assert size_max_tokens(FeatureType.explain, 1000) > 2 * 1000
+
+def test_small_inputs_get_minimum_budget():
+    assert size_max_tokens(FeatureType.summarize, 5) == MIN_COMPLETION_TOKENS
+
+def test_budget_is_capped():
+    assert size_max_tokens(FeatureType.translate, 10_000) == COMPLETION_TOKENS_CEILING
+
+def test_question_budget_follows_question_range():
+    _, max_q = get_question_range(800)
+    budget = size_max_tokens(FeatureType.generate_questions, 1000, word_count=800)
+    assert budget >= max_q * TOKENS_PER_QUESTION
+
+def test_question_budget_requires_supported_word_count():
+    with pytest.raises(ValueError):
+        size_max_tokens(FeatureType.generate_questions, 1000, word_count=5000)
+
+def test_answer_budget_scales_with_questions():
+    one = size_max_tokens(FeatureType.generate_answers, 100, questions=["1. A?"])
+    three = size_max_tokens(FeatureType.generate_answers, 100, questions=["1. A?", "2. B?", "3. C?"])
+    assert three > one
+
+def test_qa_budget_covers_questions_and_answers():
+    _, max_q = get_question_range(500)
+    assert size_qa_max_tokens(500) >= max_q * (TOKENS_PER_QUESTION + TOKENS_PER_ANSWER)
+
+# CONTEXT BUDGET
+
+def test_unknown_model_uses_default_context():
+    assert context_limit("unknown-model") == context_limit("gpt-4o-mini")
+
+def test_oversized_request_is_rejected():
+    limit = context_limit("gpt-4o-mini")
+    with pytest.raises(HTTPException) as exc:
+        ensure_context_budget("gpt-4o-mini", limit, 1)
+    assert exc.value.status_code == 413
+    assert exc.value.detail["error"] == "token_budget_exceeded"
+
+def test_request_within_context_passes():
+    ensure_context_budget("gpt-4o-mini", 1000, 1000)
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from src.schema import (
     AnalyzerRequest,
     DocumentPayload,
@@ -11,6 +12,8 @@ from src.schema import (
     SummarizationRequest,
     QuestionGenerationRequest,
     AnswerGenerationRequest,
+    TranslationRequest,
+    MAX_WORD_COUNT,
 )
 from src.validation import (
     validate_usage,
@@ -21,6 +24,13 @@ from src.validation import (
     validate_structured_text_response,
     validate_numbered_list_response,
     validate_analyzer_request,
+    construct_trusted,
+    NumberedListStream,
+    parse_numbered_list,
+    numbered_list_count_range,
+    parse_qa_output,
+    parse_segmented_output,
+    segment_marker,
 )
 
 # FIXTURE HELPERS
@@ -77,6 +87,22 @@ def test_invalid_action_payload_mismatch():
     with pytest.raises(ValueError):
         validate_action_payload_consistency(request)
 
+def test_payload_union_selects_member_by_feature_tag():
+    request = AnalyzerRequest.model_validate({
+        "user_tier": "free",
+        "action": "translate",
+        "document": make_valid_document().model_dump(),
+        "payload": {"feature": "translate", "target_language": "French"},
+    })
+    assert isinstance(request.payload, TranslationRequest)
+    with pytest.raises(ValueError, match="union_tag_invalid"):
+        AnalyzerRequest.model_validate({
+            "user_tier": "free",
+            "action": "translate",
+            "document": make_valid_document().model_dump(),
+            "payload": {"feature": "paraphrase"},
+        })
+
 # WORD COUNT VALIDATION
 
 def test_valid_word_count():
@@ -133,6 +159,145 @@ def test_validate_numbered_list_response_invalid_numbering():
     with pytest.raises(ValueError):
         validate_numbered_list_response(items)
 
+def test_structured_text_response_is_stripped():
+    assert validate_structured_text_response("  Result \n").content == "Result"
+
+# TRUSTED CONSTRUCTION
+
+def test_construct_trusted_skips_validation():
+    metadata = construct_trusted(
+        DocumentMetadata,
+        input_format=InputFormat.txt,
+        file_size_mb=1,
+        extracted_word_count=MAX_WORD_COUNT + 1,
+        ocr_used=False,
+    )
+    assert metadata.extracted_word_count == MAX_WORD_COUNT + 1
+
+def test_construct_trusted_debug_switch_validates():
+    with patch("src.validation.SCHEMA_VALIDATE_TRUSTED", True):
+        with pytest.raises(ValueError):
+            construct_trusted(
+                DocumentMetadata,
+                input_format=InputFormat.txt,
+                file_size_mb=1,
+                extracted_word_count=10,
+                ocr_used=True,
+            )
+
+# STREAMED NUMBERED LIST PARSING
+
+def test_numbered_list_stream_emits_items_incrementally():
+    parser = NumberedListStream()
+    assert parser.feed("1. First") == []
+    assert parser.feed(" item\n2. Sec") == []
+    assert parser.feed("ond item\n3.") == ["1. First item"]
+    assert parser.feed(" Third\n") == ["2. Second item"]
+    assert parser.close() == ["3. Third"]
+
+def test_numbered_list_stream_folds_wrapped_lines():
+    parser = NumberedListStream()
+    items = parser.feed("1. A long question\n   that wraps\n\n2. Next\n")
+    assert items == ["1. A long question that wraps"]
+    assert parser.close() == ["2. Next"]
+
+def test_numbered_list_stream_rejects_out_of_order_numbering():
+    parser = NumberedListStream()
+    parser.feed("1. First\n")
+    with pytest.raises(ValueError):
+        parser.feed("3. Skipped\n")
+
+def test_numbered_list_stream_rejects_unnumbered_preamble():
+    parser = NumberedListStream()
+    with pytest.raises(ValueError):
+        parser.feed("Here are your questions:\n")
+
+def test_numbered_list_stream_rejects_empty_stream():
+    with pytest.raises(ValueError):
+        NumberedListStream().close()
+
+def test_numbered_list_stream_enforces_count_range():
+    parser = NumberedListStream((1, 2))
+    parser.feed("1. One\n2. Two\n")
+    with pytest.raises(ValueError):
+        parser.feed("3. Three\n")
+    parser = NumberedListStream((3, 4))
+    parser.feed("1. One\n2. Two\n")
+    with pytest.raises(ValueError):
+        parser.close()
+
+def test_parse_numbered_list_whole_string_matches_chunk_stream():
+    output = "1. First question\n   wrapped?\n2. Second?\n3. Third?"
+    whole = parse_numbered_list(output)
+    chunked = parse_numbered_list(output[i:i + 3] for i in range(0, len(output), 3))
+    assert whole.items == ["1. First question wrapped?", "2. Second?", "3. Third?"]
+    assert chunked.items == whole.items
+
+def test_parse_numbered_list_matches_pydantic_path():
+    output = "1. One\n2. Two"
+    parsed = parse_numbered_list(output)
+    assert parsed == validate_numbered_list_response(output.split("\n"))
+
+@pytest.mark.parametrize("output", [
+    "1. One\n2. Two\n3. Three",
+    "  1. One\n\n2. Two  \n",
+    "1. One\n2. Two\n3. Three\n4. Four",
+    "1. One\n2. Two\n5. Five",
+    "01. One\n2. Two",
+])
+def test_whole_string_parse_matches_line_parser(output):
+    def line_parser(text):
+        parser = NumberedListStream((2, 3))
+        items = parser.feed(text + "\n")
+        return items + parser.close()
+    def outcome(fn):
+        try:
+            return fn(output)
+        except ValueError as e:
+            return str(e)
+    assert outcome(NumberedListStream((2, 3)).parse) == outcome(line_parser)
+
+def test_numbered_list_count_range():
+    assert numbered_list_count_range(FeatureType.generate_questions, word_count=10) == get_question_range(10)
+    assert numbered_list_count_range(FeatureType.generate_answers, questions=["a", "b"]) == (2, 2)
+    assert numbered_list_count_range(FeatureType.summarize, word_count=10) is None
+
+# FUSED Q&A OUTPUT PARSING
+
+def _qa_output(pairs: int) -> str:
+    return "\n".join(
+        f"{i}. Q: Question {i}?\nA: Answer {i}\ncontinues here." for i in range(1, pairs + 1)
+    )
+
+def test_parse_qa_output_splits_pairs():
+    questions, answers = parse_qa_output(_qa_output(5), 100)
+    assert questions.items[0] == "1. Question 1?"
+    assert answers.items[4] == "5. Answer 5 continues here."
+
+def test_parse_qa_output_enforces_question_range():
+    with pytest.raises(ValueError):
+        parse_qa_output(_qa_output(3), 100)
+
+def test_parse_qa_output_requires_answers():
+    with pytest.raises(ValueError):
+        parse_qa_output("1. Q: Only a question?", 100)
+
+# SEGMENTED OUTPUT PARSING
+
+def test_parse_segmented_output_splits_on_markers():
+    output = f"{segment_marker(1)}\nFirst fixed.\n\n{segment_marker(2)}\nSecond\nfixed."
+    assert parse_segmented_output(output, 2) == ["First fixed.", "Second\nfixed."]
+
+def test_parse_segmented_output_rejects_missing_segment():
+    with pytest.raises(ValueError):
+        parse_segmented_output(f"{segment_marker(1)}\nOnly one.", 2)
+
+def test_parse_segmented_output_rejects_preamble_and_empty_segments():
+    with pytest.raises(ValueError):
+        parse_segmented_output(f"Sure!\n{segment_marker(1)}\nText.", 1)
+    with pytest.raises(ValueError):
+        parse_segmented_output(f"{segment_marker(1)}\n\n{segment_marker(2)}\nText.", 2)
+
 # FULL ANALYZER PIPELINE
 
 def test_validate_analyzer_request_full_success():